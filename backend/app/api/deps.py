@@ -10,6 +10,12 @@ from app.core.database import get_supabase_client
 from app.core import security
 from app.models.user import TokenData, UserResponse
 from app.models.schemas import DashboardSummary 
+from app.repositories.lead_repo import LeadRepository, get_fingerprint_indexes, get_lead_repository
+from app.repositories.scoring_profile_repo import ScoringProfileRepository
+from app.services.lead_dedup import LeadDeduplicator
+from app.services.lead_events import LeadEventBuffer, apply_lead_events
+from app.services.scoring_engine import BaseScoringEngine, build_scoring_engine, get_scoring_service
+from app.services.scoring_registry import ScoringEngineRegistry
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
@@ -44,3 +50,95 @@ def get_current_user(
         email=user_data["email"],
         full_name=user_data["full_name"]
     )
+
+
+# Per-owner scoring engine registry singleton
+_scoring_engines: Optional[ScoringEngineRegistry] = None
+
+
+def get_scoring_engine_registry() -> ScoringEngineRegistry:
+    """Get the process-wide registry of per-owner scoring engines."""
+    global _scoring_engines
+    
+    if _scoring_engines is None:
+        profiles = ScoringProfileRepository(get_supabase_client())
+        _scoring_engines = ScoringEngineRegistry(
+            load_version=profiles.get_version,
+            load_profile=profiles.get_profile,
+            build_engine=build_scoring_engine,
+            default_engine=get_scoring_service,
+            max_engines=settings.SCORING_PROFILE_CACHE_SIZE,
+            version_ttl_seconds=settings.SCORING_PROFILE_VERSION_TTL_SECONDS,
+        )
+    return _scoring_engines
+
+
+def get_scoring_engine(
+    current_user: UserResponse = Depends(get_current_user)
+) -> BaseScoringEngine:
+    """
+    Resolve the scoring engine for the current user's scoring profile.
+    
+    Engines are cached per (owner, profile version), so this does no
+    database work on most requests.
+    """
+    return get_scoring_engine_registry().get(str(current_user.id))
+
+
+# Interaction event buffer singleton
+_lead_event_buffer: Optional[LeadEventBuffer] = None
+
+
+def get_lead_event_buffer() -> Optional[LeadEventBuffer]:
+    """
+    Get the interaction event buffer.
+    
+    Returns None unless LEAD_EVENTS_COALESCE_ENABLED is set. Buffered
+    events are scored with each owner's engine from the scoring engine
+    registry. The buffer is started and drained by the application lifespan.
+    """
+    global _lead_event_buffer
+    
+    if _lead_event_buffer is None and settings.LEAD_EVENTS_COALESCE_ENABLED:
+        repository = get_lead_repository()
+        engines = get_scoring_engine_registry()
+        
+        def apply(owner_id, deltas):
+            return apply_lead_events(repository, engines.get(owner_id), owner_id, deltas)
+        
+        _lead_event_buffer = LeadEventBuffer(
+            apply,
+            window_ms=settings.LEAD_EVENTS_COALESCE_MS,
+            max_batch_leads=settings.LEAD_EVENTS_MAX_BATCH_LEADS,
+            max_pending_events=settings.LEAD_EVENTS_MAX_PENDING,
+            max_retries=settings.LEAD_EVENTS_MAX_RETRIES,
+            retry_base_ms=settings.LEAD_EVENTS_RETRY_BASE_MS,
+        )
+    
+    return _lead_event_buffer
+
+
+def get_lead_deduplicator(
+    lead_repository: LeadRepository = Depends(get_lead_repository)
+) -> Optional[LeadDeduplicator]:
+    """
+    Resolve the ingestion deduplication stage.
+    
+    Returns None when LEAD_DEDUP_ENABLED is off, in which case leads are
+    inserted as submitted.
+    """
+    if not settings.LEAD_DEDUP_ENABLED:
+        return None
+    return LeadDeduplicator(lead_repository, fingerprints=get_fingerprint_indexes())
+
+
+def get_current_admin(
+    current_user: UserResponse = Depends(get_current_user)
+) -> UserResponse:
+    """Require the current user to be listed in ADMIN_EMAILS."""
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
@@ -0,0 +1,151 @@
+"""
+Admin API Endpoints
+
+Endpoints for operators: request profiles captured by the profiling
+middleware, and its sampling rule. Restricted to ADMIN_EMAILS.
+"""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from app.core.config import settings
+from app.core.profiling import ProfileStore, SamplingRule, get_profile_store, get_sampling_rule
+from app.models.schemas import ProfilingSampling, RequestProfile, RequestProfileSummary
+from app.api.deps import get_current_admin
+from app.models.user import UserResponse
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def _require_profiling() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Request profiling is disabled (PROFILING_ENABLED)"
+        )
+
+
+@router.get(
+    "/profiles",
+    response_model=List[RequestProfileSummary],
+    status_code=status.HTTP_200_OK,
+    summary="List request profiles",
+    description="List the most recent request profiles, newest first."
+)
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of profiles"),
+    store: ProfileStore = Depends(get_profile_store),
+    admin: UserResponse = Depends(get_current_admin)
+) -> List[RequestProfileSummary]:
+    """
+    List stored request profiles.
+    
+    - **limit**: Maximum number of profiles
+    - **Returns**: Request details and the time breakdown of each profile
+    """
+    _require_profiling()
+    return store.list_summaries(limit=limit)
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_model=RequestProfile,
+    status_code=status.HTTP_200_OK,
+    summary="Get a request profile",
+    description="Get a request profile with its most expensive functions."
+)
+async def get_profile(
+    profile_id: str,
+    store: ProfileStore = Depends(get_profile_store),
+    admin: UserResponse = Depends(get_current_admin)
+) -> RequestProfile:
+    """
+    Get one stored request profile.
+    
+    - **profile_id**: ID from the profile list
+    - **Returns**: Time breakdown and the top functions by cumulative time
+    """
+    _require_profiling()
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found"
+        )
+    return profile
+
+
+@router.get(
+    "/profiles/{profile_id}/pstats",
+    status_code=status.HTTP_200_OK,
+    summary="Download a request profile",
+    description="Download the raw cProfile data, for pstats or snakeviz."
+)
+async def download_profile(
+    profile_id: str,
+    store: ProfileStore = Depends(get_profile_store),
+    admin: UserResponse = Depends(get_current_admin)
+) -> FileResponse:
+    """
+    Download a profile's pstats file.
+    
+    - **profile_id**: ID from the profile list
+    - **Returns**: Binary pstats file
+    """
+    _require_profiling()
+    path = store.stats_path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+@router.get(
+    "/profiling/sampling",
+    response_model=ProfilingSampling,
+    status_code=status.HTTP_200_OK,
+    summary="Get the profiling sampling rule",
+    description="Get which requests this worker process profiles without the X-Profile header."
+)
+async def get_profiling_sampling(
+    rule: SamplingRule = Depends(get_sampling_rule),
+    admin: UserResponse = Depends(get_current_admin)
+) -> ProfilingSampling:
+    """
+    Get the sampling rule of the worker process serving the request.
+    
+    - **Returns**: Sample rate, path prefixes and users
+    """
+    _require_profiling()
+    return ProfilingSampling(rate=rule.rate, paths=rule.paths, emails=rule.emails)
+
+
+@router.put(
+    "/profiling/sampling",
+    response_model=ProfilingSampling,
+    status_code=status.HTTP_200_OK,
+    summary="Set the profiling sampling rule",
+    description="Change which requests this worker process profiles, without a restart."
+)
+async def set_profiling_sampling(
+    sampling: ProfilingSampling,
+    rule: SamplingRule = Depends(get_sampling_rule),
+    admin: UserResponse = Depends(get_current_admin)
+) -> ProfilingSampling:
+    """
+    Replace the sampling rule of the worker process serving the request.
+    
+    The rule is held in memory, so with several worker processes each
+    one has to be updated, and a restart restores the PROFILING_SAMPLE_*
+    settings.
+    
+    - **rate**: Fraction of matching requests to profile
+    - **paths**: Path prefixes, e.g. /api/v1/dashboard/leads
+    - **emails**: Users whose requests are sampled
+    - **Returns**: The new rule
+    """
+    _require_profiling()
+    rule.rate, rule.paths, rule.emails = sampling.rate, list(sampling.paths), list(sampling.emails)
+    return sampling
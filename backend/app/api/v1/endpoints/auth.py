@@ -8,7 +8,8 @@ from app.core import security
 from app.core.config import settings
 from app.core.database import get_supabase_client
 from app.api.deps import get_current_user
-from app.models.user import UserCreate, UserResponse, Token
+from app.models.user import UserCreate, UserResponse, Token, RefreshTokenRequest
+from app.repositories.refresh_token_repo import RefreshTokenRepository, get_refresh_token_repository
 
 router = APIRouter()
 
@@ -51,10 +52,14 @@ def register(
 @router.post("/token", response_model=Token)
 def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    client: Client = Depends(get_supabase_client)
+    client: Client = Depends(get_supabase_client),
+    refresh_tokens: RefreshTokenRepository = Depends(get_refresh_token_repository)
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
+    
+    Also returns a refresh token; exchange it at /auth/refresh for new
+    tokens instead of sending the password again.
     """
     # Find user by email
     response = client.table("users").select("*").eq("email", form_data.username).execute()
@@ -72,8 +77,48 @@ def login_access_token(
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_tokens.issue(user["id"], user["email"]),
     }
 
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    request: RefreshTokenRequest,
+    refresh_tokens: RefreshTokenRepository = Depends(get_refresh_token_repository)
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    
+    Each refresh token can be used once. Reusing an old one revokes the
+    whole session, so a stolen token stops working for both parties.
+    """
+    rotated = refresh_tokens.rotate(request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    new_refresh_token, email = rotated
+    
+    access_token = security.create_access_token(
+        subject=email, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": new_refresh_token,
+    }
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    request: RefreshTokenRequest,
+    refresh_tokens: RefreshTokenRepository = Depends(get_refresh_token_repository)
+) -> None:
+    """
+    Revoke a refresh token and every token rotated from the same login.
+    """
+    refresh_tokens.revoke(request.refresh_token)
+
 @router.get("/me", response_model=UserResponse)
 def read_users_me(
     current_user: UserResponse = Depends(get_current_user),
@@ -3,37 +3,130 @@ Dashboard API Endpoints
 
 Endpoints for the sales workspace dashboard.
 """
-from typing import List
-from fastapi import APIRouter, Depends, status
-from app.models.schemas import LeadResponse, DashboardSummary, ActionItem
+from datetime import date, timedelta
+from typing import List, Optional, Union
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from app.models.schemas import (
+    LeadResponse, DashboardSummary, ActionItem, LeadFilters, Stage, Priority, PipelineAnalytics,
+    PipelineSnapshot, LeadChangesResponse, ActionItemUpdate
+)
 from app.repositories.lead_repo import LeadRepository, get_lead_repository
+from app.repositories.action_item_repo import ActionItemRepository, get_action_item_repository
+from app.repositories.analytics_repo import AnalyticsRepository, get_analytics_repository
+from app.services.analytics import build_pipeline_analytics
+from app.services.lead_sync import get_lead_changes
+from app.services.lead_encoding import JSON_MEDIA_TYPE, encode_leads, negotiate_media_type, parse_fields
 from app.api.deps import get_current_user
 from app.models.user import UserResponse
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Longest date range accepted by the trends endpoint
+MAX_TREND_DAYS = 3 * 366
+
 
 @router.get(
     "/leads",
     response_model=List[LeadResponse],
     status_code=status.HTTP_200_OK,
     summary="Get all leads",
-    description="Retrieve all leads sorted by score in descending order."
+    description=(
+        "Retrieve all leads sorted by score in descending order, optionally filtered. "
+        "Send `Accept: application/vnd.leads.columnar+json` (or `+msgpack`) for the columnar encoding."
+    )
 )
 async def get_leads(
+    response: Response,
+    industry: Optional[str] = Query(None, description="Only leads in this industry"),
+    channel: Optional[str] = Query(None, description="Only leads from this acquisition channel"),
+    stage: Optional[Stage] = Query(None, description="Only leads in this pipeline stage"),
+    priority: Optional[Priority] = Query(None, description="Only leads with this priority"),
+    min_score: Optional[int] = Query(None, ge=0, le=100, description="Minimum score (inclusive)"),
+    max_score: Optional[int] = Query(None, ge=0, le=100, description="Maximum score (inclusive)"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Maximum number of leads to return"),
+    offset: int = Query(0, ge=0, description="Number of leads to skip"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. lead_id,score,priority"),
+    accept: Optional[str] = Header(None),
     lead_repository: LeadRepository = Depends(get_lead_repository),
     current_user: UserResponse = Depends(get_current_user)
-) -> List[LeadResponse]:
+) -> Union[List[LeadResponse], Response]:
     """
     Get all leads from the system, sorted by score.
     
     Leads are returned in descending order of their score,
     with the highest-priority leads appearing first.
+    Filters are applied in the database, not after download.
+    
+    With `fields` or a columnar Accept type, only the needed columns are
+    read and the rows are encoded directly, without building response
+    objects.
+    
+    - **industry / channel / stage / priority**: Exact-match filters
+    - **min_score / max_score**: Inclusive score range
+    - **limit / offset**: Pagination
+    - **fields**: Sparse fieldset (score, priority and explanations are nested under score_details in JSON)
+    - **Returns**: List of matching leads with their scoring details
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    media_type = negotiate_media_type(accept)
+    
+    filters = LeadFilters(
+        industry=industry,
+        channel=channel,
+        stage=stage,
+        priority=priority,
+        min_score=min_score,
+        max_score=max_score,
+        limit=limit,
+        offset=offset,
+    )
+    owner_id = str(current_user.id)
+    if media_type == JSON_MEDIA_TYPE and fields is None:
+        response.headers["Vary"] = "Accept"
+        return lead_repository.get_all_leads(owner_id=owner_id, filters=filters)
+    
+    rows = lead_repository.get_lead_rows(owner_id=owner_id, filters=filters, columns=",".join(selected))
+    return Response(
+        content=encode_leads(rows, selected, media_type),
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
+
+
+@router.get(
+    "/leads/changes",
+    response_model=LeadChangesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get lead changes",
+    description="Incrementally sync a local copy of the lead list: leads changed and deleted since a cursor."
+)
+async def get_leads_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous call; omit for a full download"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changed leads to return"),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> LeadChangesResponse:
+    """
+    Get the leads inserted, updated or rescored since a cursor.
     
-    - **Returns**: List of all leads with their scoring details
+    Remove the `deleted` lead IDs from the local copy, then upsert the
+    returned `leads` by lead_id, and store `cursor` for the next call.
+    Call again immediately while `has_more` is true. The most recent
+    couple of seconds of changes are returned on the following call.
+    
+    - **since**: Cursor returned by the previous call
+    - **limit**: Page size
+    - **Returns**: Changed leads, deleted lead IDs and the next cursor
     """
-    return lead_repository.get_all_leads(owner_id=str(current_user.id))
+    try:
+        return get_lead_changes(lead_repository, str(current_user.id), cursor=since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get(
@@ -65,18 +158,122 @@ async def get_summary(
     response_model=List[ActionItem],
     status_code=status.HTTP_200_OK,
     summary="Get action items",
-    description="Get suggested action items for sales representatives based on hot leads."
+    description="Get open follow-up reminders for stalled leads, then suggested action items based on hot leads."
 )
 async def get_actions(
     lead_repository: LeadRepository = Depends(get_lead_repository),
+    action_item_repository: ActionItemRepository = Depends(get_action_item_repository),
     current_user: UserResponse = Depends(get_current_user)
 ) -> List[ActionItem]:
     """
     Get action items for the sales team.
     
-    Generates actionable to-do items based on the top hot leads
-    to help sales representatives prioritize their outreach.
+    Lists the open follow-up reminders filed by the reminder scheduler
+    (oldest deadline first), followed by actionable to-do items generated
+    from the top hot leads to help sales representatives prioritize
+    their outreach.
     
     - **Returns**: List of action items for follow-up
     """
-    return lead_repository.get_actions(owner_id=str(current_user.id))
+    owner_id = str(current_user.id)
+    reminders = action_item_repository.list_open(owner_id)
+    reminded = {item.lead_id for item in reminders}
+    suggestions = [item for item in lead_repository.get_actions(owner_id=owner_id) if item.lead_id not in reminded]
+    return reminders + suggestions
+
+
+@router.patch(
+    "/actions/{action_id}",
+    response_model=ActionItem,
+    status_code=status.HTTP_200_OK,
+    summary="Update an action item",
+    description="Mark a follow-up reminder as done, or open it again."
+)
+async def update_action(
+    action_id: UUID,
+    update: ActionItemUpdate,
+    action_item_repository: ActionItemRepository = Depends(get_action_item_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> ActionItem:
+    """
+    Update a persisted action item.
+    
+    Only reminders listed with a UUID can be updated; suggested items
+    are regenerated on every request.
+    
+    - **action_id**: The action item ID
+    - **update**: New completion state
+    - **Returns**: The updated action item
+    """
+    item = action_item_repository.set_done(str(current_user.id), str(action_id), update.is_done)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Action item '{action_id}' not found"
+        )
+    return item
+
+
+@router.get(
+    "/analytics",
+    response_model=PipelineAnalytics,
+    status_code=status.HTTP_200_OK,
+    summary="Get pipeline analytics",
+    description="Get funnel, score histogram and industry/channel breakdowns from pre-aggregated data."
+)
+async def get_analytics(
+    analytics_repository: AnalyticsRepository = Depends(get_analytics_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> PipelineAnalytics:
+    """
+    Get pipeline analytics for the dashboard.
+    
+    Served from per-owner aggregate buckets that are updated incrementally
+    on every lead write, so the cost depends on the number of buckets,
+    not the number of leads.
+    
+    - **Returns**: Priority counts, stage funnel, score histogram and breakdowns
+    """
+    aggregates = analytics_repository.get_aggregates(owner_id=str(current_user.id))
+    return build_pipeline_analytics(aggregates)
+
+
+@router.get(
+    "/trends",
+    response_model=List[PipelineSnapshot],
+    status_code=status.HTTP_200_OK,
+    summary="Get pipeline trends",
+    description="Get daily pipeline snapshots over a date range for trend charts."
+)
+async def get_trends(
+    from_date: Optional[date] = Query(None, alias="from", description="First day (default: 30 days before `to`)"),
+    to_date: Optional[date] = Query(None, alias="to", description="Last day (default: today)"),
+    analytics_repository: AnalyticsRepository = Depends(get_analytics_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> List[PipelineSnapshot]:
+    """
+    Get daily pipeline snapshots for the dashboard trend charts.
+    
+    Each day is one small pre-computed row, so a one-year range reads
+    about 365 rows regardless of how many leads the owner has.
+    
+    - **from / to**: Inclusive date range (YYYY-MM-DD)
+    - **Returns**: Snapshots ordered by date; days without a snapshot are omitted
+    """
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=30)
+    
+    if from_date > to_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be on or before 'to'"
+        )
+    if (to_date - from_date).days > MAX_TREND_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_TREND_DAYS} days"
+        )
+    
+    return analytics_repository.get_snapshots(
+        owner_id=str(current_user.id), from_date=from_date, to_date=to_date
+    )
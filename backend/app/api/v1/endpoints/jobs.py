@@ -0,0 +1,62 @@
+"""
+Jobs API Endpoints
+
+Endpoints for polling background jobs such as lead imports and rescoring.
+"""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.models.schemas import JobStatus
+from app.services.job_queue import JobQueue, get_job_queue
+from app.api.deps import get_current_user
+from app.models.user import UserResponse
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get(
+    "/",
+    response_model=List[JobStatus],
+    status_code=status.HTTP_200_OK,
+    summary="List jobs",
+    description="List your most recent background jobs, newest first."
+)
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of jobs"),
+    job_queue: JobQueue = Depends(get_job_queue),
+    current_user: UserResponse = Depends(get_current_user)
+) -> List[JobStatus]:
+    """
+    List the current user's background jobs.
+    
+    - **limit**: Maximum number of jobs returned
+    - **Returns**: Jobs with their status and progress
+    """
+    return [job.to_status() for job in job_queue.list_for_owner(str(current_user.id), limit=limit)]
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Get a job",
+    description="Poll the status, progress and result of a background job."
+)
+async def get_job(
+    job_id: str,
+    job_queue: JobQueue = Depends(get_job_queue),
+    current_user: UserResponse = Depends(get_current_user)
+) -> JobStatus:
+    """
+    Get one of the current user's background jobs.
+    
+    - **job_id**: ID returned when the job was started
+    - **Returns**: Status, attempts, progress counters and, once finished, the result or error
+    """
+    job = job_queue.get(job_id)
+    if job is None or job.owner_id != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found"
+        )
+    return job.to_status()
@@ -3,11 +3,25 @@ Leads API Endpoints
 
 Endpoints for lead scoring and lead creation.
 """
-from fastapi import APIRouter, Depends, status, HTTPException
-from app.models.schemas import LeadInput, ScoringResult, LeadResponse, StageUpdateRequest
-from app.services.scoring_engine import LeadScoringService, get_scoring_service
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi.responses import StreamingResponse
+from app.models.schemas import (
+    LeadInput, ScoringResult, LeadResponse, StageUpdateRequest,
+    BulkStageUpdateRequest, BulkStageUpdateResponse, LeadSearchResponse,
+    BulkLeadCreateRequest, BulkLeadCreateResponse, BulkLeadResult, JobStatus, LeadImportRequest,
+    LeadEvent, LeadEventBatchRequest, LeadEventsResponse, SimilarLead, SimilarLeadsResponse
+)
+from app.models.columns import LeadColumns
+from app.services.scoring_engine import BaseScoringEngine
+from app.services.job_queue import JobQueue, get_job_queue
+from app.services.lead_dedup import LeadDeduplicator
+from app.services.lead_events import LeadEventBuffer, LeadEventTuple, apply_lead_events, coalesce_events
+from app.services.lead_validation import save_errors, validate_leads
 from app.repositories.lead_repo import LeadRepository, get_lead_repository
-from app.api.deps import get_current_user
+from app.services.lead_export import EXPORT_COLUMNS, EXPORT_FORMATS, encode_export, parquet_available
+from app.api.deps import get_current_user, get_lead_deduplicator, get_lead_event_buffer, get_scoring_engine
 from app.models.user import UserResponse
 
 
@@ -23,7 +37,7 @@ router = APIRouter(prefix="/leads", tags=["Leads"])
 )
 async def score_lead(
     lead: LeadInput,
-    scoring_service: LeadScoringService = Depends(get_scoring_service),
+    scoring_service: BaseScoringEngine = Depends(get_scoring_engine),
     current_user: UserResponse = Depends(get_current_user)
 ) -> ScoringResult:
     """
@@ -43,12 +57,14 @@ async def score_lead(
     response_model=LeadResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Create and score a lead",
-    description="Submit lead data, calculate its score, and save it to the system."
+    description="Submit lead data, calculate its score, and save it to the system. "
+                "A duplicate of an existing lead is merged into it instead."
 )
 async def create_lead(
     lead: LeadInput,
-    scoring_service: LeadScoringService = Depends(get_scoring_service),
+    scoring_service: BaseScoringEngine = Depends(get_scoring_engine),
     lead_repository: LeadRepository = Depends(get_lead_repository),
+    deduplicator: Optional[LeadDeduplicator] = Depends(get_lead_deduplicator),
     current_user: UserResponse = Depends(get_current_user)
 ) -> LeadResponse:
     """
@@ -57,9 +73,31 @@ async def create_lead(
     The lead will be scored using the rule-based scoring engine
     and added to the lead repository for dashboard viewing.
     
+    If the lead matches an existing one (same contact email or lead ID),
+    it is merged into that lead, which is rescored and returned instead.
+    With deduplication enabled the lead is saved before responding, so
+    the write-behind buffer (LEAD_WRITE_BEHIND_ENABLED) is not used.
+    
     - **lead**: Lead input data including engagement metrics and intent signals
     - **Returns**: Full lead response with scoring details
     """
+    owner_id = str(current_user.id)
+    
+    if deduplicator is not None:
+        # Off the event loop: the owner's fingerprint filter may be built on first use.
+        # New leads are committed like merged ones, so a lead that loses an insert
+        # race is merged into the stored lead instead of being dropped.
+        dedup = await asyncio.to_thread(
+            deduplicator.prepare, owner_id, [lead.model_dump(mode="json")], scoring_service
+        )
+        await asyncio.to_thread(deduplicator.commit, owner_id, dedup, scoring_service)
+        if dedup.failed:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The lead could not be saved; submit it again"
+            )
+        return LeadResponse(**dedup.leads[0], score_details=dedup.batch.to_results()[0])
+    
     # Calculate score
     score_result = scoring_service.calculate_score(lead)
     
@@ -70,11 +108,372 @@ async def create_lead(
     )
     
     # Persist to repository
-    lead_repository.add_lead(lead_response, owner_id=str(current_user.id))
+    await lead_repository.add_lead_async(lead_response, owner_id=owner_id)
     
     return lead_response
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkLeadCreateResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Create and score many leads",
+    description="Validate, score and save up to 100,000 leads. Invalid rows are reported and skipped."
+)
+async def create_leads_bulk(
+    request: BulkLeadCreateRequest,
+    dry_run: bool = Query(False, description="Validate and score without saving"),
+    scoring_service: BaseScoringEngine = Depends(get_scoring_engine),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    deduplicator: Optional[LeadDeduplicator] = Depends(get_lead_deduplicator),
+    current_user: UserResponse = Depends(get_current_user)
+) -> BulkLeadCreateResponse:
+    """
+    Create many leads in one request.
+    
+    Rows are validated together in a single pass (dates are parsed once
+    per distinct value), scored as one columnar batch and inserted in
+    multi-row chunks. A bad row does not fail the request; it is listed
+    in `errors` with its index, as are the rows of an insert chunk that
+    failed (the other chunks are still saved and counted in `created`).
+    
+    Rows that duplicate an existing lead or an earlier row are merged
+    into it; their result shows the lead they were merged into.
+    
+    - **leads**: Lead objects in the same format as POST /leads
+    - **dry_run**: Return scores and errors without saving
+    - **Returns**: Created count, per-lead scores and per-row errors
+    """
+    owner_id = str(current_user.id)
+    leads, indices, errors = validate_leads(request.leads)
+    
+    if deduplicator is None:
+        batch = scoring_service.score_columns(LeadColumns.from_rows(leads))
+        unsaved: List[int] = []
+        if not dry_run and leads:
+            _, unsaved = await asyncio.to_thread(
+                lead_repository.insert_scored_leads,
+                leads, batch.scores, batch.priorities, batch.explanations, owner_id=owner_id
+            )
+        created = len(leads) - len(unsaved)
+        skip = set(unsaved)
+        results = [
+            BulkLeadResult.model_construct(lead_id=lead["lead_id"], score=int(score), priority=priority, merged=False)
+            for i, (lead, score, priority) in enumerate(zip(leads, batch.scores, batch.priorities))
+            if i not in skip
+        ]
+    else:
+        dedup = await asyncio.to_thread(deduplicator.prepare, owner_id, leads, scoring_service)
+        if not dry_run and dedup.leads:
+            await asyncio.to_thread(deduplicator.commit, owner_id, dedup, scoring_service)
+        created = dedup.created_count
+        unsaved = dedup.failed_rows
+        skip = set(unsaved)
+        batch = dedup.batch
+        results = [
+            BulkLeadResult.model_construct(
+                lead_id=dedup.leads[g]["lead_id"], score=int(batch.scores[g]), priority=batch.priorities[g], merged=merged
+            )
+            for i, (g, merged) in enumerate(zip(dedup.targets, dedup.merged))
+            if i not in skip
+        ]
+    
+    if unsaved:
+        errors = sorted(errors + save_errors(leads, unsaved, indices), key=lambda error: error.index)
+    
+    return BulkLeadCreateResponse(
+        created=0 if dry_run else created,
+        merged=sum(1 for result in results if result.merged),
+        failed=len(errors),
+        results=results,
+        errors=errors,
+    )
+
+
+@router.post(
+    "/import",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import leads in the background",
+    description="Queue up to 200,000 leads for validation, scoring and saving by a background job."
+)
+async def import_leads(
+    request: LeadImportRequest,
+    job_queue: JobQueue = Depends(get_job_queue),
+    current_user: UserResponse = Depends(get_current_user)
+) -> JobStatus:
+    """
+    Import many leads without holding the request open.
+    
+    The leads are processed like POST /leads/bulk, in chunks, by a
+    background worker. Poll GET /jobs/{id} for progress; the finished
+    job's result holds the created, merged and failed counts and the
+    first row errors.
+    
+    - **leads**: Lead objects in the same format as POST /leads
+    - **Returns**: The queued job
+    """
+    job = await asyncio.to_thread(job_queue.enqueue, str(current_user.id), "lead_import", {"leads": request.leads})
+    return job.to_status()
+
+
+async def _ingest_events(
+    owner_id: str,
+    events: List[LeadEventTuple],
+    event_buffer: Optional[LeadEventBuffer],
+    lead_repository: LeadRepository,
+    scoring_service: BaseScoringEngine,
+) -> LeadEventsResponse:
+    """Queue events for a coalesced write, or apply them now when the buffer is off."""
+    if event_buffer is not None and event_buffer.is_running:
+        await event_buffer.submit(owner_id, events)
+        return LeadEventsResponse(accepted=len(events), queued=True)
+    
+    updated, rescored = apply_lead_events(lead_repository, scoring_service, owner_id, coalesce_events(events))
+    return LeadEventsResponse(accepted=len(events), queued=False, leads_updated=updated, leads_rescored=rescored)
+
+
+@router.post(
+    "/events",
+    response_model=LeadEventsResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Record interaction events for many leads",
+    description="Submit up to 10,000 tracked interactions (email opens, page views, pricing requests, ...) "
+                "across leads. Counters, recency and scores are updated incrementally."
+)
+async def record_lead_events(
+    request: LeadEventBatchRequest,
+    event_buffer: Optional[LeadEventBuffer] = Depends(get_lead_event_buffer),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    scoring_service: BaseScoringEngine = Depends(get_scoring_engine),
+    current_user: UserResponse = Depends(get_current_user)
+) -> LeadEventsResponse:
+    """
+    Record interaction events for any of the current user's leads.
+    
+    Each event adds one interaction to its lead, moves the lead's last
+    interaction time forward if it is newer, and pricing or demo requests
+    set the matching intent flag. Events for the same lead arriving within
+    LEAD_EVENTS_COALESCE_MS are applied as one write, after which the lead
+    is rescored. Events for unknown lead IDs are dropped.
+    
+    - **events**: Lead ID, type and optional time of each interaction
+    - **Returns**: The number of accepted events
+    """
+    return await _ingest_events(
+        str(current_user.id),
+        [(event.lead_id, event.type, event.occurred_at) for event in request.events],
+        event_buffer, lead_repository, scoring_service,
+    )
+
+
+@router.get(
+    "/search",
+    response_model=LeadSearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Search leads",
+    description="Find leads by prefix or substring of their lead ID, industry or channel."
+)
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=100, description="Search text"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, le=10000, description="Number of results to skip"),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> LeadSearchResponse:
+    """
+    Search the current user's leads.
+    
+    Results are ranked: exact lead ID, lead ID prefix, exact industry/channel,
+    industry/channel prefix, lead ID substring, then industry/channel substring.
+    Within each group leads are ordered by score.
+    
+    - **q**: Search text (case-insensitive)
+    - **limit / offset**: Pagination
+    - **Returns**: Ranked page of matching leads
+    """
+    # Off the event loop: the first search of an owner may build its in-process index
+    results, has_more = await asyncio.to_thread(
+        lead_repository.search_leads, owner_id=str(current_user.id), query=q, limit=limit, offset=offset
+    )
+    return LeadSearchResponse(query=q, results=results, limit=limit, offset=offset, has_more=has_more)
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export leads",
+    description="Stream all leads as CSV, NDJSON or Parquet with constant memory use.",
+    response_class=StreamingResponse
+)
+async def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="Export format"),
+    gzip: bool = Query(False, description="Gzip the output (CSV and NDJSON only)"),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Export the current user's leads as a file download.
+    
+    Leads are read with keyset pagination and encoded page by page,
+    so worker memory stays flat no matter how many leads are exported.
+    
+    - **format**: csv, ndjson or parquet
+    - **gzip**: Compress CSV/NDJSON output on the fly
+    - **Returns**: Streaming file download
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires the 'pyarrow' package on the server"
+        )
+    
+    pages = lead_repository.iter_lead_pages(
+        owner_id=str(current_user.id),
+        columns=",".join(["id", *EXPORT_COLUMNS]),
+        page_size=2000
+    )
+    media_type, extension = EXPORT_FORMATS[format]
+    compressed = gzip and format != "parquet"
+    if compressed:
+        media_type, extension = "application/gzip", f"{extension}.gz"
+    
+    return StreamingResponse(
+        encode_export(pages, format, gzip=compressed),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="leads.{extension}"'}
+    )
+
+
+@router.get(
+    "/{lead_id}",
+    response_model=LeadResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get a lead",
+    description="Retrieve a single lead by its ID."
+)
+async def get_lead(
+    lead_id: str,
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> LeadResponse:
+    """
+    Get a single lead owned by the current user.
+    
+    - **lead_id**: The lead ID to fetch
+    - **Returns**: Lead response with scoring details
+    """
+    lead = lead_repository.get_lead_by_id(lead_id, owner_id=str(current_user.id))
+    
+    if not lead:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lead with ID '{lead_id}' not found"
+        )
+    
+    return lead
+
+
+@router.get(
+    "/{lead_id}/similar",
+    response_model=SimilarLeadsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Find similar leads",
+    description="Find the leads that look most like a lead by scoring features, industry and channel."
+)
+async def get_similar_leads(
+    lead_id: str,
+    k: int = Query(10, ge=1, le=100, description="Number of similar leads to return"),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> SimilarLeadsResponse:
+    """
+    Find lookalikes of one of the current user's leads.
+    
+    Leads are compared on the AI scoring engine's features plus their
+    industry and channel, and ranked by cosine similarity.
+    
+    - **lead_id**: The reference lead
+    - **k**: Number of similar leads to return
+    - **Returns**: Similar leads, most similar first
+    """
+    # Off the event loop: the owner's index may be built on first use
+    matches = await asyncio.to_thread(lead_repository.find_similar_leads, str(current_user.id), lead_id, k)
+    
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lead with ID '{lead_id}' not found"
+        )
+    
+    return SimilarLeadsResponse(
+        lead_id=lead_id,
+        results=[SimilarLead(lead=lead, similarity=similarity) for lead, similarity in matches],
+    )
+
+
+@router.post(
+    "/{lead_id}/events",
+    response_model=LeadEventsResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Record an interaction event",
+    description="Record one tracked interaction with a lead and update its counters, recency and score."
+)
+async def record_lead_event(
+    lead_id: str,
+    event: LeadEvent,
+    event_buffer: Optional[LeadEventBuffer] = Depends(get_lead_event_buffer),
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    scoring_service: BaseScoringEngine = Depends(get_scoring_engine),
+    current_user: UserResponse = Depends(get_current_user)
+) -> LeadEventsResponse:
+    """
+    Record one interaction event for a lead.
+    
+    Behaves like POST /leads/events with a single event; the event is
+    dropped if the lead does not exist.
+    
+    - **lead_id**: The lead the interaction belongs to
+    - **event**: Interaction type and optional time
+    - **Returns**: The number of accepted events
+    """
+    return await _ingest_events(
+        str(current_user.id), [(lead_id, event.type, event.occurred_at)],
+        event_buffer, lead_repository, scoring_service,
+    )
+
+
+@router.patch(
+    "/stage",
+    response_model=BulkStageUpdateResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Bulk update lead pipeline stages",
+    description="Move many leads between pipeline stages in a single request."
+)
+async def update_lead_stages(
+    stage_updates: BulkStageUpdateRequest,
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> BulkStageUpdateResponse:
+    """
+    Update the pipeline stage for a batch of leads.
+    
+    Transitions are applied by the `update_lead_stages` database function
+    in chunks of 1000 leads, each chunk one call that also updates the
+    pipeline stage counts, so moving a whole column of the pipeline board
+    costs a single request. Requires scripts/add_lead_aggregates_migration.sql.
+    
+    - **stage_updates**: List of lead ID and target stage pairs
+    - **Returns**: Updated leads and the IDs that were not found
+    """
+    updated, not_found = lead_repository.update_stages(
+        [(item.lead_id, item.stage) for item in stage_updates.transitions],
+        owner_id=str(current_user.id)
+    )
+    
+    return BulkStageUpdateResponse(updated=updated, not_found=not_found)
+
+
 @router.patch(
     "/{lead_id}/stage",
     response_model=LeadResponse,
@@ -93,6 +492,10 @@ async def update_lead_stage(
     
     Stages: new -> meeting -> negotiation -> closed
     
+    With LEAD_AGGREGATES_ENABLED (the default) the move uses the
+    `update_lead_stages` database function from the aggregates migration;
+    otherwise it is a plain update.
+    
     - **lead_id**: The lead ID to update
     - **stage_update**: New stage value
     - **Returns**: Updated lead response
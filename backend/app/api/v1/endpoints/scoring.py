@@ -0,0 +1,142 @@
+"""
+Scoring API Endpoints
+
+Endpoints for inspecting and tuning the scoring configuration.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.models.schemas import (
+    JobStatus, ScoringProfile, ScoringProfileUpdate, ScoringSimulationRequest, ScoringSimulationResponse
+)
+from app.repositories.lead_repo import LeadRepository, get_lead_repository
+from app.repositories.scoring_profile_repo import ScoringProfileRepository, get_scoring_profile_repository
+from app.services.scoring_engine import BaseScoringEngine, RuleBasedScoringEngine, engine_name
+from app.services.job_queue import JobQueue, get_job_queue
+from app.services.scoring_simulator import simulate
+from app.api.deps import get_current_user, get_scoring_engine, get_scoring_engine_registry
+from app.models.user import UserResponse
+
+
+router = APIRouter(prefix="/scoring", tags=["Scoring"])
+
+
+@router.post(
+    "/simulate",
+    response_model=ScoringSimulationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Simulate scoring configurations",
+    description="Evaluate candidate weights and thresholds against your leads without changing any scores."
+)
+async def simulate_scoring(
+    request: ScoringSimulationRequest,
+    lead_repository: LeadRepository = Depends(get_lead_repository),
+    scoring_engine: BaseScoringEngine = Depends(get_scoring_engine),
+    current_user: UserResponse = Depends(get_current_user)
+) -> ScoringSimulationResponse:
+    """
+    Preview the effect of scoring configuration changes.
+
+    The owner's lead features are loaded once into columnar arrays and
+    every candidate is evaluated in a single vectorized pass. Nothing
+    is written.
+
+    - **candidates**: Up to 20 weight/threshold sets to evaluate
+    - **baseline**: Configuration to compare against (defaults to the engine your leads
+      are scored with: your profile's weights, the YAML rules or the AI model)
+    - **max_changed_leads**: Cap on the changed leads listed per candidate
+    - **Returns**: Priority distribution, tier transitions and changed leads per candidate
+    """
+    baseline = request.baseline
+    if baseline is None:
+        # Engines without a ScoringWeights form (YAML rules, AI model) are scored as they are
+        baseline = scoring_engine.weights if isinstance(scoring_engine, RuleBasedScoringEngine) else scoring_engine
+    columns = lead_repository.get_lead_columns(owner_id=str(current_user.id))
+    return simulate(columns, baseline, request.candidates, request.max_changed_leads)
+
+
+@router.get(
+    "/profile",
+    response_model=ScoringProfile,
+    status_code=status.HTTP_200_OK,
+    summary="Get scoring profile",
+    description="Get the scoring engine and weights used for your leads."
+)
+async def get_scoring_profile(
+    profile_repository: ScoringProfileRepository = Depends(get_scoring_profile_repository),
+    scoring_engine: BaseScoringEngine = Depends(get_scoring_engine),
+    current_user: UserResponse = Depends(get_current_user)
+) -> ScoringProfile:
+    """
+    Get the current user's scoring profile.
+    
+    Without a saved profile, leads are scored by the shared YAML rules
+    (or the built-in weights if the rules failed to load); `active_engine`
+    tells which.
+    
+    - **Returns**: The saved profile, or the default configuration with version 0
+    """
+    profile = profile_repository.get_profile(str(current_user.id))
+    if profile is None:
+        profile = ScoringProfile(version=0)
+    return profile.model_copy(update={"active_engine": engine_name(scoring_engine)})
+
+
+@router.put(
+    "/profile",
+    response_model=ScoringProfile,
+    status_code=status.HTTP_200_OK,
+    summary="Save scoring profile",
+    description="Set the scoring engine and weights used for your leads. A rule_based profile replaces the "
+                "shared YAML rules for your leads. Existing scores are not recalculated."
+)
+async def save_scoring_profile(
+    update: ScoringProfileUpdate,
+    profile_repository: ScoringProfileRepository = Depends(get_scoring_profile_repository),
+    current_user: UserResponse = Depends(get_current_user)
+) -> ScoringProfile:
+    """
+    Save the current user's scoring profile.
+    
+    Each save creates a new profile version. This worker switches to it
+    immediately; other workers pick it up within
+    SCORING_PROFILE_VERSION_TTL_SECONDS.
+    
+    - **engine_type**: "rule_based" (score with `weights` instead of the YAML rules) or "ai"
+    - **weights**: Rule weights and thresholds
+    - **Returns**: The saved profile with its new version
+    """
+    owner_id = str(current_user.id)
+    profile = profile_repository.save_profile(owner_id, update)
+    get_scoring_engine_registry().invalidate(owner_id)
+    return profile.model_copy(update={"active_engine": profile.engine_type})
+
+
+@router.post(
+    "/rescore",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Rescore all leads",
+    description="Recalculate every lead's score with your current scoring profile, as a background job."
+)
+async def start_rescore(
+    dry_run: bool = Query(False, description="Count the leads whose score would change without saving"),
+    job_queue: JobQueue = Depends(get_job_queue),
+    current_user: UserResponse = Depends(get_current_user)
+) -> JobStatus:
+    """
+    Start a full rescore of the current user's leads.
+    
+    Leads are split into key ranges and rescored by a pool of worker
+    processes; only leads whose score or priority changed are written.
+    Poll GET /jobs/{id} for progress.
+    
+    - **dry_run**: Count changes without writing them
+    - **Returns**: The queued job
+    """
+    owner_id = str(current_user.id)
+    active = job_queue.find_active(owner_id, "rescore")
+    if active is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Rescore job '{active.id}' is already {active.status}"
+        )
+    return job_queue.enqueue(owner_id, "rescore", {"dry_run": dry_run}).to_status()
@@ -4,7 +4,7 @@ API v1 Router
 Central router that includes all v1 endpoint routers.
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import leads, dashboard, auth
+from app.api.v1.endpoints import leads, dashboard, auth, scoring, jobs, admin
 
 
 router = APIRouter()
@@ -13,3 +13,6 @@ router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 router.include_router(leads.router)
 router.include_router(dashboard.router)
+router.include_router(scoring.router)
+router.include_router(jobs.router)
+router.include_router(admin.router)
@@ -0,0 +1,173 @@
+"""
+Response compression middleware.
+
+Compresses responses above a size threshold with brotli when the client
+accepts it and the optional `brotli` package is installed, and with gzip
+otherwise. Streaming responses are compressed chunk by chunk, so streamed
+exports stay constant-memory. Responses that already carry a
+Content-Encoding, or whose body is already compressed (gzip downloads,
+Parquet), are passed through unchanged.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+# Media types whose bodies do not shrink when compressed again
+INCOMPRESSIBLE_TYPES = ("application/gzip", "application/vnd.apache.parquet", "image/", "video/")
+
+
+def brotli_available() -> bool:
+    """Whether the optional brotli dependency is installed."""
+    return brotli is not None
+
+
+def header_quality(params: str) -> float:
+    """
+    Quality value of an Accept or Accept-Encoding entry.
+
+    Args:
+        params: The entry's parameters, everything after its first ";"
+
+    Returns:
+        The `q` parameter wherever it appears among them; 1.0 if absent or malformed
+    """
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 1.0
+    return 1.0
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding for an Accept-Encoding header.
+
+    Codings listed with q=0 are refused and never chosen, even when "*"
+    is accepted; "*" only covers codings the header does not name.
+
+    Returns:
+        "br", "gzip", or None if the client accepts neither
+    """
+    accepted = set()
+    refused = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = header_quality(params)
+        (accepted if quality > 0 else refused).add(coding.strip())
+
+    def allowed(coding: str) -> bool:
+        return coding in accepted or ("*" in accepted and coding not in refused)
+
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    if allowed("br") and brotli is not None:
+        return "br"
+    return None
+
+
+class _Compressor:
+    """Incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self._brotli = encoding == "br"
+        if self._brotli:
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli:
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli:
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            minimum_size: Smallest response body (in bytes) worth compressing
+            gzip_level: zlib compression level (1-9)
+            brotli_quality: Brotli quality (0-11); low values suit on-the-fly compression
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = "content-encoding" in headers or content_type.startswith(INCOMPRESSIBLE_TYPES)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                # First body chunk: decide whether to compress at all
+                initial, start = start, None
+                if passthrough or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(initial)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=initial["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    message["body"] = compressor.compress(body)
+                else:
+                    message["body"] = compressor.finish(body)
+                    headers["Content-Length"] = str(len(message["body"]))
+                await send(initial)
+                await send(message)
+                return
+
+            if not passthrough:
+                message["body"] = compressor.compress(body) if more_body else compressor.finish(body)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -22,6 +22,102 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "changethis-to-a-secure-secret-key-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Users allowed to call /admin endpoints
+    ADMIN_EMAILS: list[str] = []
+    
+    # Opt-in request profiling (the middleware is not installed unless enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "data/profiles"
+    PROFILING_MAX_PROFILES: int = 50
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SAMPLE_PATHS: list[str] = []
+    PROFILING_SAMPLE_EMAILS: list[str] = []
+    
+    # Response compression (brotli needs the optional `brotli` package)
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    
+    # Readiness probe: database checks run in the background; /ready reads the cached result
+    READINESS_PROBE_INTERVAL_SECONDS: float = 5.0
+    READINESS_PROBE_TIMEOUT_SECONDS: float = 2.0
+    READINESS_MAX_AGE_SECONDS: float = 30.0
+    
+    # Lead write-behind (group commit) settings
+    LEAD_WRITE_BEHIND_ENABLED: bool = False
+    LEAD_WRITE_BEHIND_MAX_BATCH: int = 500
+    LEAD_WRITE_BEHIND_FLUSH_MS: int = 50
+    LEAD_WRITE_BEHIND_QUEUE_SIZE: int = 10000
+    
+    # Interaction event ingestion: events per lead are coalesced for this long before one write
+    LEAD_EVENTS_COALESCE_ENABLED: bool = True
+    LEAD_EVENTS_COALESCE_MS: int = 250
+    LEAD_EVENTS_MAX_BATCH_LEADS: int = 1000
+    LEAD_EVENTS_MAX_PENDING: int = 100000
+    # Failed event writes are retried this many times, after LEAD_EVENTS_RETRY_BASE_MS doubling per attempt
+    LEAD_EVENTS_MAX_RETRIES: int = 3
+    LEAD_EVENTS_RETRY_BASE_MS: int = 500
+    
+    # Follow-up reminders: days without interaction per stage before an action item is filed.
+    # Enable the scheduler on one process only.
+    FOLLOW_UP_SCHEDULER_ENABLED: bool = False
+    FOLLOW_UP_DAYS: dict[str, int] = {"new": 7, "meeting": 3, "negotiation": 2}
+    FOLLOW_UP_TICK_SECONDS: float = 60.0
+    
+    # Default scoring engine for owners without a scoring profile
+    SCORING_ENGINE_TYPE: str = "rule_based"  # Options: "rule_based", "ai"
+    
+    # Per-owner scoring engine registry
+    SCORING_PROFILE_CACHE_SIZE: int = 256
+    SCORING_PROFILE_VERSION_TTL_SECONDS: int = 30
+    
+    # Declarative rule file for the rule-based engine (empty to use built-in rules)
+    SCORING_RULES_PATH: str = "config/scoring_rules.yaml"
+    SCORING_RULES_WATCH: bool = True
+    
+    # Weights artifact loaded by the AI scoring engine
+    SCORING_MODEL_PATH: str = "models/scoring_weights.json"
+    
+    # Background job queue (SQLite file shared by the workers on one host)
+    JOB_RUNNER_ENABLED: bool = True
+    JOB_QUEUE_PATH: str = "data/jobs.sqlite3"
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_MAX_RUNNING_PER_OWNER: int = 1
+    JOB_LEASE_SECONDS: int = 60
+    JOB_RETRY_BASE_SECONDS: int = 5
+    JOB_RETRY_MAX_SECONDS: int = 300
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_RETENTION_HOURS: int = 72
+    
+    # Parallel rescoring (0 workers = one per CPU core)
+    RESCORE_WORKERS: int = 0
+    RESCORE_CHUNK_SIZE: int = 50000
+    RESCORE_PAGE_SIZE: int = 5000
+    
+    # Maintain per-owner pipeline aggregates on every lead write
+    LEAD_AGGREGATES_ENABLED: bool = True
+    
+    # Lead deduplication at ingestion. Requires scripts/add_lead_dedup_migration.sql
+    # (lead inserts go through its insert_leads function). POST /leads then saves
+    # synchronously, so it bypasses the write-behind buffer even when enabled.
+    LEAD_DEDUP_ENABLED: bool = False
+    LEAD_DEDUP_BLOOM_MAX_OWNERS: int = 256
+    LEAD_DEDUP_BLOOM_TTL_SECONDS: int = 3600
+    LEAD_DEDUP_BLOOM_ERROR_RATE: float = 0.01
+    
+    # Lead search settings
+    LEAD_SEARCH_BACKEND: str = "postgres"  # Options: "postgres", "memory"
+    LEAD_SEARCH_MAX_OWNERS: int = 64
+    LEAD_SEARCH_INDEX_TTL_SECONDS: int = 300
+    
+    # Lookalike lead search: cached per-owner embedding matrices (~30 bytes per lead)
+    LEAD_SIMILARITY_MAX_OWNERS: int = 8
+    LEAD_SIMILARITY_INDEX_TTL_SECONDS: int = 600
+    
+    # Lead delta sync: changes newer than this are held back until
+    # concurrent transactions touching them have committed
+    LEAD_SYNC_SETTLE_SECONDS: float = 2.0
     
     # CORS Settings
     BACKEND_CORS_ORIGINS: list[str] = [
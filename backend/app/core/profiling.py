@@ -0,0 +1,324 @@
+"""
+Opt-in request profiling.
+
+When PROFILING_ENABLED is set, ProfilingMiddleware runs selected requests
+under cProfile and writes the result to a bounded on-disk ring buffer that
+admins read through the /admin/profiles endpoints. A request is profiled
+when:
+
+- an admin sends `X-Profile: 1` with their bearer token, or
+- it matches the sampling rule (path prefixes, optional user emails and a
+  sample rate), which admins can change at runtime per worker process.
+
+With PROFILING_ENABLED unset the middleware is not installed at all, so
+unprofiled deployments pay nothing. Code paths carry no profiling hooks:
+the time breakdown (DB wait, validation, scoring, serialization) is
+derived from the profile's call graph afterwards, using the functions
+listed in PROFILE_PHASES as entry points.
+
+cProfile traces the event loop thread, so other requests interleaved with
+a profiled async request appear in its profile as well, and work handed
+to the thread pool (sync endpoints) is not traced. Only one request per
+process is profiled at a time.
+"""
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import security
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+# Entry points per phase as (file path suffix, function name or None for any function).
+# A phase's time is the time spent in these functions when called from outside the phase.
+PROFILE_PHASES: Dict[str, Sequence[Tuple[str, Optional[str]]]] = {
+    "db_wait": (("httpx/_client.py", "send"),),
+    "validation": (
+        ("pydantic/main.py", "__init__"),
+        ("pydantic/main.py", "model_validate"),
+        ("pydantic/type_adapter.py", "validate_python"),
+    ),
+    "scoring": (
+        ("app/services/scoring_engine.py", None),
+        ("app/services/scoring_rules.py", None),
+    ),
+    "serialization": (
+        ("fastapi/routing.py", "serialize_response"),
+        ("fastapi/encoders.py", "jsonable_encoder"),
+        ("starlette/responses.py", "render"),
+        ("app/services/lead_encoding.py", None),
+    ),
+}
+
+# Functions listed per stored profile
+TOP_FUNCTIONS = 40
+
+StatKey = Tuple[str, int, str]
+
+
+def _in_phase(key: StatKey, entry_points: Sequence[Tuple[str, Optional[str]]]) -> bool:
+    filename = key[0].replace(os.sep, "/")
+    return any(
+        filename.endswith(suffix) and (function is None or key[2] == function)
+        for suffix, function in entry_points
+    )
+
+
+def phase_breakdown(stats: Dict[StatKey, tuple]) -> Dict[str, float]:
+    """
+    Split profiled time into phases.
+
+    Args:
+        stats: cProfile stats, {(file, line, function): (cc, nc, tt, ct, callers)}
+
+    Returns:
+        Milliseconds per phase in PROFILE_PHASES. Phases can nest (e.g.
+        response-model validation happens inside serialization).
+    """
+    breakdown = {}
+    for phase, entry_points in PROFILE_PHASES.items():
+        seconds = 0.0
+        for key, (_, _, _, cumulative, callers) in stats.items():
+            if not _in_phase(key, entry_points):
+                continue
+            if not callers:
+                seconds += cumulative
+                continue
+            seconds += sum(
+                edge[3] for caller, edge in callers.items() if not _in_phase(caller, entry_points)
+            )
+        breakdown[phase] = round(seconds * 1000, 3)
+    return breakdown
+
+
+def top_functions(stats: Dict[StatKey, tuple], limit: int = TOP_FUNCTIONS) -> List[dict]:
+    """The functions with the highest cumulative time."""
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, function), (_, calls, total, cumulative, _) in ranked
+    ]
+
+
+class ProfileStore:
+    """Ring buffer of request profiles in a directory."""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding one .json summary and one .prof file per profile
+            max_profiles: Profiles kept; the oldest are deleted when more are saved
+        """
+        self._directory = directory
+        self._max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _paths(self, profile_id: str) -> Tuple[str, str]:
+        if not profile_id.replace("-", "").isalnum():
+            raise KeyError(profile_id)
+        base = os.path.join(self._directory, profile_id)
+        return base + ".json", base + ".prof"
+
+    def save(self, summary: dict, profiler: cProfile.Profile) -> None:
+        """Write a profile and drop the oldest ones beyond `max_profiles`."""
+        os.makedirs(self._directory, exist_ok=True)
+        summary_path, stats_path = self._paths(summary["id"])
+        pstats.Stats(profiler).dump_stats(stats_path)
+        with open(summary_path + ".tmp", "w") as f:
+            json.dump(summary, f)
+        os.replace(summary_path + ".tmp", summary_path)
+
+        with self._lock:
+            for profile_id in self.list_ids()[self._max_profiles:]:
+                for path in self._paths(profile_id):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def list_ids(self) -> List[str]:
+        """Stored profile IDs, newest first."""
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+        return sorted((name[:-5] for name in names if name.endswith(".json")), reverse=True)
+
+    def list_summaries(self, limit: int = 50) -> List[dict]:
+        """Summaries of the newest profiles, without their function lists."""
+        summaries = []
+        for profile_id in self.list_ids()[:limit]:
+            summary = self.get(profile_id)
+            if summary is not None:
+                summary.pop("top_functions", None)
+                summaries.append(summary)
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        """A stored profile summary, or None."""
+        try:
+            with open(self._paths(profile_id)[0]) as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def stats_path(self, profile_id: str) -> Optional[str]:
+        """Path of a profile's pstats file (for snakeviz, pstats etc.), or None."""
+        try:
+            path = self._paths(profile_id)[1]
+        except KeyError:
+            return None
+        return path if os.path.exists(path) else None
+
+
+@dataclass
+class SamplingRule:
+    """Which requests are profiled without an explicit header."""
+
+    rate: float = 0.0
+    paths: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+
+    def wants(self, path: str, subject: Optional[str]) -> bool:
+        if self.rate <= 0:
+            return False
+        if self.paths and not any(path.startswith(prefix) for prefix in self.paths):
+            return False
+        if self.emails and subject not in self.emails:
+            return False
+        return random.random() < self.rate
+
+
+def _bearer_subject(headers: Headers) -> Optional[str]:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return security.get_token_subject(token)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests into a ProfileStore."""
+
+    def __init__(self, app: ASGIApp, store: Optional[ProfileStore] = None, sampling: Optional[SamplingRule] = None):
+        self.app = app
+        self.store = store or get_profile_store()
+        self.sampling = sampling or get_sampling_rule()
+        self._busy = threading.Lock()
+
+    def _trigger(self, scope: Scope) -> Tuple[Optional[str], Optional[str]]:
+        """Return (trigger, subject) if the request should be profiled, else (None, None)."""
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) == "1":
+            subject = _bearer_subject(headers)
+            if subject is not None and subject in settings.ADMIN_EMAILS:
+                return "header", subject
+        if self.sampling.rate > 0:
+            subject = _bearer_subject(headers) if self.sampling.emails else None
+            if self.sampling.wants(scope["path"], subject):
+                return "sample", subject
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger, subject = self._trigger(scope)
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                profiler.disable()
+        finally:
+            self._busy.release()
+
+        request = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status_code": status_code,
+            "subject": subject,
+            "trigger": trigger,
+            "started_at": started_at.isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        try:
+            await asyncio.to_thread(self._save, request, profiler)
+        except OSError:
+            logger.exception("Failed to save the profile of %s %s", scope["method"], scope["path"])
+
+    def _save(self, request: dict, profiler: cProfile.Profile) -> None:
+        profiler.create_stats()
+        summary = {
+            "id": f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}",
+            **request,
+            "phases_ms": phase_breakdown(profiler.stats),
+            "top_functions": top_functions(profiler.stats),
+        }
+        self.store.save(summary, profiler)
+
+
+# Profile store and sampling rule singletons
+_profile_store: Optional[ProfileStore] = None
+_sampling_rule: Optional[SamplingRule] = None
+
+
+def get_profile_store() -> ProfileStore:
+    """Get the process-wide profile store."""
+    global _profile_store
+
+    if _profile_store is None:
+        _profile_store = ProfileStore(settings.PROFILING_DIR, max_profiles=settings.PROFILING_MAX_PROFILES)
+    return _profile_store
+
+
+def get_sampling_rule() -> SamplingRule:
+    """Get this process's sampling rule, initialized from settings."""
+    global _sampling_rule
+
+    if _sampling_rule is None:
+        _sampling_rule = SamplingRule(
+            rate=settings.PROFILING_SAMPLE_RATE,
+            paths=list(settings.PROFILING_SAMPLE_PATHS),
+            emails=list(settings.PROFILING_SAMPLE_EMAILS),
+        )
+    return _sampling_rule
@@ -3,10 +3,89 @@ AI CRM Lead Scoring API - Main Entry Point
 
 FastAPI application with CORS middleware and API router configuration.
 """
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.profiling import ProfilingMiddleware
+from app.api.deps import get_current_admin, get_lead_event_buffer
 from app.api.v1.router import router as api_v1_router
+from app.models.user import UserResponse
+from app.repositories.lead_repo import get_lead_writer
+from app.services.follow_ups import get_follow_up_scheduler
+from app.services.job_handlers import get_job_runner
+from app.services.readiness import get_readiness_probe
+from app.services.scoring_rules import get_scoring_rules_watcher
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan.
+    
+    Starts background workers on startup and drains them on shutdown.
+    Uvicorn runs the shutdown phase on SIGTERM, so buffered lead writes
+    are flushed before the worker exits.
+    
+    Warm-up runs in the background after startup; /ready reports the
+    worker as not ready until it has finished.
+    
+    Components are stopped in reverse start order. If one fails to start,
+    those already started are still stopped before the error propagates.
+    """
+    async with AsyncExitStack() as stack:
+        readiness_probe = get_readiness_probe()
+        await readiness_probe.start()
+        stack.push_async_callback(readiness_probe.stop)
+        
+        lead_writer = get_lead_writer()
+        if lead_writer is not None:
+            await lead_writer.start()
+            stack.push_async_callback(lead_writer.stop)
+            if settings.LEAD_DEDUP_ENABLED:
+                logger.warning(
+                    "LEAD_DEDUP_ENABLED and LEAD_WRITE_BEHIND_ENABLED are both set; "
+                    "deduplicated lead creation saves synchronously and bypasses the write-behind buffer"
+                )
+        
+        # Coalesced interaction event writes
+        lead_event_buffer = get_lead_event_buffer()
+        if lead_event_buffer is not None:
+            await lead_event_buffer.start()
+            stack.push_async_callback(lead_event_buffer.stop)
+        
+        # Hot-reload the YAML scoring rules
+        rules_watcher = get_scoring_rules_watcher()
+        if rules_watcher is not None and settings.SCORING_RULES_WATCH:
+            stop_watching = asyncio.Event()
+            watch_task = asyncio.create_task(rules_watcher.watch(stop_event=stop_watching))
+            
+            async def stop_watcher() -> None:
+                stop_watching.set()
+                await watch_task
+            
+            stack.push_async_callback(stop_watcher)
+        
+        # Background job workers
+        job_runner = get_job_runner()
+        if job_runner is not None:
+            await job_runner.start()
+            stack.push_async_callback(job_runner.stop)
+        
+        # Follow-up reminders for stalled leads
+        follow_up_scheduler = get_follow_up_scheduler()
+        if follow_up_scheduler is not None:
+            await follow_up_scheduler.start()
+            stack.push_async_callback(follow_up_scheduler.stop)
+        
+        yield
 
 
 # Initialize FastAPI application
@@ -40,7 +119,8 @@ app = FastAPI(
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS middleware
@@ -52,6 +132,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli when available, else gzip)
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES)
+
+# Opt-in request profiling, outermost so compression is included; not installed unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include API v1 router
 app.include_router(api_v1_router, prefix=settings.API_V1_STR)
 
@@ -89,3 +177,41 @@ async def health_check():
         "api_prefix": settings.API_V1_STR,
         "project_name": settings.PROJECT_NAME
     }
+
+
+@app.get(
+    "/ready",
+    tags=["Health"],
+    summary="Readiness Check",
+    description="Whether this worker has warmed up and can reach the database. "
+                "Returns 503 while it is not ready."
+)
+async def readiness_check():
+    """
+    Readiness endpoint for load balancers.
+    
+    Returns the cached result of the background readiness probe, so
+    probing it does not query the database.
+    """
+    readiness = get_readiness_probe().status()
+    return JSONResponse(
+        readiness,
+        status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Process Metrics",
+    description="Get in-process counters and histograms for this worker. Restricted to ADMIN_EMAILS."
+)
+async def get_metrics(admin: UserResponse = Depends(get_current_admin)):
+    """
+    Metrics endpoint.
+    
+    Returns a snapshot of the in-process metrics registry. Metrics reveal
+    traffic and failure volumes, so like the /admin endpoints this
+    requires an admin bearer token.
+    """
+    return metrics.snapshot()
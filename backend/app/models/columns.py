@@ -0,0 +1,88 @@
+"""
+Columnar (structure-of-arrays) representation of leads.
+
+Used by batch paths such as bulk scoring and data generation, where
+building one Pydantic object per lead would dominate the run time.
+"""
+from dataclasses import dataclass, fields
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from app.models.schemas import LeadInput, Stage
+
+
+@dataclass
+class LeadColumns:
+    """Lead attributes stored as one NumPy array per field."""
+    
+    lead_id: np.ndarray
+    industry: np.ndarray
+    channel: np.ndarray
+    company_size: np.ndarray
+    interaction_count: np.ndarray
+    last_interaction_days_ago: np.ndarray
+    has_requested_pricing: np.ndarray
+    has_demo_request: np.ndarray
+    stage: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.lead_id)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "LeadColumns":
+        """Build columns from database rows or plain dictionaries."""
+        return cls(
+            lead_id=np.array([row["lead_id"] for row in rows], dtype=object),
+            industry=np.array([row["industry"] for row in rows], dtype=object),
+            channel=np.array([row["channel"] for row in rows], dtype=object),
+            company_size=np.fromiter((row["company_size"] for row in rows), dtype=np.int64, count=len(rows)),
+            interaction_count=np.fromiter((row["interaction_count"] for row in rows), dtype=np.int64, count=len(rows)),
+            last_interaction_days_ago=np.fromiter(
+                (row.get("last_interaction_days_ago") or 0 for row in rows), dtype=np.int64, count=len(rows)
+            ),
+            has_requested_pricing=np.fromiter((row["has_requested_pricing"] for row in rows), dtype=bool, count=len(rows)),
+            has_demo_request=np.fromiter((row["has_demo_request"] for row in rows), dtype=bool, count=len(rows)),
+            stage=np.array([row.get("stage") or Stage.NEW.value for row in rows], dtype=object),
+        )
+    
+    @classmethod
+    def from_leads(cls, leads: Iterable[LeadInput]) -> "LeadColumns":
+        """Build columns from validated LeadInput objects."""
+        return cls.from_rows([
+            {**lead.model_dump(), "stage": lead.stage.value} for lead in leads
+        ])
+    
+    @classmethod
+    def concat(cls, parts: Sequence["LeadColumns"]) -> "LeadColumns":
+        """Concatenate batches into one (an empty batch if there are none)."""
+        if not parts:
+            return cls.from_rows([])
+        return cls(**{
+            field.name: np.concatenate([getattr(part, field.name) for part in parts])
+            for field in fields(cls)
+        })
+    
+    def slice(self, start: int, stop: int) -> "LeadColumns":
+        """Return a view over rows [start, stop)."""
+        return LeadColumns(**{
+            field.name: getattr(self, field.name)[start:stop] for field in fields(self)
+        })
+    
+    def to_leads(self) -> List[LeadInput]:
+        """Convert back to LeadInput objects without re-running validation."""
+        return [
+            LeadInput.model_construct(
+                lead_id=self.lead_id[i],
+                industry=self.industry[i],
+                company_size=int(self.company_size[i]),
+                channel=self.channel[i],
+                interaction_count=int(self.interaction_count[i]),
+                last_interaction_days_ago=int(self.last_interaction_days_ago[i]),
+                last_interaction_date=None,
+                has_requested_pricing=bool(self.has_requested_pricing[i]),
+                has_demo_request=bool(self.has_demo_request[i]),
+                stage=Stage(self.stage[i]),
+            )
+            for i in range(len(self))
+        ]
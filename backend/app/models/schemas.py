@@ -2,7 +2,7 @@
 Pydantic models (schemas) for data validation.
 """
 from enum import Enum
-from typing import List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any, Union
 from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict, model_validator
 
@@ -23,7 +23,29 @@ class Stage(str, Enum):
     REJECTED = "rejected"
 
 
-class LeadInput(BaseModel):
+class LeadBase(BaseModel):
+    """
+    Lead fields without cross-field validation.
+    
+    Used by the bulk validation path, which derives
+    last_interaction_days_ago for a whole batch before validating.
+    """
+    
+    lead_id: str = Field(..., description="Unique identifier for the lead")
+    industry: str = Field(..., description="Industry of the lead's company")
+    company_size: int = Field(..., ge=1, description="Number of employees in the company")
+    channel: str = Field(..., description="Acquisition channel (e.g., Website, Referral, LinkedIn)")
+    interaction_count: int = Field(..., ge=0, description="Total number of interactions with the lead")
+    last_interaction_days_ago: Optional[int] = Field(None, ge=0, description="Days since the last interaction")
+    last_interaction_date: Optional[date] = Field(None, description="Date of the last interaction (YYYY-MM-DD)")
+    has_requested_pricing: bool = Field(..., description="Whether the lead has requested pricing information")
+    has_demo_request: bool = Field(..., description="Whether the lead has requested a demo")
+    stage: Stage = Field(default=Stage.NEW, description="Pipeline stage")
+    contact_email: Optional[str] = Field(None, max_length=320, description="Contact email, used to detect duplicate leads")
+    company_name: Optional[str] = Field(None, max_length=200, description="Company name (not used to detect duplicates)")
+
+
+class LeadInput(LeadBase):
     """Input model for lead scoring."""
     
     model_config = ConfigDict(
@@ -42,17 +64,6 @@ class LeadInput(BaseModel):
         }
     )
     
-    lead_id: str = Field(..., description="Unique identifier for the lead")
-    industry: str = Field(..., description="Industry of the lead's company")
-    company_size: int = Field(..., ge=1, description="Number of employees in the company")
-    channel: str = Field(..., description="Acquisition channel (e.g., Website, Referral, LinkedIn)")
-    interaction_count: int = Field(..., ge=0, description="Total number of interactions with the lead")
-    last_interaction_days_ago: Optional[int] = Field(None, ge=0, description="Days since the last interaction")
-    last_interaction_date: Optional[date] = Field(None, description="Date of the last interaction (YYYY-MM-DD)")
-    has_requested_pricing: bool = Field(..., description="Whether the lead has requested pricing information")
-    has_demo_request: bool = Field(..., description="Whether the lead has requested a demo")
-    stage: Stage = Field(default=Stage.NEW, description="Pipeline stage")
-
     @model_validator(mode='before')
     @classmethod
     def calculate_days_ago(cls, data: Any) -> Any:
@@ -129,6 +140,52 @@ class LeadResponse(LeadInput):
     score_details: ScoringResult = Field(..., description="Scoring result details")
 
 
+class LeadFilters(BaseModel):
+    """Server-side filters for lead list queries."""
+    
+    industry: Optional[str] = Field(None, description="Only leads in this industry")
+    channel: Optional[str] = Field(None, description="Only leads from this acquisition channel")
+    stage: Optional[Stage] = Field(None, description="Only leads in this pipeline stage")
+    priority: Optional[Priority] = Field(None, description="Only leads with this priority")
+    min_score: Optional[int] = Field(None, ge=0, le=100, description="Minimum score (inclusive)")
+    max_score: Optional[int] = Field(None, ge=0, le=100, description="Maximum score (inclusive)")
+    limit: Optional[int] = Field(None, ge=1, le=10000, description="Maximum number of leads to return")
+    offset: int = Field(0, ge=0, description="Number of leads to skip")
+
+
+class LeadSearchResponse(BaseModel):
+    """Ranked, paginated lead search results."""
+    
+    query: str = Field(..., description="The search text")
+    results: List[LeadResponse] = Field(default_factory=list, description="Matching leads, best match first")
+    limit: int = Field(..., description="Page size")
+    offset: int = Field(..., description="Number of results skipped")
+    has_more: bool = Field(..., description="Whether more results exist after this page")
+
+
+class SimilarLead(BaseModel):
+    """A lead with its similarity to a reference lead."""
+    
+    lead: LeadResponse
+    similarity: float = Field(..., ge=-1, le=1, description="Cosine similarity of the leads' features")
+
+
+class SimilarLeadsResponse(BaseModel):
+    """Leads most similar to a reference lead."""
+    
+    lead_id: str = Field(..., description="The reference lead")
+    results: List[SimilarLead] = Field(default_factory=list, description="Similar leads, most similar first")
+
+
+class LeadChangesResponse(BaseModel):
+    """Leads changed and deleted since a sync cursor."""
+    
+    leads: List[LeadResponse] = Field(default_factory=list, description="Leads inserted or updated since the cursor, oldest change first")
+    deleted: List[str] = Field(default_factory=list, description="Lead IDs deleted since the cursor; apply before `leads`")
+    cursor: str = Field(..., description="Cursor to pass as `since` on the next call")
+    has_more: bool = Field(..., description="Whether more changes are available right away")
+
+
 class DashboardSummary(BaseModel):
     """Summary statistics for the dashboard."""
     
@@ -149,6 +206,52 @@ class DashboardSummary(BaseModel):
     cold_leads: int = Field(..., ge=0, description="Number of cold leads (score 0-39)")
 
 
+class BreakdownBucket(BaseModel):
+    """Lead count and average score for one bucket of an analytics breakdown."""
+    
+    key: str = Field(..., description="Bucket label (stage, priority, industry, channel or score range)")
+    count: int = Field(..., ge=0, description="Number of leads in the bucket")
+    average_score: float = Field(..., ge=0, description="Mean score of leads in the bucket")
+
+
+class PipelineAnalytics(BaseModel):
+    """Pipeline analytics served from incrementally maintained aggregates."""
+    
+    total_leads: int = Field(..., ge=0, description="Total number of leads")
+    average_score: float = Field(..., ge=0, description="Mean score across all leads")
+    by_priority: List[BreakdownBucket] = Field(default_factory=list, description="Hot, Warm and Cold counts")
+    funnel: List[BreakdownBucket] = Field(default_factory=list, description="Lead counts per pipeline stage, in pipeline order")
+    score_histogram: List[BreakdownBucket] = Field(default_factory=list, description="Lead counts per 10-point score range")
+    by_industry: List[BreakdownBucket] = Field(default_factory=list, description="Breakdown by industry, largest first")
+    by_channel: List[BreakdownBucket] = Field(default_factory=list, description="Breakdown by acquisition channel, largest first")
+
+
+class PipelineSnapshot(BaseModel):
+    """Daily snapshot of an owner's pipeline."""
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "snapshot_date": "2025-01-31",
+                "total_leads": 20,
+                "hot_leads": 5,
+                "warm_leads": 8,
+                "cold_leads": 7,
+                "stage_counts": {"new": 12, "meeting": 4, "negotiation": 2, "closed": 1, "rejected": 1},
+                "mean_score": 48.5
+            }
+        }
+    )
+    
+    snapshot_date: date = Field(..., description="Day the snapshot was taken")
+    total_leads: int = Field(..., ge=0, description="Total number of leads")
+    hot_leads: int = Field(..., ge=0, description="Number of hot leads")
+    warm_leads: int = Field(..., ge=0, description="Number of warm leads")
+    cold_leads: int = Field(..., ge=0, description="Number of cold leads")
+    stage_counts: Dict[str, int] = Field(default_factory=dict, description="Lead count per pipeline stage")
+    mean_score: float = Field(..., ge=0, description="Mean lead score")
+
+
 class ActionItem(BaseModel):
     """Action item for sales representatives."""
     
@@ -167,6 +270,13 @@ class ActionItem(BaseModel):
     action_text: str = Field(..., description="Description of the action to take")
     is_done: bool = Field(default=False, description="Whether the action has been completed")
     lead_id: str = Field(..., description="Associated lead ID")
+    due_at: Optional[datetime] = Field(None, description="When a scheduled follow-up became due")
+
+
+class ActionItemUpdate(BaseModel):
+    """Request model for updating a persisted action item."""
+    
+    is_done: bool = Field(..., description="Whether the action has been completed")
 
 
 class StageUpdateRequest(BaseModel):
@@ -181,3 +291,369 @@ class StageUpdateRequest(BaseModel):
     )
     
     stage: Stage = Field(..., description="New pipeline stage")
+
+
+class StageTransition(BaseModel):
+    """A single lead stage transition within a bulk update."""
+    
+    lead_id: str = Field(..., description="The lead ID to update")
+    stage: Stage = Field(..., description="New pipeline stage")
+
+
+class BulkStageUpdateRequest(BaseModel):
+    """Request model for moving many leads between pipeline stages at once."""
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "transitions": [
+                    {"lead_id": "LEAD-001", "stage": "meeting"},
+                    {"lead_id": "LEAD-002", "stage": "meeting"},
+                    {"lead_id": "LEAD-003", "stage": "negotiation"}
+                ]
+            }
+        }
+    )
+    
+    transitions: List[StageTransition] = Field(
+        ..., min_length=1, max_length=5000, description="Lead ID and target stage pairs"
+    )
+
+
+class BulkStageUpdateResponse(BaseModel):
+    """Result of a bulk stage update."""
+    
+    updated: List[LeadResponse] = Field(default_factory=list, description="Leads that were moved")
+    not_found: List[str] = Field(default_factory=list, description="Lead IDs that do not exist for this owner")
+
+
+class ScoringWeights(BaseModel):
+    """Points and thresholds of the rule-based scoring engine."""
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "name": "pricing-heavy",
+                "pricing_request_points": 40,
+                "demo_request_points": 10,
+                "hot_threshold": 75
+            }
+        }
+    )
+    
+    name: Optional[str] = Field(None, description="Label for this configuration")
+    engagement_points_per_interaction: int = Field(5, ge=0, description="Points per interaction")
+    engagement_max_points: int = Field(25, ge=0, description="Cap on engagement points")
+    recency_threshold_days: int = Field(7, ge=0, description="Interactions within this many days count as recent")
+    recency_points: int = Field(20, ge=0, description="Points for a recent interaction")
+    pricing_request_points: int = Field(30, ge=0, description="Points for a pricing request")
+    demo_request_points: int = Field(15, ge=0, description="Points for a demo request")
+    large_company_threshold: int = Field(50, ge=0, description="Companies above this many employees count as large")
+    large_company_points: int = Field(10, ge=0, description="Points for a large company")
+    max_score: int = Field(100, ge=0, le=100, description="Score cap")
+    hot_threshold: int = Field(70, ge=0, le=100, description="Minimum score for Hot")
+    warm_threshold: int = Field(40, ge=0, le=100, description="Minimum score for Warm")
+    
+    @model_validator(mode='after')
+    def check_thresholds(self) -> 'ScoringWeights':
+        if self.warm_threshold > self.hot_threshold:
+            raise ValueError("warm_threshold must not exceed hot_threshold")
+        return self
+
+
+class ScoringSimulationRequest(BaseModel):
+    """Candidate scoring configurations to evaluate against the owner's leads."""
+    
+    candidates: List[ScoringWeights] = Field(
+        ..., min_length=1, max_length=20, description="Configurations to simulate"
+    )
+    baseline: Optional[ScoringWeights] = Field(
+        None, description="Configuration to compare against (defaults to the engine your leads are scored with)"
+    )
+    max_changed_leads: int = Field(
+        100, ge=0, le=10000, description="Maximum number of changed leads listed per candidate"
+    )
+
+
+class TierChange(BaseModel):
+    """A lead whose priority would change under a candidate configuration."""
+    
+    lead_id: str = Field(..., description="The lead ID")
+    current_score: int = Field(..., ge=0, le=100, description="Score under the baseline configuration")
+    simulated_score: int = Field(..., ge=0, le=100, description="Score under the candidate configuration")
+    current_priority: Priority = Field(..., description="Priority under the baseline configuration")
+    simulated_priority: Priority = Field(..., description="Priority under the candidate configuration")
+
+
+class CandidateSimulation(BaseModel):
+    """Simulation result for one candidate configuration."""
+    
+    weights: Optional[ScoringWeights] = Field(
+        None, description="The simulated configuration; null for a baseline scored by the live YAML rules or AI model"
+    )
+    priority_counts: Dict[str, int] = Field(default_factory=dict, description="Lead count per priority")
+    average_score: float = Field(..., ge=0, description="Mean simulated score")
+    changed_count: int = Field(..., ge=0, description="Number of leads whose priority would change")
+    transitions: Dict[str, int] = Field(
+        default_factory=dict, description="Counts of priority changes, keyed as 'Cold->Warm'"
+    )
+    changed_leads: List[TierChange] = Field(
+        default_factory=list, description="Leads that would change priority, biggest score change first"
+    )
+
+
+class ScoringSimulationResponse(BaseModel):
+    """Result of a scoring what-if simulation."""
+    
+    total_leads: int = Field(..., ge=0, description="Number of leads evaluated")
+    baseline: CandidateSimulation = Field(..., description="Distribution under the baseline configuration")
+    candidates: List[CandidateSimulation] = Field(default_factory=list, description="One result per candidate, in request order")
+
+
+class RuleCondition(BaseModel):
+    """A single comparison against a lead field."""
+    
+    field: str = Field(..., description="Lead field to test (e.g., company_size, has_demo_request, stage)")
+    op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "not in"] = Field("==", description="Comparison operator")
+    value: Union[bool, int, float, str, List[Union[int, str]]] = Field(..., description="Value to compare with")
+
+
+class ScoringRule(BaseModel):
+    """
+    One declarative scoring rule.
+    
+    A rule awards `points` when all `when` conditions hold. With `per`,
+    the points are multiplied by that numeric field and capped at
+    `max_points`.
+    """
+    
+    name: str = Field(..., description="Rule identifier")
+    when: List[RuleCondition] = Field(default_factory=list, description="Conditions that must all hold")
+    points: int = Field(..., description="Points awarded (per unit when `per` is set)")
+    per: Optional[str] = Field(None, description="Numeric lead field the points are multiplied by")
+    max_points: Optional[int] = Field(None, description="Cap on the points awarded by this rule")
+    explanation: str = Field(
+        "", description="Explanation template; may use {points}, {value} (first condition) and {max_points}"
+    )
+
+
+class ScoringRuleSet(BaseModel):
+    """A complete rule-based scoring configuration, as loaded from YAML."""
+    
+    version: int = Field(1, description="Rule file format version")
+    max_score: int = Field(100, ge=0, le=100, description="Score cap")
+    hot_threshold: int = Field(70, ge=0, le=100, description="Minimum score for Hot")
+    warm_threshold: int = Field(40, ge=0, le=100, description="Minimum score for Warm")
+    rules: List[ScoringRule] = Field(..., min_length=1, description="Rules, in explanation order")
+    
+    @model_validator(mode='after')
+    def check_rules(self) -> 'ScoringRuleSet':
+        if self.warm_threshold > self.hot_threshold:
+            raise ValueError("warm_threshold must not exceed hot_threshold")
+        names = [rule.name for rule in self.rules]
+        if len(names) != len(set(names)):
+            raise ValueError("rule names must be unique")
+        return self
+
+
+class ScoringProfileUpdate(BaseModel):
+    """Request model for saving an owner's scoring profile."""
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "engine_type": "rule_based",
+                "weights": {"pricing_request_points": 40, "hot_threshold": 75}
+            }
+        }
+    )
+    
+    engine_type: Literal["rule_based", "ai"] = Field(
+        "rule_based",
+        description="Scoring engine to use; rule_based scores with `weights` in place of the shared YAML rules"
+    )
+    weights: ScoringWeights = Field(
+        default_factory=ScoringWeights, description="Rule weights and thresholds (rule_based engine only)"
+    )
+
+
+class ScoringProfile(ScoringProfileUpdate):
+    """An owner's saved scoring profile."""
+    
+    version: int = Field(..., ge=0, description="Profile version; 0 means the owner uses the default configuration")
+    updated_at: Optional[datetime] = Field(None, description="When the profile was last saved")
+    active_engine: Optional[Literal["rules", "rule_based", "ai"]] = Field(
+        None,
+        description="Engine that scores the owner's leads: 'rules' for the shared YAML rules, "
+                    "'rule_based' for `weights`, 'ai' for the model"
+    )
+
+
+class BulkLeadCreateRequest(BaseModel):
+    """Request model for creating many leads at once."""
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "leads": [
+                    {
+                        "lead_id": "LEAD-001",
+                        "industry": "Technology",
+                        "company_size": 150,
+                        "channel": "Website",
+                        "interaction_count": 8,
+                        "last_interaction_date": "2024-05-01",
+                        "has_requested_pricing": True,
+                        "has_demo_request": False
+                    }
+                ]
+            }
+        }
+    )
+    
+    # Rows are validated as LeadInput by the bulk validation path, not here,
+    # so one bad row does not reject the whole request
+    leads: List[Dict[str, Any]] = Field(
+        ..., min_length=1, max_length=100000, description="Lead objects in the LeadInput format"
+    )
+
+
+class LeadRowError(BaseModel):
+    """Validation errors for one row of a bulk request."""
+    
+    index: int = Field(..., ge=0, description="Position of the row in the request")
+    lead_id: Optional[str] = Field(None, description="The row's lead ID, if it had one")
+    errors: List[str] = Field(default_factory=list, description="Validation messages, as 'field: message'")
+
+
+class BulkLeadResult(BaseModel):
+    """Score of one lead created by a bulk request."""
+    
+    lead_id: str = Field(..., description="The lead ID")
+    score: int = Field(..., ge=0, le=100, description="Lead score from 0 to 100")
+    priority: Priority = Field(..., description="Priority classification based on score")
+    merged: bool = Field(False, description="Whether the row was merged into an existing lead or an earlier row")
+
+
+class BulkLeadCreateResponse(BaseModel):
+    """Result of a bulk lead creation."""
+    
+    created: int = Field(..., ge=0, description="Number of leads scored and saved")
+    merged: int = Field(0, ge=0, description="Number of rows merged into existing leads or earlier rows")
+    failed: int = Field(..., ge=0, description="Number of rows rejected by validation")
+    results: List[BulkLeadResult] = Field(default_factory=list, description="Scores of the created leads, in request order")
+    errors: List[LeadRowError] = Field(default_factory=list, description="Per-row validation errors")
+
+
+class RescoreJobStatus(BaseModel):
+    """Progress of a full rescore of one owner's leads."""
+    
+    job_id: str = Field(..., description="Rescore job ID")
+    status: Literal["running", "completed", "failed"] = Field(..., description="Job state")
+    dry_run: bool = Field(False, description="Whether changed scores are only counted, not written")
+    total_leads: int = Field(0, ge=0, description="Leads owned when the job started")
+    scanned: int = Field(0, ge=0, description="Leads rescored so far")
+    changed: int = Field(0, ge=0, description="Leads whose score or priority changed")
+    chunks_done: int = Field(0, ge=0, description="Key ranges finished")
+    chunks_total: Optional[int] = Field(None, description="Key ranges in total, once known")
+    workers: int = Field(..., ge=1, description="Worker processes used")
+    elapsed_seconds: float = Field(0.0, ge=0, description="Time since the job started")
+    leads_per_second: float = Field(0.0, ge=0, description="Rescoring throughput so far")
+    error: Optional[str] = Field(None, description="Failure reason, if the job failed")
+
+
+class JobStatus(BaseModel):
+    """State and progress of a background job."""
+    
+    id: str = Field(..., description="Job ID")
+    kind: str = Field(..., description="Job type, e.g. 'lead_import' or 'rescore'")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="Job state")
+    attempts: int = Field(0, ge=0, description="Attempts started so far")
+    max_attempts: int = Field(..., ge=1, description="Attempts before the job fails")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Job-specific progress counters")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job-specific result, once succeeded")
+    error: Optional[str] = Field(None, description="Error of the last failed attempt")
+    created_at: datetime = Field(..., description="When the job was enqueued")
+    started_at: Optional[datetime] = Field(None, description="When the first attempt started")
+    finished_at: Optional[datetime] = Field(None, description="When the job succeeded or failed")
+    next_attempt_at: Optional[datetime] = Field(None, description="When a retry is scheduled")
+
+
+class LeadImportRequest(BaseModel):
+    """Request model for a background lead import."""
+    
+    leads: List[Dict[str, Any]] = Field(
+        ..., min_length=1, max_length=200000,
+        description="Lead objects in the same format as POST /leads"
+    )
+
+
+class LeadEventType(str, Enum):
+    """Tracked interactions with a lead."""
+    EMAIL_OPEN = "email_open"
+    EMAIL_CLICK = "email_click"
+    PAGE_VIEW = "page_view"
+    FORM_SUBMIT = "form_submit"
+    CALL = "call"
+    MEETING = "meeting"
+    PRICING_REQUEST = "pricing_request"
+    DEMO_REQUEST = "demo_request"
+
+
+class LeadEvent(BaseModel):
+    """One tracked interaction with a lead."""
+    
+    type: LeadEventType = Field(..., description="Interaction type; pricing and demo requests also set the lead's intent flags")
+    occurred_at: Optional[datetime] = Field(
+        None, description="When the interaction happened (UTC if no offset is given); defaults to when it is received"
+    )
+
+
+class LeadEventBatchItem(LeadEvent):
+    """An interaction event for a given lead."""
+    
+    lead_id: str = Field(..., min_length=1, description="Lead the interaction belongs to")
+
+
+class LeadEventBatchRequest(BaseModel):
+    """Request model for ingesting interaction events for many leads."""
+    
+    events: List[LeadEventBatchItem] = Field(..., min_length=1, max_length=10000, description="Events in any order")
+
+
+class LeadEventsResponse(BaseModel):
+    """Result of submitting interaction events."""
+    
+    accepted: int = Field(..., ge=0, description="Events accepted")
+    queued: bool = Field(..., description="Whether the events were queued for a coalesced write rather than applied")
+    leads_updated: Optional[int] = Field(None, description="Leads whose counters were updated, when applied directly")
+    leads_rescored: Optional[int] = Field(None, description="Leads whose score or priority changed, when applied directly")
+
+
+class ProfilingSampling(BaseModel):
+    """Rule for profiling requests without the X-Profile header."""
+    
+    rate: float = Field(0.0, ge=0, le=1, description="Fraction of matching requests to profile (0 disables sampling)")
+    paths: List[str] = Field(default_factory=list, description="Path prefixes to sample; empty for all paths")
+    emails: List[str] = Field(default_factory=list, description="Only sample requests from these users; empty for all users")
+
+
+class RequestProfileSummary(BaseModel):
+    """A stored request profile."""
+    
+    id: str = Field(..., description="Profile ID")
+    method: str = Field(..., description="HTTP method")
+    path: str = Field(..., description="Request path")
+    query: str = Field("", description="Query string")
+    status_code: int = Field(..., description="Response status code")
+    subject: Optional[str] = Field(None, description="Requesting user, if known")
+    trigger: Literal["header", "sample"] = Field(..., description="Why the request was profiled")
+    started_at: datetime = Field(..., description="When the request started")
+    duration_ms: float = Field(..., description="Wall time of the request while profiled")
+    phases_ms: Dict[str, float] = Field(default_factory=dict, description="Time in DB wait, validation, scoring and serialization")
+
+
+class RequestProfile(RequestProfileSummary):
+    """A stored request profile with its most expensive functions."""
+    
+    top_functions: List[Dict[str, Any]] = Field(default_factory=list, description="Functions by cumulative time")
@@ -0,0 +1,105 @@
+"""
+Action Item Repository - Persisted action items in Supabase
+
+Stores the `action_items` table, filled by the follow-up reminder
+scheduler (app/services/follow_ups.py) and worked off by sales reps.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from supabase import Client
+
+from app.core.database import get_supabase_client
+from app.models.schemas import ActionItem
+
+
+class ActionItemRepository:
+    """Repository for persisted action items."""
+    
+    TABLE_NAME = "action_items"
+    
+    def __init__(self, client: Client):
+        """Initialize the repository with a Supabase client."""
+        self._client = client
+    
+    def list_open(self, owner_id: str, limit: int = 20) -> List[ActionItem]:
+        """
+        Get an owner's open action items, oldest deadline first.
+        
+        Args:
+            owner_id: The owner ID
+            limit: Maximum items to return
+            
+        Returns:
+            Open ActionItem objects
+        """
+        response = self._client.table(self.TABLE_NAME)\
+            .select("*")\
+            .eq("owner_id", owner_id)\
+            .eq("is_done", False)\
+            .order("due_at")\
+            .limit(limit)\
+            .execute()
+        return [self._row_to_action_item(row) for row in response.data]
+    
+    def set_done(self, owner_id: str, action_id: str, is_done: bool) -> Optional[ActionItem]:
+        """
+        Mark an action item as done or open again.
+        
+        Returns:
+            The updated ActionItem, or None if the owner has no such item
+        """
+        response = self._client.table(self.TABLE_NAME)\
+            .update({
+                "is_done": is_done,
+                "done_at": datetime.now(timezone.utc).isoformat() if is_done else None,
+            })\
+            .eq("id", action_id)\
+            .eq("owner_id", owner_id)\
+            .execute()
+        return self._row_to_action_item(response.data[0]) if response.data else None
+    
+    def fire_follow_ups(
+        self, lead_ids: Sequence[str], follow_up_days: Dict[str, int], now: datetime
+    ) -> List[dict]:
+        """
+        File follow-up reminders for leads whose deadline has passed.
+        
+        Deadlines are recomputed from the leads' current rows, so leads
+        changed or deleted since they were scheduled are skipped.
+        
+        Args:
+            lead_ids: Lead row UUIDs whose scheduled deadline expired
+            follow_up_days: Days without interaction before a follow-up, per stage
+            now: Current time
+            
+        Returns:
+            {"id", "due_at", "fired"} for each lead that still exists;
+            due_at is None for stages without follow-ups
+        """
+        if not lead_ids:
+            return []
+        response = self._client.rpc("fire_follow_up_reminders", {
+            "p_ids": list(lead_ids),
+            "p_follow_up_days": follow_up_days,
+            "p_now": now.isoformat(),
+        }).execute()
+        return response.data or []
+    
+    def _row_to_action_item(self, row: dict) -> ActionItem:
+        """Convert a database row to an ActionItem."""
+        return ActionItem(
+            id=row["id"],
+            action_text=row["action_text"],
+            is_done=row["is_done"],
+            lead_id=row["lead_id"],
+            due_at=row.get("due_at"),
+        )
+
+
+def get_action_item_repository() -> ActionItemRepository:
+    """
+    Factory function for dependency injection.
+    Returns an ActionItemRepository instance with Supabase client.
+    """
+    return ActionItemRepository(get_supabase_client())
@@ -0,0 +1,190 @@
+"""
+Analytics Repository - Per-owner pipeline aggregates in Supabase
+
+Stores and updates the `lead_aggregates` table maintained alongside leads.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Sequence
+
+from supabase import Client
+
+from app.core.database import get_supabase_client
+from app.models.schemas import PipelineSnapshot
+from app.services.analytics import Aggregates
+
+
+def _quote(value: str) -> str:
+    """Quote a value for a PostgREST logical (or/and) filter."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class AnalyticsRepository:
+    """Repository for the per-owner lead aggregate table."""
+    
+    TABLE_NAME = "lead_aggregates"
+    SNAPSHOT_TABLE_NAME = "pipeline_snapshots"
+    
+    def __init__(self, client: Client):
+        """Initialize the repository with a Supabase client."""
+        self._client = client
+    
+    def get_aggregates(self, owner_id: str) -> Aggregates:
+        """
+        Get all aggregate buckets for an owner.
+        
+        Returns:
+            Lead count and score sum keyed by (dimension, bucket)
+        """
+        response = self._client.table(self.TABLE_NAME)\
+            .select("dimension,bucket,lead_count,score_sum")\
+            .eq("owner_id", owner_id)\
+            .execute()
+        
+        return {
+            (row["dimension"], row["bucket"]): [row["lead_count"], row["score_sum"]]
+            for row in response.data
+        }
+    
+    def apply_deltas(self, owner_id: str, deltas: Aggregates) -> None:
+        """
+        Atomically add deltas to an owner's aggregate buckets.
+        
+        Args:
+            owner_id: The owner ID
+            deltas: Count and score-sum deltas keyed by (dimension, bucket)
+        """
+        if not deltas:
+            return
+        self._client.rpc("apply_lead_aggregate_deltas", {
+            "p_owner_id": owner_id,
+            "p_deltas": [
+                {"dimension": dimension, "bucket": bucket, "count": count, "score": score}
+                for (dimension, bucket), (count, score) in deltas.items()
+            ],
+        }).execute()
+    
+    def rebuild(self, owner_id: str) -> None:
+        """Recompute an owner's aggregates from the leads table in one transaction."""
+        self._client.rpc("rebuild_lead_aggregates", {"p_owner_id": owner_id}).execute()
+    
+    def list_owner_ids(self, page_size: int = 1000) -> List[str]:
+        """
+        Get the IDs of all owners that have aggregate rows.
+        
+        Reads in owner order with keyset pagination; each page starts after
+        the last owner of the previous one, so an owner's remaining buckets
+        are skipped rather than re-read.
+        """
+        owner_ids: List[str] = []
+        while True:
+            query = self._client.table(self.TABLE_NAME)\
+                .select("owner_id")\
+                .eq("dimension", "priority")
+            if owner_ids:
+                query = query.gt("owner_id", owner_ids[-1])
+            response = query.order("owner_id").limit(page_size).execute()
+            for row in response.data:
+                if not owner_ids or row["owner_id"] != owner_ids[-1]:
+                    owner_ids.append(row["owner_id"])
+            if len(response.data) < page_size:
+                return owner_ids
+
+    
+    def iter_all_aggregates(
+        self, dimensions: Sequence[str], page_size: int = 5000
+    ) -> Iterator[Dict[str, Aggregates]]:
+        """
+        Stream aggregate buckets for every owner, page by page.
+        
+        Pages are read in primary key order with keyset pagination: each
+        request starts after the last (owner_id, dimension, bucket) of the
+        previous page. The `owner_id >= last owner` bound lets the primary
+        key index seek straight to it, so every page costs the same.
+        
+        Args:
+            dimensions: Only buckets of these dimensions
+            page_size: Rows per request
+            
+        Yields:
+            Aggregates keyed by owner ID for each page; an owner may span pages
+        """
+        last = None
+        while True:
+            query = self._client.table(self.TABLE_NAME)\
+                .select("owner_id,dimension,bucket,lead_count,score_sum")\
+                .in_("dimension", list(dimensions))
+            if last is not None:
+                owner_id, dimension, bucket = (_quote(value) for value in last)
+                query = query.gte("owner_id", last[0]).or_(
+                    f"owner_id.gt.{owner_id},"
+                    f"dimension.gt.{dimension},"
+                    f"and(dimension.eq.{dimension},bucket.gt.{bucket})"
+                )
+            response = query\
+                .order("owner_id")\
+                .order("dimension")\
+                .order("bucket")\
+                .limit(page_size)\
+                .execute()
+            
+            page: Dict[str, Aggregates] = {}
+            for row in response.data:
+                page.setdefault(row["owner_id"], {})[(row["dimension"], row["bucket"])] = [
+                    row["lead_count"], row["score_sum"]
+                ]
+            if page:
+                yield page
+            if len(response.data) < page_size:
+                return
+            row = response.data[-1]
+            last = (row["owner_id"], row["dimension"], row["bucket"])
+    
+    def save_snapshots(self, snapshots: Dict[str, PipelineSnapshot]) -> None:
+        """
+        Upsert daily snapshots, one per owner.
+        
+        Args:
+            snapshots: Snapshot keyed by owner ID
+        """
+        rows = [
+            {"owner_id": owner_id, **snapshot.model_dump(mode="json")}
+            for owner_id, snapshot in snapshots.items()
+        ]
+        if rows:
+            self._client.table(self.SNAPSHOT_TABLE_NAME)\
+                .upsert(rows, on_conflict="owner_id,snapshot_date")\
+                .execute()
+    
+    def get_snapshots(
+        self, owner_id: str, from_date: date, to_date: date, page_size: int = 1000
+    ) -> List[PipelineSnapshot]:
+        """
+        Get an owner's daily snapshots in a date range (inclusive), oldest first.
+        
+        Ranges longer than one page (PostgREST returns at most 1000 rows per
+        request) are read page by page, each starting after the last
+        snapshot date of the previous one.
+        """
+        snapshots: List[PipelineSnapshot] = []
+        start = from_date.isoformat()
+        while True:
+            response = self._client.table(self.SNAPSHOT_TABLE_NAME)\
+                .select("snapshot_date,total_leads,hot_leads,warm_leads,cold_leads,stage_counts,mean_score")\
+                .eq("owner_id", owner_id)\
+                .gte("snapshot_date", start)\
+                .lte("snapshot_date", to_date.isoformat())\
+                .order("snapshot_date")\
+                .limit(page_size)\
+                .execute()
+            snapshots.extend(PipelineSnapshot(**row) for row in response.data)
+            if len(response.data) < page_size:
+                return snapshots
+            start = (snapshots[-1].snapshot_date + timedelta(days=1)).isoformat()
+
+
+def get_analytics_repository() -> AnalyticsRepository:
+    """
+    Factory function for dependency injection.
+    Returns an AnalyticsRepository instance with Supabase client.
+    """
+    return AnalyticsRepository(get_supabase_client())
@@ -3,13 +3,43 @@ Lead Repository - Data Access Layer with Supabase
 
 This module provides database operations for leads using Supabase.
 """
-from typing import List, Optional
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from supabase import Client
 from app.models.schemas import (
     LeadInput, LeadResponse, ScoringResult, Priority, Stage,
-    DashboardSummary, ActionItem
+    DashboardSummary, ActionItem, LeadFilters
 )
+from app.models.columns import LeadColumns
+from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.repositories.analytics_repo import AnalyticsRepository
+from app.repositories.lead_writer import LeadWriteBehindBuffer
+from app.services.analytics import compute_deltas
+from app.services.lead_dedup import FingerprintIndexRegistry, lead_fingerprint
+from app.services.lead_search import LeadSearchIndexRegistry
+from app.services.lead_similarity import LeadSimilarityIndex, LeadSimilarityIndexRegistry
+
+
+logger = logging.getLogger(__name__)
+
+# A lead change is a (row before, row after) pair; before is None for
+# inserts and after is None for deletes.
+LeadChange = Tuple[Optional[dict], Optional[dict]]
+LeadChangeListener = Callable[[str, List[LeadChange]], None]
+
+_lead_change_listeners: List[LeadChangeListener] = []
+
+
+def register_lead_change_listener(listener: LeadChangeListener) -> None:
+    """
+    Register a callback invoked with (owner_id, changes) after leads are written.
+    
+    Listeners keep derived in-process state (search indexes, caches) in sync.
+    They run synchronously after the write and must not raise.
+    """
+    if listener not in _lead_change_listeners:
+        _lead_change_listeners.append(listener)
 
 
 class LeadRepository:
@@ -20,25 +50,185 @@ class LeadRepository:
     """
     
     TABLE_NAME = "leads"
+    TOMBSTONE_TABLE_NAME = "lead_tombstones"
+    # Columns needed to build LeadColumns for batch scoring
+    FEATURE_COLUMNS = (
+        "id,lead_id,industry,channel,company_size,interaction_count,"
+        "last_interaction_days_ago,has_requested_pricing,has_demo_request,stage"
+    )
+    # Columns written back when duplicates are merged into a lead
+    MERGE_COLUMNS = (
+        "id", "owner_id", "lead_id", "industry", "company_size", "channel", "interaction_count",
+        "last_interaction_days_ago", "has_requested_pricing", "has_demo_request", "stage",
+        "contact_email", "company_name", "fingerprint", "score", "priority", "explanations",
+    )
     
-    def __init__(self, client: Client):
-        """Initialize the repository with a Supabase client."""
+    def __init__(
+        self,
+        client: Client,
+        writer: Optional[LeadWriteBehindBuffer] = None,
+        search_indexes: Optional[LeadSearchIndexRegistry] = None,
+        similarity_indexes: Optional[LeadSimilarityIndexRegistry] = None,
+    ):
+        """
+        Initialize the repository with a Supabase client.
+        
+        Args:
+            client: Supabase client
+            writer: Optional write-behind buffer used by `add_lead_async`
+            search_indexes: Optional in-process search indexes used by `search_leads`
+            similarity_indexes: Optional cached similarity indexes used by `find_similar_leads`
+        """
         self._client = client
+        self._writer = writer
+        self._search_indexes = search_indexes
+        self._similarity_indexes = similarity_indexes
+        self._aggregates = AnalyticsRepository(client) if settings.LEAD_AGGREGATES_ENABLED else None
     
-    def get_all_leads(self, owner_id: str) -> List[LeadResponse]:
+    def get_all_leads(self, owner_id: str, filters: Optional[LeadFilters] = None) -> List[LeadResponse]:
         """
         Get all leads sorted by score in descending order.
         
+        Filters are pushed down into the query so they can use the
+        composite (owner_id, ..., score DESC) indexes.
+        
+        Args:
+            owner_id: The owner ID
+            filters: Optional filters and pagination
+            
         Returns:
             List of LeadResponse objects sorted by score (highest first)
         """
-        response = self._client.table(self.TABLE_NAME)\
+        return [self._row_to_lead_response(row) for row in self.get_lead_rows(owner_id, filters)]
+    
+    def get_lead_rows(
+        self, owner_id: str, filters: Optional[LeadFilters] = None, columns: str = "*"
+    ) -> List[dict]:
+        """
+        Get raw lead rows sorted by score in descending order.
+        
+        Same query as `get_all_leads`, but only the requested columns are
+        read and no response objects are built, for encoders that write
+        rows straight to the wire.
+        
+        Args:
+            owner_id: The owner ID
+            filters: Optional filters and pagination
+            columns: Comma-separated columns to select
+            
+        Returns:
+            Lead rows sorted by score (highest first), then lead_id
+        """
+        query = self._client.table(self.TABLE_NAME)\
+            .select(columns)\
+            .eq("owner_id", owner_id)
+        
+        if filters is not None:
+            query = self._apply_filters(query, filters)
+        
+        query = query.order("score", desc=True).order("lead_id")
+        
+        if filters is not None and filters.limit is not None:
+            query = query.range(filters.offset, filters.offset + filters.limit - 1)
+        elif filters is not None and filters.offset:
+            query = query.offset(filters.offset)
+        
+        return query.execute().data
+    
+    def get_changed_lead_rows(
+        self, owner_id: str, after: Optional[Tuple[str, str]], until: str, limit: int
+    ) -> List[dict]:
+        """
+        Get leads changed in a time window, in (updated_at, id) order.
+        
+        Uses the (owner_id, updated_at, id) index with keyset pagination.
+        
+        Args:
+            owner_id: The owner ID
+            after: (updated_at, id) of the last lead already seen, or None for all leads
+            until: Only leads with updated_at up to and including this timestamp
+            limit: Maximum rows to return
+            
+        Returns:
+            Lead rows
+        """
+        query = self._client.table(self.TABLE_NAME)\
             .select("*")\
             .eq("owner_id", owner_id)\
-            .order("score", desc=True)\
-            .execute()
+            .lte("updated_at", until)
+        if after is not None:
+            updated_at, lead_uuid = after
+            query = query.or_(
+                f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{lead_uuid})'
+            )
+        response = query.order("updated_at").order("id").limit(limit).execute()
+        return response.data
+    
+    def get_changed_rows(
+        self, after: Optional[Tuple[str, str]], until: str, limit: int, columns: str = "*"
+    ) -> List[dict]:
+        """
+        Get leads of all owners changed in a time window, in (updated_at, id) order.
+        
+        Uses the (updated_at, id) index with keyset pagination, for
+        background workers that follow every lead change.
         
-        return [self._row_to_lead_response(row) for row in response.data]
+        Args:
+            after: (updated_at, id) of the last lead already seen, or None for all leads
+            until: Only leads with updated_at up to and including this timestamp
+            limit: Maximum rows to return
+            columns: Columns to select; must include updated_at and id
+            
+        Returns:
+            Lead rows
+        """
+        query = self._client.table(self.TABLE_NAME)\
+            .select(columns)\
+            .lte("updated_at", until)
+        if after is not None:
+            updated_at, lead_uuid = after
+            query = query.or_(
+                f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{lead_uuid})'
+            )
+        response = query.order("updated_at").order("id").limit(limit).execute()
+        return response.data
+    
+    def get_deleted_lead_ids(self, owner_id: str, after: str, until: str) -> List[str]:
+        """
+        Get the lead IDs deleted (or renamed) in a time window.
+        
+        Args:
+            owner_id: The owner ID
+            after: Exclusive lower bound on the deletion time
+            until: Inclusive upper bound on the deletion time
+            
+        Returns:
+            Lead IDs in deletion order
+        """
+        response = self._client.table(self.TOMBSTONE_TABLE_NAME)\
+            .select("lead_id")\
+            .eq("owner_id", owner_id)\
+            .gt("deleted_at", after)\
+            .lte("deleted_at", until)\
+            .order("deleted_at")\
+            .execute()
+        return [row["lead_id"] for row in response.data]
+    
+    def _apply_filters(self, query, filters: LeadFilters):
+        """Add the WHERE clauses for a LeadFilters object to a query."""
+        if filters.industry is not None:
+            query = query.eq("industry", filters.industry)
+        if filters.channel is not None:
+            query = query.eq("channel", filters.channel)
+        if filters.stage is not None:
+            query = query.eq("stage", filters.stage.value)
+        if filters.priority is not None:
+            query = query.eq("priority", filters.priority.value)
+        if filters.min_score is not None:
+            query = query.gte("score", filters.min_score)
+        if filters.max_score is not None:
+            query = query.lte("score", filters.max_score)
+        return query
     
     def get_summary(self, owner_id: str) -> DashboardSummary:
         """
@@ -130,25 +320,487 @@ class LeadRepository:
         Returns:
             The added LeadResponse object
         """
-        data = {
-            "owner_id": owner_id,
-            "lead_id": lead.lead_id,
-            "industry": lead.industry,
-            "company_size": lead.company_size,
-            "channel": lead.channel,
-            "interaction_count": lead.interaction_count,
-            "last_interaction_days_ago": lead.last_interaction_days_ago,
-            "has_requested_pricing": lead.has_requested_pricing,
-            "has_demo_request": lead.has_demo_request,
-            "score": lead.score_details.score,
-            "priority": lead.score_details.priority.value,
-            "explanations": lead.score_details.explanations,
-            "stage": lead.stage.value,
-        }
+        self.insert_rows([self._lead_to_row(lead, owner_id)])
+        return lead
+    
+    async def add_lead_async(self, lead: LeadResponse, owner_id: str) -> LeadResponse:
+        """
+        Add a new lead, group-committing it through the write-behind buffer when enabled.
         
-        self._client.table(self.TABLE_NAME).insert(data).execute()
+        The call still waits until the row's batch has been written, so
+        insert failures are raised to the caller exactly like `add_lead`.
+        
+        Args:
+            lead: LeadResponse object to add
+            owner_id: ID of the user adding the lead
+            
+        Returns:
+            The added LeadResponse object
+        """
+        if self._writer is None or not self._writer.is_running:
+            return self.add_lead(lead, owner_id)
+        
+        await self._writer.submit(self._lead_to_row(lead, owner_id))
         return lead
     
+    def insert_rows(self, rows: List[dict]) -> List[dict]:
+        """
+        Insert already-mapped lead rows with a single multi-row insert.
+        
+        When deduplication is enabled, rows go through the `insert_leads`
+        database function, which skips rows conflicting with a stored lead
+        on (owner_id, fingerprint) or (lead_id, owner_id) rather than failing
+        the whole insert. That only happens when a concurrent request or
+        another worker saved the same prospect; `LeadDeduplicator.commit`
+        merges the skipped rows into the stored ones.
+        
+        Args:
+            rows: Rows produced by `_lead_to_row`
+            
+        Returns:
+            The inserted rows
+        """
+        if not rows:
+            return []
+        if settings.LEAD_DEDUP_ENABLED:
+            response = self._client.rpc("insert_leads", {"p_rows": rows}).execute()
+            inserted = response.data or []
+            if len(inserted) < len(rows):
+                logger.info("Skipped %d duplicate lead rows", len(rows) - len(inserted))
+        else:
+            response = self._client.table(self.TABLE_NAME).insert(rows).execute()
+            inserted = response.data or rows
+        
+        inserted_by_owner: Dict[str, List[LeadChange]] = {}
+        for row in inserted:
+            inserted_by_owner.setdefault(row["owner_id"], []).append((None, row))
+        for owner_id, changes in inserted_by_owner.items():
+            self._notify_changes(owner_id, changes)
+        return inserted
+    
+    def insert_scored_leads(
+        self,
+        leads: Sequence[dict],
+        scores: Sequence[int],
+        priorities: Sequence[Priority],
+        explanations: Optional[Sequence[List[str]]],
+        owner_id: str,
+        chunk_size: int = 1000,
+    ) -> Tuple[List[dict], List[int]]:
+        """
+        Insert validated lead dictionaries with their batch scores.
+        
+        Each chunk is a separate insert that commits on its own. A chunk
+        that fails is logged and skipped and the remaining chunks are still
+        inserted, so callers can report exactly which rows were not saved.
+    
+        Args:
+            leads: Validated leads in LeadInput field layout (JSON-compatible values)
+            scores: Score per lead
+            priorities: Priority per lead
+            explanations: Explanations per lead, or None
+            owner_id: ID of the user adding the leads
+            chunk_size: Rows per multi-row insert
+    
+        Returns:
+            Tuple of (inserted rows, positions in `leads` of the rows whose
+            chunk failed)
+        """
+        rows = [
+            {
+                "owner_id": owner_id,
+                "lead_id": lead["lead_id"],
+                "industry": lead["industry"],
+                "company_size": lead["company_size"],
+                "channel": lead["channel"],
+                "interaction_count": lead["interaction_count"],
+                "last_interaction_days_ago": lead["last_interaction_days_ago"],
+                "has_requested_pricing": lead["has_requested_pricing"],
+                "has_demo_request": lead["has_demo_request"],
+                "score": int(scores[i]),
+                "priority": Priority(priorities[i]).value,
+                "explanations": explanations[i] if explanations is not None else [],
+                "stage": lead["stage"],
+                "contact_email": lead.get("contact_email"),
+                "company_name": lead.get("company_name"),
+                "fingerprint": lead.get("fingerprint") or lead_fingerprint(lead),
+            }
+            for i, lead in enumerate(leads)
+        ]
+        
+        inserted: List[dict] = []
+        failed: List[int] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                inserted.extend(self.insert_rows(chunk))
+            except Exception:
+                logger.exception("Failed to insert leads %d-%d of %d", start, start + len(chunk) - 1, len(rows))
+                failed.extend(range(start, start + len(chunk)))
+        return inserted, failed
+    
+    def find_leads_by_keys(
+        self, owner_id: str, fingerprints: Sequence[str], lead_ids: Sequence[str], chunk_size: int = 200
+    ) -> List[dict]:
+        """
+        Get an owner's leads matching any of the given fingerprints or lead IDs.
+        
+        Both lookups use unique indexes; values are sent in chunks to keep
+        request URLs short.
+        
+        Args:
+            owner_id: The owner ID
+            fingerprints: Lead fingerprints to match
+            lead_ids: Lead IDs to match
+            chunk_size: Values per query
+            
+        Returns:
+            Matching rows, each at most once
+        """
+        rows_by_id: Dict[str, dict] = {}
+        for column, values in (("fingerprint", list(fingerprints)), ("lead_id", list(lead_ids))):
+            for start in range(0, len(values), chunk_size):
+                response = self._client.table(self.TABLE_NAME)\
+                    .select("*")\
+                    .eq("owner_id", owner_id)\
+                    .in_(column, values[start:start + chunk_size])\
+                    .execute()
+                for row in response.data:
+                    rows_by_id[row["id"]] = row
+        return list(rows_by_id.values())
+    
+    def update_merged_leads(self, owner_id: str, changes: Sequence[LeadChange], chunk_size: int = 1000) -> List[dict]:
+        """
+        Write leads that absorbed duplicates.
+        
+        Args:
+            owner_id: The owner ID
+            changes: (stored row, merged and rescored row) pairs; merged rows keep the stored id
+            chunk_size: Rows per multi-row upsert
+            
+        Returns:
+            The updated rows
+        """
+        before_by_id = {before["id"]: before for before, _ in changes}
+        updated: List[dict] = []
+        for start in range(0, len(changes), chunk_size):
+            rows = [
+                {column: after.get(column) for column in self.MERGE_COLUMNS}
+                for _, after in changes[start:start + chunk_size]
+            ]
+            response = self._client.table(self.TABLE_NAME).upsert(rows, on_conflict="id").execute()
+            updated.extend(response.data)
+        
+        if updated:
+            self._notify_changes(owner_id, [(before_by_id.get(row["id"]), row) for row in updated])
+        return updated
+    
+    def iter_lead_pages(
+        self,
+        owner_id: Optional[str],
+        columns: str = "*",
+        page_size: int = 1000,
+        stages: Optional[Sequence[Stage]] = None,
+        after_id: Optional[str] = None,
+        until_id: Optional[str] = None,
+    ) -> Iterator[List[dict]]:
+        """
+        Stream leads as pages of raw rows using keyset pagination.
+        
+        Each page is fetched with `id > last_seen_id ORDER BY id LIMIT page_size`,
+        which stays fast at any depth, unlike OFFSET pagination.
+        
+        Args:
+            owner_id: The owner ID, or None to stream every owner's leads
+            columns: Comma-separated columns to select; must include "id" when not "*"
+            page_size: Rows per page
+            stages: Only leads in these pipeline stages
+            after_id: Only leads with an id greater than this
+            until_id: Only leads with an id up to and including this
+            
+        Yields:
+            Lists of row dictionaries
+        """
+        last_id: Optional[str] = after_id
+        while True:
+            query = self._client.table(self.TABLE_NAME).select(columns)
+            if owner_id is not None:
+                query = query.eq("owner_id", owner_id)
+            if stages:
+                query = query.in_("stage", [stage.value for stage in stages])
+            if until_id is not None:
+                query = query.lte("id", until_id)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            response = query.order("id").limit(page_size).execute()
+            
+            if response.data:
+                yield response.data
+            if len(response.data) < page_size:
+                return
+            last_id = response.data[-1]["id"]
+    
+    def count_leads(self, owner_id: str) -> int:
+        """Count an owner's leads."""
+        response = self._client.table(self.TABLE_NAME)\
+            .select("id", count="exact")\
+            .eq("owner_id", owner_id)\
+            .limit(1)\
+            .execute()
+        return response.count or 0
+    
+    def iter_keyset_boundaries(self, owner_id: str, chunk_size: int) -> Iterator[str]:
+        """
+        Split an owner's leads into consecutive id ranges of `chunk_size` leads.
+        
+        Each boundary is found with `id > previous ORDER BY id OFFSET chunk_size - 1
+        LIMIT 1`, which walks the (owner_id, id) index and returns a single row,
+        so the ranges are known without reading the leads themselves.
+        
+        Args:
+            owner_id: The owner ID
+            chunk_size: Leads per range
+            
+        Yields:
+            The last id of each full range; leads after the final boundary
+            form one more, shorter range
+        """
+        last_id: Optional[str] = None
+        while True:
+            query = self._client.table(self.TABLE_NAME)\
+                .select("id")\
+                .eq("owner_id", owner_id)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            response = query.order("id").range(chunk_size - 1, chunk_size - 1).execute()
+            if not response.data:
+                return
+            last_id = response.data[0]["id"]
+            yield last_id
+    
+    def apply_rescores(self, owner_id: str, changes: Sequence[LeadChange]) -> int:
+        """
+        Write new scores for leads in one set-based UPDATE.
+        
+        Args:
+            owner_id: The owner ID
+            changes: (row before, row after) pairs; only id, score, priority
+                and explanations of the new rows are written
+            
+        Returns:
+            Number of rows updated
+        """
+        if not changes:
+            return 0
+        response = self._client.rpc("apply_lead_rescores", {
+            "p_owner_id": owner_id,
+            "p_updates": [
+                {
+                    "id": after["id"],
+                    "score": after["score"],
+                    "priority": after["priority"],
+                    "explanations": after["explanations"],
+                }
+                for _, after in changes
+            ],
+        }).execute()
+        self._notify_changes(owner_id, list(changes))
+        return response.data or 0
+
+    def apply_interactions(self, owner_id: str, events: List[dict], updates: List[dict]) -> List[dict]:
+        """
+        Append interaction events and increment the leads' counters atomically.
+
+        Args:
+            owner_id: The owner ID
+            events: Event rows with lead_id, event_type and occurred_at
+            updates: One coalesced delta per lead with lead_id, interactions,
+                last_interaction_at, requested_pricing and requested_demo
+
+        Returns:
+            The updated lead rows, still carrying their pre-event scores.
+            Leads the owner does not have are skipped along with their events.
+        """
+        if not updates:
+            return []
+        response = self._client.rpc("apply_lead_events", {
+            "p_owner_id": owner_id,
+            "p_events": events,
+            "p_updates": updates,
+        }).execute()
+        return response.data or []
+
+    def apply_interaction_scores(self, owner_id: str, rows: List[dict], changes: Sequence[LeadChange]) -> int:
+        """
+        Write scores computed from rows returned by `apply_interactions`.
+
+        A score is only written while the lead's scoring inputs still equal
+        the scored ones, so a lead incremented again in the meantime keeps
+        the score written for its newer counters.
+
+        Args:
+            owner_id: The owner ID
+            rows: All rows returned by `apply_interactions`
+            changes: (row before, row after) pairs for the rows whose score
+                or priority changed
+
+        Returns:
+            Number of scores written
+        """
+        applied = set()
+        if changes:
+            response = self._client.rpc("apply_lead_event_scores", {
+                "p_owner_id": owner_id,
+                "p_updates": [
+                    {
+                        "id": after["id"],
+                        "interaction_count": after["interaction_count"],
+                        "last_interaction_days_ago": after["last_interaction_days_ago"],
+                        "has_requested_pricing": after["has_requested_pricing"],
+                        "has_demo_request": after["has_demo_request"],
+                        "score": after["score"],
+                        "priority": after["priority"],
+                        "explanations": after["explanations"],
+                    }
+                    for _, after in changes
+                ],
+            }).execute()
+            applied = {row["id"] for row in response.data or []}
+
+        # Rows with a new score replace the old; the rest changed counters only
+        rescored = {after["id"]: after for _, after in changes if after["id"] in applied}
+        self._notify_changes(owner_id, [(row, rescored.get(row["id"], row)) for row in rows])
+        return len(rescored)
+
+    def get_lead_columns(self, owner_id: str, page_size: int = 10000) -> LeadColumns:
+        """
+        Load an owner's scoring features into columnar arrays.
+    
+        Selects only the fields the scoring engines read, streamed with
+        keyset pagination and converted page by page.
+    
+        Args:
+            owner_id: The owner ID
+            page_size: Rows per page
+    
+        Returns:
+            LeadColumns for all of the owner's leads, in id order
+        """
+        parts = [
+            LeadColumns.from_rows(page)
+            for page in self.iter_lead_pages(owner_id, columns=self.FEATURE_COLUMNS, page_size=page_size)
+        ]
+        return LeadColumns.concat(parts)
+    
+    def search_leads(
+        self, owner_id: str, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[LeadResponse], bool]:
+        """
+        Search leads by prefix or substring of lead_id, industry and channel.
+        
+        Uses the `search_leads` Postgres function (trigram indexed) by default,
+        or the in-process n-gram index when LEAD_SEARCH_BACKEND is "memory".
+        
+        Args:
+            owner_id: The owner ID
+            query: Search text
+            limit: Page size
+            offset: Number of ranked results to skip
+            
+        Returns:
+            Tuple of (ranked leads for the page, whether more results exist)
+        """
+        if self._search_indexes is None:
+            response = self._client.rpc("search_leads", {
+                "p_owner_id": owner_id,
+                "p_query": query,
+                "p_limit": limit + 1,
+                "p_offset": offset,
+            }).execute()
+            rows = response.data or []
+            return [self._row_to_lead_response(row) for row in rows[:limit]], len(rows) > limit
+        
+        lead_ids, total = self._search_indexes.get(owner_id).search(query, limit, offset)
+        return self.get_leads_by_ids(owner_id, lead_ids), total > offset + limit
+    
+    def find_similar_leads(
+        self, owner_id: str, lead_id: str, k: int = 10
+    ) -> Optional[List[Tuple[LeadResponse, float]]]:
+        """
+        Find the leads that look most like a lead.
+        
+        Ranks the owner's leads by cosine similarity of their scoring
+        features, industry and channel (see app/services/lead_similarity.py),
+        using the cached per-owner index when available.
+        
+        Args:
+            owner_id: The owner ID
+            lead_id: The reference lead
+            k: Number of leads to return
+            
+        Returns:
+            Up to k (lead, similarity) pairs, most similar first, or None
+            if the lead does not exist
+        """
+        if self._similarity_indexes is not None:
+            index = self._similarity_indexes.get(owner_id)
+        else:
+            index = LeadSimilarityIndex(self.get_lead_columns(owner_id))
+        
+        matches = index.similar(lead_id, k)
+        if matches is None:
+            return None
+        leads = self.get_leads_by_ids(owner_id, [match_id for match_id, _ in matches])
+        similarities = dict(matches)
+        return [(lead, similarities[lead.lead_id]) for lead in leads]
+    
+    def get_leads_by_ids(self, owner_id: str, lead_ids: Sequence[str]) -> List[LeadResponse]:
+        """
+        Fetch leads by lead ID in one query, in the given order.
+        
+        Args:
+            owner_id: The owner ID
+            lead_ids: Lead IDs to fetch
+            
+        Returns:
+            The leads that exist, in the order of `lead_ids`
+        """
+        if not lead_ids:
+            return []
+        
+        response = self._client.table(self.TABLE_NAME)\
+            .select("*")\
+            .eq("owner_id", owner_id)\
+            .in_("lead_id", list(lead_ids))\
+            .execute()
+        rows_by_id = {row["lead_id"]: row for row in response.data}
+        return [
+            self._row_to_lead_response(rows_by_id[lead_id])
+            for lead_id in lead_ids if lead_id in rows_by_id
+        ]
+    
+    def _notify_changes(self, owner_id: str, changes: List[LeadChange], aggregates_applied: bool = False) -> None:
+        """
+        Propagate written rows to derived state.
+        
+        Applies aggregate deltas for pipeline analytics, unless the write
+        already applied them in the database, then passes the changes to the
+        registered lead change listeners. A failed aggregate update or
+        listener is logged rather than raised, since the write itself has
+        already succeeded; the reconcile job repairs aggregate drift.
+        """
+        if self._aggregates is not None and not aggregates_applied:
+            try:
+                self._aggregates.apply_deltas(owner_id, compute_deltas(changes))
+            except Exception:
+                logger.exception("Failed to apply lead aggregate deltas for owner %s", owner_id)
+        
+        for listener in _lead_change_listeners:
+            try:
+                listener(owner_id, changes)
+            except Exception:
+                logger.exception("Lead change listener %r failed for owner %s", listener, owner_id)
+    
     def get_lead_by_id(self, lead_id: str, owner_id: str) -> Optional[LeadResponse]:
         """
         Get a lead by its ID and owner.
@@ -171,6 +823,35 @@ class LeadRepository:
             return self._row_to_lead_response(response.data[0])
         return None
     
+    def _lead_to_row(self, lead: LeadResponse, owner_id: str) -> dict:
+        """Convert a LeadResponse object to a database row."""
+        return {
+            "owner_id": owner_id,
+            "lead_id": lead.lead_id,
+            "industry": lead.industry,
+            "company_size": lead.company_size,
+            "channel": lead.channel,
+            "interaction_count": lead.interaction_count,
+            "last_interaction_days_ago": lead.last_interaction_days_ago,
+            "has_requested_pricing": lead.has_requested_pricing,
+            "has_demo_request": lead.has_demo_request,
+            "score": lead.score_details.score,
+            "priority": lead.score_details.priority.value,
+            "explanations": lead.score_details.explanations,
+            "stage": lead.stage.value,
+            "contact_email": lead.contact_email,
+            "company_name": lead.company_name,
+            "fingerprint": lead_fingerprint({
+                "lead_id": lead.lead_id,
+                "contact_email": lead.contact_email,
+                "company_name": lead.company_name,
+            }),
+        }
+    
+    def rows_to_leads(self, rows: Sequence[dict]) -> List[LeadResponse]:
+        """Convert raw rows (e.g. from `get_changed_lead_rows`) to LeadResponse objects."""
+        return [self._row_to_lead_response(row) for row in rows]
+    
     def _row_to_lead_response(self, row: dict) -> LeadResponse:
         """Convert a database row to a LeadResponse object."""
         return LeadResponse(
@@ -183,6 +864,8 @@ class LeadRepository:
             has_requested_pricing=row["has_requested_pricing"],
             has_demo_request=row["has_demo_request"],
             stage=Stage(row.get("stage", "new")),
+            contact_email=row.get("contact_email"),
+            company_name=row.get("company_name"),
             score_details=ScoringResult(
                 score=row["score"],
                 priority=Priority(row["priority"]),
@@ -193,7 +876,26 @@ class LeadRepository:
     def update_stage(self, lead_id: str, stage: Stage, owner_id: str) -> Optional[LeadResponse]:
         """
         Update the pipeline stage for a lead.
+        
+        With aggregates enabled the move goes through `update_lead_stages`
+        (scripts/add_lead_aggregates_migration.sql, which aggregates already
+        require), so the stage counts stay exact under concurrent moves.
+        Otherwise it is a plain update and needs no migration.
         """
+        if self._aggregates is not None:
+            changes = self._move_stages(owner_id, [(lead_id, stage)])
+            if changes:
+                return self._row_to_lead_response(changes[0][1])
+            return None
+        
+        before = self._client.table(self.TABLE_NAME)\
+            .select("*")\
+            .eq("lead_id", lead_id)\
+            .eq("owner_id", owner_id)\
+            .execute()
+        if not before.data:
+            return None
+        
         response = self._client.table(self.TABLE_NAME)\
             .update({"stage": stage.value})\
             .eq("lead_id", lead_id)\
@@ -201,8 +903,182 @@ class LeadRepository:
             .execute()
         
         if response.data:
+            self._notify_changes(owner_id, list(zip(before.data, response.data)))
             return self._row_to_lead_response(response.data[0])
         return None
+    
+    def update_stages(
+        self, transitions: Sequence[Tuple[str, Stage]], owner_id: str, chunk_size: int = 1000
+    ) -> Tuple[List[LeadResponse], List[str]]:
+        """
+        Update the pipeline stage for many leads at once.
+        
+        Transitions are applied by the `update_lead_stages` database
+        function (scripts/add_lead_aggregates_migration.sql, required even
+        with aggregates disabled), which also applies the stage aggregate
+        deltas atomically.
+        Lead IDs travel in the request body rather than in a URL filter,
+        in chunks so each call locks a bounded number of rows.
+        If a lead appears more than once, the last transition wins.
+        
+        Args:
+            transitions: (lead_id, stage) pairs to apply
+            owner_id: The owner ID
+            chunk_size: Transitions per database call
+            
+        Returns:
+            Tuple of (updated leads, lead IDs that were not found)
+        """
+        target_stage: Dict[str, Stage] = {}
+        for lead_id, stage in transitions:
+            target_stage[lead_id] = stage
+        
+        pending = list(target_stage.items())
+        updated: List[LeadResponse] = []
+        for start in range(0, len(pending), chunk_size):
+            changes = self._move_stages(owner_id, pending[start:start + chunk_size])
+            updated.extend(self._row_to_lead_response(after) for _, after in changes)
+        
+        found = {lead.lead_id for lead in updated}
+        not_found = [lead_id for lead_id in target_stage if lead_id not in found]
+        
+        return updated, not_found
+    
+    def _move_stages(self, owner_id: str, transitions: Sequence[Tuple[str, Stage]]) -> List[LeadChange]:
+        """
+        Apply stage transitions with `update_lead_stages` and notify listeners.
+        
+        The function locks each row before reading its previous stage and
+        applies the aggregate deltas in the same statement, so concurrent
+        moves of the same lead cannot both subtract the same old stage.
+        
+        Returns:
+            (row before, row after) pairs of the moved leads
+        """
+        if not transitions:
+            return []
+        response = self._client.rpc("update_lead_stages", {
+            "p_owner_id": owner_id,
+            "p_transitions": [{"lead_id": lead_id, "stage": stage.value} for lead_id, stage in transitions],
+            "p_update_aggregates": self._aggregates is not None,
+        }).execute()
+        
+        changes: List[LeadChange] = [
+            ({**row["lead"], "stage": row["previous_stage"]}, row["lead"])
+            for row in response.data or []
+        ]
+        if changes:
+            self._notify_changes(owner_id, changes, aggregates_applied=True)
+        return changes
+
+
+# Write-behind buffer singleton
+_lead_writer: Optional[LeadWriteBehindBuffer] = None
+
+
+def get_lead_writer() -> Optional[LeadWriteBehindBuffer]:
+    """
+    Get the lead write-behind buffer.
+    
+    Returns None unless LEAD_WRITE_BEHIND_ENABLED is set. The buffer is
+    started and drained by the application lifespan.
+    """
+    global _lead_writer
+    
+    if _lead_writer is None and settings.LEAD_WRITE_BEHIND_ENABLED:
+        _lead_writer = LeadWriteBehindBuffer(
+            insert_rows=LeadRepository(get_supabase_client()).insert_rows,
+            max_batch_size=settings.LEAD_WRITE_BEHIND_MAX_BATCH,
+            flush_interval_ms=settings.LEAD_WRITE_BEHIND_FLUSH_MS,
+            max_queue_size=settings.LEAD_WRITE_BEHIND_QUEUE_SIZE,
+        )
+    
+    return _lead_writer
+
+
+# In-process search index registry singleton
+_search_indexes: Optional[LeadSearchIndexRegistry] = None
+
+
+def get_search_indexes() -> Optional[LeadSearchIndexRegistry]:
+    """
+    Get the in-process lead search index registry.
+    
+    Returns None unless LEAD_SEARCH_BACKEND is "memory", in which case
+    search is served from per-owner n-gram indexes instead of Postgres.
+    """
+    global _search_indexes
+    
+    if _search_indexes is None and settings.LEAD_SEARCH_BACKEND == "memory":
+        repository = LeadRepository(get_supabase_client())
+        
+        def load_owner(owner_id: str) -> Iterator[dict]:
+            for page in repository.iter_lead_pages(owner_id, columns="id,lead_id,industry,channel,score"):
+                yield from page
+        
+        _search_indexes = LeadSearchIndexRegistry(
+            loader=load_owner,
+            max_owners=settings.LEAD_SEARCH_MAX_OWNERS,
+            ttl_seconds=settings.LEAD_SEARCH_INDEX_TTL_SECONDS,
+        )
+        register_lead_change_listener(_search_indexes.apply_changes)
+    
+    return _search_indexes
+
+
+# In-process similarity index registry singleton
+_similarity_indexes: Optional[LeadSimilarityIndexRegistry] = None
+
+
+def get_similarity_indexes() -> LeadSimilarityIndexRegistry:
+    """
+    Get the per-owner lead similarity index registry.
+    
+    Indexes are built from the owners' scoring features on first use and
+    kept current through the lead change listeners.
+    """
+    global _similarity_indexes
+    
+    if _similarity_indexes is None:
+        repository = LeadRepository(get_supabase_client())
+        _similarity_indexes = LeadSimilarityIndexRegistry(
+            loader=repository.get_lead_columns,
+            max_owners=settings.LEAD_SIMILARITY_MAX_OWNERS,
+            ttl_seconds=settings.LEAD_SIMILARITY_INDEX_TTL_SECONDS,
+        )
+        register_lead_change_listener(_similarity_indexes.apply_changes)
+    
+    return _similarity_indexes
+
+
+# Fingerprint bloom filter registry singleton
+_fingerprint_indexes: Optional[FingerprintIndexRegistry] = None
+
+
+def get_fingerprint_indexes() -> Optional[FingerprintIndexRegistry]:
+    """
+    Get the per-owner fingerprint bloom filters used by lead deduplication.
+    
+    Returns None unless LEAD_DEDUP_ENABLED is set.
+    """
+    global _fingerprint_indexes
+    
+    if _fingerprint_indexes is None and settings.LEAD_DEDUP_ENABLED:
+        repository = LeadRepository(get_supabase_client())
+        
+        def load_owner(owner_id: str) -> Iterator[dict]:
+            for page in repository.iter_lead_pages(owner_id, columns="id,lead_id,fingerprint", page_size=10000):
+                yield from page
+        
+        _fingerprint_indexes = FingerprintIndexRegistry(
+            loader=load_owner,
+            max_owners=settings.LEAD_DEDUP_BLOOM_MAX_OWNERS,
+            ttl_seconds=settings.LEAD_DEDUP_BLOOM_TTL_SECONDS,
+            error_rate=settings.LEAD_DEDUP_BLOOM_ERROR_RATE,
+        )
+        register_lead_change_listener(_fingerprint_indexes.apply_changes)
+    
+    return _fingerprint_indexes
 
 
 def get_lead_repository() -> LeadRepository:
@@ -211,4 +1087,9 @@ def get_lead_repository() -> LeadRepository:
     Returns a LeadRepository instance with Supabase client.
     """
     client = get_supabase_client()
-    return LeadRepository(client)
+    return LeadRepository(
+        client,
+        writer=get_lead_writer(),
+        search_indexes=get_search_indexes(),
+        similarity_indexes=get_similarity_indexes(),
+    )
@@ -0,0 +1,188 @@
+"""
+Write-behind buffer for lead inserts.
+
+Collects rows submitted by concurrent requests and writes them to the
+database as one multi-row insert, either every `flush_interval_ms`
+milliseconds or as soon as `max_batch_size` rows are waiting.
+"""
+import asyncio
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.core.metrics import metrics
+
+
+batch_size_histogram = metrics.histogram(
+    "lead_write_behind_batch_size",
+    "Number of rows per write-behind flush",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+flush_latency_histogram = metrics.histogram(
+    "lead_write_behind_flush_ms",
+    "Time spent writing one write-behind batch (ms)",
+)
+failed_rows_counter = metrics.counter(
+    "lead_write_behind_failed_rows",
+    "Rows that could not be written by the write-behind buffer",
+)
+
+
+class LeadWriteBehindBuffer:
+    """
+    Bounded queue that group-commits lead rows.
+    
+    Each submitted row gets its own future, so callers still learn whether
+    their row was written. When a batch insert fails the rows are retried
+    one by one, so a single bad row does not fail the whole batch.
+    """
+    
+    def __init__(
+        self,
+        insert_rows: Callable[[List[dict]], Any],
+        max_batch_size: int = 500,
+        flush_interval_ms: int = 50,
+        max_queue_size: int = 10000,
+    ):
+        """
+        Initialize the buffer.
+        
+        Args:
+            insert_rows: Blocking callable that inserts a list of rows
+            max_batch_size: Flush as soon as this many rows are waiting
+            flush_interval_ms: Maximum time a row waits before being flushed
+            max_queue_size: Queue bound; submitters wait when it is full
+        """
+        self._insert_rows = insert_rows
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+    
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._closing
+    
+    async def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_task_done)
+    
+    async def stop(self) -> None:
+        """Stop accepting rows and flush everything still queued."""
+        if self._task is None:
+            return
+        self._closing = True
+        if not self._task.done():
+            await self._queue.put(None)
+            await asyncio.wait([self._task])
+        
+        # Rows queued behind the sentinel by submitters that were already
+        # inside put(); flushing frees room for any still waiting on a full queue
+        while True:
+            remaining = self._drain()
+            if not remaining:
+                break
+            await self._flush(remaining)
+        self._task = None
+        self._queue = None
+    
+    def _drain(self) -> List[Tuple[dict, asyncio.Future]]:
+        """Take every queued row without waiting, dropping sentinels."""
+        items = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                items.append(item)
+        return items
+    
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        """Fail queued rows if the flush loop died, so their submitters do not wait forever."""
+        if task.cancelled() or task.exception() is None:
+            return
+        self._closing = True
+        error = RuntimeError("Lead write-behind buffer stopped unexpectedly")
+        error.__cause__ = task.exception()
+        for _, future in self._drain():
+            failed_rows_counter.inc()
+            if not future.done():
+                future.set_exception(error)
+    
+    async def submit(self, row: dict) -> None:
+        """
+        Queue a row and wait until it has been written.
+        
+        Raises:
+            RuntimeError: If the buffer is not running
+            Exception: Whatever the insert raised for this row
+        """
+        if not self.is_running:
+            raise RuntimeError("Lead write-behind buffer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        await future
+    
+    async def _run(self) -> None:
+        """Collect rows into batches and flush them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        batch: List[Tuple[dict, asyncio.Future]] = []
+        
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is None:
+                    break
+                
+                batch = [item]
+                deadline = loop.time() + self._flush_interval
+                while len(batch) < self._max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                
+                await self._flush(batch)
+                batch = []
+        except BaseException as exc:
+            # Rows taken off the queue but not written; queued ones are failed by _on_task_done
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Lead write-behind buffer stopped: {exc!r}"))
+            raise
+    
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        """Write a batch with one insert, falling back to per-row inserts on failure."""
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._insert_rows, [row for row, _ in batch])
+        except Exception:
+            for row, future in batch:
+                try:
+                    await asyncio.to_thread(self._insert_rows, [row])
+                except Exception as exc:
+                    failed_rows_counter.inc()
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    if not future.done():
+                        future.set_result(None)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        finally:
+            batch_size_histogram.observe(len(batch))
+            flush_latency_histogram.observe((time.perf_counter() - started) * 1000)
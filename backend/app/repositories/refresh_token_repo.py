@@ -0,0 +1,86 @@
+"""
+Refresh Token Repository - Rotating refresh tokens in Supabase
+
+Stores the `refresh_tokens` table. Tokens are only ever stored and looked
+up by their HMAC (see `security.hash_refresh_token`); rotation and reuse
+detection run inside the `rotate_refresh_token` database function.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from supabase import Client
+
+from app.core import security
+from app.core.config import settings
+from app.core.database import get_supabase_client
+
+
+class RefreshTokenRepository:
+    """Repository for refresh token families."""
+    
+    TABLE_NAME = "refresh_tokens"
+    
+    def __init__(self, client: Client):
+        """Initialize the repository with a Supabase client."""
+        self._client = client
+    
+    def _expires_at(self) -> str:
+        return (datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)).isoformat()
+    
+    def issue(self, user_id: str, email: str) -> str:
+        """
+        Start a new token family for a user who just logged in.
+        
+        Args:
+            user_id: The user's ID
+            email: The user's email, used as the access token subject
+            
+        Returns:
+            The new refresh token (only its hash is stored)
+        """
+        token = security.create_refresh_token()
+        self._client.table(self.TABLE_NAME).insert({
+            "user_id": user_id,
+            "email": email,
+            "token_hash": security.hash_refresh_token(token),
+            "expires_at": self._expires_at(),
+        }).execute()
+        return token
+    
+    def rotate(self, token: str) -> Optional[Tuple[str, str]]:
+        """
+        Exchange a refresh token for a new one.
+        
+        The presented token is revoked. If it had already been rotated, its
+        whole family is revoked as well.
+        
+        Args:
+            token: The refresh token sent by the client
+            
+        Returns:
+            (new refresh token, user email), or None if the token is
+            unknown, expired or revoked
+        """
+        new_token = security.create_refresh_token()
+        response = self._client.rpc("rotate_refresh_token", {
+            "p_token_hash": security.hash_refresh_token(token),
+            "p_new_token_hash": security.hash_refresh_token(new_token),
+            "p_expires_at": self._expires_at(),
+        }).execute()
+        if not response.data:
+            return None
+        return new_token, response.data[0]["email"]
+    
+    def revoke(self, token: str) -> None:
+        """Revoke a refresh token and every token rotated from the same login."""
+        self._client.rpc("revoke_refresh_token_family", {
+            "p_token_hash": security.hash_refresh_token(token),
+        }).execute()
+
+
+def get_refresh_token_repository() -> RefreshTokenRepository:
+    """
+    Factory function for dependency injection.
+    Returns a RefreshTokenRepository instance with Supabase client.
+    """
+    return RefreshTokenRepository(get_supabase_client())
@@ -0,0 +1,83 @@
+"""
+Scoring Profile Repository - Per-owner scoring configuration in Supabase
+
+Stores the `scoring_profiles` table: one engine type and weight set per
+owner, with a version that increases on every save.
+"""
+from typing import Optional
+
+from supabase import Client
+
+from app.core.database import get_supabase_client
+from app.models.schemas import ScoringProfile, ScoringProfileUpdate
+
+
+class ScoringProfileRepository:
+    """Repository for per-owner scoring profiles."""
+    
+    TABLE_NAME = "scoring_profiles"
+    
+    def __init__(self, client: Client):
+        """Initialize the repository with a Supabase client."""
+        self._client = client
+    
+    def get_version(self, owner_id: str) -> int:
+        """
+        Get the current version of an owner's profile.
+        
+        Returns:
+            The profile version, or 0 if the owner has no profile
+        """
+        response = self._client.table(self.TABLE_NAME)\
+            .select("version")\
+            .eq("owner_id", owner_id)\
+            .execute()
+        return response.data[0]["version"] if response.data else 0
+    
+    def get_profile(self, owner_id: str) -> Optional[ScoringProfile]:
+        """
+        Get an owner's scoring profile.
+        
+        Returns:
+            ScoringProfile if one has been saved, None otherwise
+        """
+        response = self._client.table(self.TABLE_NAME)\
+            .select("*")\
+            .eq("owner_id", owner_id)\
+            .execute()
+        return self._row_to_profile(response.data[0]) if response.data else None
+    
+    def save_profile(self, owner_id: str, update: ScoringProfileUpdate) -> ScoringProfile:
+        """
+        Create or replace an owner's profile, bumping its version.
+        
+        Args:
+            owner_id: The owner ID
+            update: Engine type and weights to save
+            
+        Returns:
+            The saved profile with its new version
+        """
+        response = self._client.rpc("save_scoring_profile", {
+            "p_owner_id": owner_id,
+            "p_engine_type": update.engine_type,
+            "p_weights": update.weights.model_dump(),
+        }).execute()
+        return self._row_to_profile(response.data[0])
+    
+    def _row_to_profile(self, row: dict) -> ScoringProfile:
+        """Convert a database row to a ScoringProfile."""
+        return ScoringProfile(
+            engine_type=row["engine_type"],
+            weights=row.get("weights") or {},
+            version=row["version"],
+            updated_at=row.get("updated_at"),
+        )
+
+
+def get_scoring_profile_repository() -> ScoringProfileRepository:
+    """
+    Factory function for dependency injection.
+    Returns a ScoringProfileRepository instance with Supabase client.
+    """
+    return ScoringProfileRepository(get_supabase_client())
@@ -0,0 +1,152 @@
+"""
+Pipeline Analytics Service - Aggregate bucket arithmetic
+
+Pipeline analytics are served from per-owner aggregate rows, one per
+(dimension, bucket), each holding a lead count and a score sum. Writes
+produce deltas against those rows instead of recomputing them, so reads
+cost O(number of buckets) rather than O(number of leads).
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.schemas import BreakdownBucket, PipelineAnalytics, PipelineSnapshot, Priority, Stage
+
+
+# Dimensions maintained in the aggregate table
+AGGREGATE_DIMENSIONS = ("stage", "priority", "industry", "channel", "score_bucket")
+
+SCORE_BUCKET_WIDTH = 10
+
+# (dimension, bucket) -> [lead count, score sum]
+Aggregates = Dict[Tuple[str, str], List[int]]
+
+
+def score_bucket(score: int) -> str:
+    """Histogram bucket label for a score, e.g. "70-79"; 100 falls into "90-100"."""
+    lower = min(score // SCORE_BUCKET_WIDTH, 9) * SCORE_BUCKET_WIDTH
+    upper = 100 if lower == 90 else lower + SCORE_BUCKET_WIDTH - 1
+    return f"{lower}-{upper}"
+
+
+def row_buckets(row: dict) -> List[Tuple[str, str]]:
+    """All (dimension, bucket) keys a lead row contributes to."""
+    return [
+        ("stage", row.get("stage") or Stage.NEW.value),
+        ("priority", row["priority"]),
+        ("industry", row["industry"]),
+        ("channel", row["channel"]),
+        ("score_bucket", score_bucket(row["score"])),
+    ]
+
+
+def compute_deltas(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> Aggregates:
+    """
+    Aggregate deltas for a set of lead changes.
+    
+    Args:
+        changes: (row before, row after) pairs; before is None for inserts,
+            after is None for deletes
+            
+    Returns:
+        Non-zero deltas keyed by (dimension, bucket)
+    """
+    deltas: Aggregates = {}
+    for before, after in changes:
+        if before is not None:
+            for key in row_buckets(before):
+                delta = deltas.setdefault(key, [0, 0])
+                delta[0] -= 1
+                delta[1] -= before["score"]
+        if after is not None:
+            for key in row_buckets(after):
+                delta = deltas.setdefault(key, [0, 0])
+                delta[0] += 1
+                delta[1] += after["score"]
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+
+
+def aggregate_rows(rows: Iterable[dict], into: Optional[Aggregates] = None) -> Aggregates:
+    """Compute aggregates from scratch over lead rows (used for reconciliation)."""
+    aggregates: Aggregates = into if into is not None else {}
+    for row in rows:
+        for key in row_buckets(row):
+            bucket = aggregates.setdefault(key, [0, 0])
+            bucket[0] += 1
+            bucket[1] += row["score"]
+    return aggregates
+
+
+def diff_aggregates(expected: Aggregates, actual: Aggregates) -> List[dict]:
+    """List buckets whose stored count or score sum differs from a full scan."""
+    differences = []
+    for key in sorted(set(expected) | set(actual)):
+        want = expected.get(key, [0, 0])
+        have = actual.get(key, [0, 0])
+        if want != have:
+            differences.append({
+                "dimension": key[0],
+                "bucket": key[1],
+                "expected_count": want[0],
+                "actual_count": have[0],
+                "expected_score_sum": want[1],
+                "actual_score_sum": have[1],
+            })
+    return differences
+
+
+def build_pipeline_analytics(aggregates: Aggregates) -> PipelineAnalytics:
+    """Shape aggregate rows into the analytics response."""
+    by_dimension: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in AGGREGATE_DIMENSIONS}
+    for (dimension, bucket), values in aggregates.items():
+        if dimension in by_dimension and values[0] > 0:
+            by_dimension[dimension][bucket] = values
+    
+    def breakdown(dimension: str, order: Optional[List[str]] = None) -> List[BreakdownBucket]:
+        buckets = by_dimension[dimension]
+        if order is None:
+            keys = sorted(buckets, key=lambda key: -buckets[key][0])
+        else:
+            keys = order
+        return [
+            BreakdownBucket(
+                key=key,
+                count=buckets.get(key, [0, 0])[0],
+                average_score=round(buckets[key][1] / buckets[key][0], 2) if key in buckets else 0.0,
+            )
+            for key in keys
+        ]
+    
+    priorities = by_dimension["priority"]
+    total = sum(values[0] for values in priorities.values())
+    score_sum = sum(values[1] for values in priorities.values())
+    
+    return PipelineAnalytics(
+        total_leads=total,
+        average_score=round(score_sum / total, 2) if total else 0.0,
+        by_priority=breakdown("priority", [p.value for p in (Priority.HOT, Priority.WARM, Priority.COLD)]),
+        funnel=breakdown("stage", [stage.value for stage in Stage]),
+        score_histogram=breakdown(
+            "score_bucket", [score_bucket(lower) for lower in range(0, 100, SCORE_BUCKET_WIDTH)]
+        ),
+        by_industry=breakdown("industry"),
+        by_channel=breakdown("channel"),
+    )
+
+
+def build_snapshot(aggregates: Aggregates, snapshot_date: date) -> PipelineSnapshot:
+    """Build a daily pipeline snapshot from an owner's priority and stage aggregates."""
+    priorities = {bucket: values for (dimension, bucket), values in aggregates.items() if dimension == "priority"}
+    total = sum(values[0] for values in priorities.values())
+    score_sum = sum(values[1] for values in priorities.values())
+    
+    return PipelineSnapshot(
+        snapshot_date=snapshot_date,
+        total_leads=total,
+        hot_leads=priorities.get(Priority.HOT.value, [0, 0])[0],
+        warm_leads=priorities.get(Priority.WARM.value, [0, 0])[0],
+        cold_leads=priorities.get(Priority.COLD.value, [0, 0])[0],
+        stage_counts={
+            stage.value: aggregates.get(("stage", stage.value), [0, 0])[0] for stage in Stage
+        },
+        mean_score=round(score_sum / total, 2) if total else 0.0,
+    )
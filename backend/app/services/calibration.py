@@ -0,0 +1,289 @@
+"""
+Scoring Calibration Service - Logistic weights from pipeline outcomes
+
+Fits an L2-regularized logistic regression that predicts whether a lead
+ends in `closed` (1) or `rejected` (0) from the AIScoringEngine features.
+
+Training is out-of-core: labeled rows are streamed once into a float32
+memory-mapped feature file, then every epoch walks that file in shuffled
+blocks with vectorized mini-batch Adam steps. Memory use is bounded by the
+block size, not the number of rows.
+"""
+import json
+import math
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ScoringModelWeights:
+    """Versioned logistic scoring model, serialized as a JSON artifact."""
+
+    version: str
+    feature_names: List[str]
+    feature_mean: List[float]
+    feature_scale: List[float]
+    coefficients: List[float]
+    intercept: float
+    hot_threshold: int = 70
+    warm_threshold: int = 40
+    l2: float = 0.0
+    trained_rows: int = 0
+    metrics: Dict[str, float] = field(default_factory=dict)
+    created_at: str = ""
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Conversion probability for a (n_rows, n_features) matrix."""
+        standardized = (features - np.asarray(self.feature_mean)) / np.asarray(self.feature_scale)
+        return _sigmoid(standardized @ np.asarray(self.coefficients) + self.intercept)
+
+    def save(self, path: str) -> None:
+        """Write the artifact atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump(asdict(self), f, indent=2)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ScoringModelWeights":
+        """Read an artifact written by `save`."""
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+class FeatureSpool:
+    """
+    Append-only on-disk feature matrix.
+
+    Rows are appended chunk by chunk while streaming from the database,
+    then exposed as a read-only memory map for repeated training epochs.
+    """
+
+    def __init__(self, n_features: int, directory: Optional[str] = None):
+        self.n_features = n_features
+        self._file = tempfile.NamedTemporaryFile(prefix="features-", suffix=".f32", dir=directory, delete=False)
+        self._labels = tempfile.NamedTemporaryFile(prefix="labels-", suffix=".u8", dir=directory, delete=False)
+        self.rows = 0
+        # Streaming moments (Chan et al. parallel update) for standardization
+        self._mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+        self.positives = 0
+
+    def append(self, features: np.ndarray, labels: np.ndarray) -> None:
+        """Append a chunk of rows and update the running mean and variance."""
+        if len(features) == 0:
+            return
+        features = np.asarray(features, dtype=np.float64)
+        n = len(features)
+        chunk_mean = features.mean(axis=0)
+        chunk_m2 = ((features - chunk_mean) ** 2).sum(axis=0)
+        total = self.rows + n
+        delta = chunk_mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += chunk_m2 + delta ** 2 * self.rows * n / total
+        self.rows = total
+        self.positives += int(labels.sum())
+
+        self._file.write(features.astype(np.float32).tobytes())
+        self._labels.write(np.asarray(labels, dtype=np.uint8).tobytes())
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._mean.copy()
+
+    @property
+    def scale(self) -> np.ndarray:
+        std = np.sqrt(self._m2 / max(self.rows - 1, 1))
+        return np.where(std > 0, std, 1.0)
+
+    def open(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Finish writing and return (features, labels) memory maps."""
+        self._file.flush()
+        self._labels.flush()
+        features = np.memmap(self._file.name, dtype=np.float32, mode="r", shape=(self.rows, self.n_features))
+        labels = np.memmap(self._labels.name, dtype=np.uint8, mode="r", shape=(self.rows,))
+        return features, labels
+
+    def close(self) -> None:
+        """Delete the spool files."""
+        for handle in (self._file, self._labels):
+            handle.close()
+            try:
+                os.unlink(handle.name)
+            except FileNotFoundError:
+                pass
+
+
+class LogisticCalibrator:
+    """Out-of-core L2-regularized logistic regression trained with mini-batch Adam."""
+
+    def __init__(
+        self,
+        l2: float = 1e-3,
+        learning_rate: float = 0.05,
+        epochs: int = 5,
+        batch_size: int = 4096,
+        block_size: int = 262144,
+        validation_fraction: float = 0.1,
+        balance_classes: bool = True,
+        seed: int = 42,
+    ):
+        """
+        Initialize the calibrator.
+
+        Args:
+            l2: L2 penalty on the coefficients (not the intercept)
+            learning_rate: Adam step size
+            epochs: Passes over the training rows
+            batch_size: Rows per gradient step
+            block_size: Rows loaded from the memory map at a time
+            validation_fraction: Fraction of rows held out for metrics
+            balance_classes: Weight classes inversely to their frequency
+            seed: Seed for shuffling and the holdout split
+        """
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.validation_fraction = validation_fraction
+        self.balance_classes = balance_classes
+        self.seed = seed
+
+    def fit(self, spool: FeatureSpool, feature_names: List[str]) -> ScoringModelWeights:
+        """
+        Fit the model on a filled feature spool.
+
+        About `validation_fraction` of the rows, picked per row, are held
+        out of training and used for the metrics. If that leaves no holdout
+        rows (or no training rows), the model is trained on every row and
+        the metrics are in-sample, recorded as `holdout` 0.
+
+        Returns:
+            Trained weights with their metrics
+        """
+        if spool.rows == 0:
+            raise ValueError("No labeled leads to train on")
+
+        features, labels = spool.open()
+        mean, scale = spool.mean, spool.scale
+        rng = np.random.default_rng(self.seed)
+
+        n_blocks = (spool.rows + self.block_size - 1) // self.block_size
+        holdout_rows = sum(
+            int(self._holdout_mask(block, self._block_rows(spool.rows, block)).sum())
+            for block in range(n_blocks)
+        )
+        holdout = 0 < holdout_rows < spool.rows
+
+        positive_rate = spool.positives / spool.rows
+        if self.balance_classes and 0 < positive_rate < 1:
+            class_weight = (0.5 / (1 - positive_rate), 0.5 / positive_rate)
+        else:
+            class_weight = (1.0, 1.0)
+
+        n_features = len(feature_names)
+        params = np.zeros(n_features + 1)
+        params[-1] = math.log(max(positive_rate, 1e-6) / max(1 - positive_rate, 1e-6))
+        first_moment = np.zeros_like(params)
+        second_moment = np.zeros_like(params)
+        step = 0
+
+        for _ in range(self.epochs):
+            for block in rng.permutation(n_blocks):
+                x, y = self._load_block(features, labels, block, mean, scale)
+                if holdout:
+                    train = ~self._holdout_mask(block, len(y))
+                    x, y = x[train], y[train]
+                order = rng.permutation(len(y))
+                for start in range(0, len(y), self.batch_size):
+                    batch = order[start:start + self.batch_size]
+                    gradient = self._gradient(params, x[batch], y[batch], class_weight)
+                    step += 1
+                    first_moment = 0.9 * first_moment + 0.1 * gradient
+                    second_moment = 0.999 * second_moment + 0.001 * gradient ** 2
+                    corrected_first = first_moment / (1 - 0.9 ** step)
+                    corrected_second = second_moment / (1 - 0.999 ** step)
+                    params -= self.learning_rate * corrected_first / (np.sqrt(corrected_second) + 1e-8)
+
+        metrics = self._evaluate(params, features, labels, n_blocks, mean, scale, holdout)
+        metrics["holdout"] = int(holdout)
+        metrics["positive_rate"] = round(positive_rate, 6)
+
+        now = datetime.now(timezone.utc)
+        return ScoringModelWeights(
+            version=now.strftime("%Y%m%dT%H%M%SZ"),
+            feature_names=list(feature_names),
+            feature_mean=mean.tolist(),
+            feature_scale=scale.tolist(),
+            coefficients=params[:-1].tolist(),
+            intercept=float(params[-1]),
+            l2=self.l2,
+            trained_rows=int(spool.rows - holdout_rows if holdout else spool.rows),
+            metrics=metrics,
+            created_at=now.isoformat(),
+        )
+
+    def _block_rows(self, rows: int, block: int) -> int:
+        return min(self.block_size, rows - block * self.block_size)
+
+    def _holdout_mask(self, block: int, n: int) -> np.ndarray:
+        """Rows of a block held out for metrics; the same for every epoch."""
+        return np.random.default_rng((self.seed, block)).random(n) < self.validation_fraction
+
+    def _load_block(self, features, labels, block: int, mean, scale) -> Tuple[np.ndarray, np.ndarray]:
+        start = block * self.block_size
+        stop = start + self.block_size
+        x = (np.asarray(features[start:stop], dtype=np.float64) - mean) / scale
+        return x, np.asarray(labels[start:stop], dtype=np.float64)
+
+    def _gradient(self, params: np.ndarray, x: np.ndarray, y: np.ndarray, class_weight) -> np.ndarray:
+        """Gradient of the weighted mean log loss plus the L2 penalty."""
+        weights = np.where(y > 0, class_weight[1], class_weight[0])
+        error = (_sigmoid(x @ params[:-1] + params[-1]) - y) * weights
+        gradient = np.empty_like(params)
+        gradient[:-1] = x.T @ error / len(y) + self.l2 * params[:-1]
+        gradient[-1] = error.mean()
+        return gradient
+
+    def _evaluate(self, params, features, labels, n_blocks: int, mean, scale, holdout: bool) -> Dict[str, float]:
+        """Log loss, accuracy and AUC over the holdout rows, or every row without a holdout."""
+        loss = correct = count = 0.0
+        # Score histogram for a streaming AUC estimate (1000 bins)
+        positives = np.zeros(1000)
+        negatives = np.zeros(1000)
+        for block in range(n_blocks):
+            x, y = self._load_block(features, labels, block, mean, scale)
+            if holdout:
+                held_out = self._holdout_mask(block, len(y))
+                x, y = x[held_out], y[held_out]
+            p = _sigmoid(x @ params[:-1] + params[-1])
+            clipped = np.clip(p, 1e-7, 1 - 1e-7)
+            loss += float(-(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)).sum())
+            correct += float(((p >= 0.5) == (y > 0)).sum())
+            count += len(y)
+            bins = np.minimum((p * 1000).astype(int), 999)
+            positives += np.bincount(bins[y > 0], minlength=1000)
+            negatives += np.bincount(bins[y == 0], minlength=1000)
+
+        # P(score_pos > score_neg), ties counted as half
+        negatives_below = np.cumsum(negatives) - negatives
+        pairs = positives.sum() * negatives.sum()
+        auc = float((positives * (negatives_below + 0.5 * negatives)).sum() / pairs) if pairs else 0.0
+
+        return {
+            "log_loss": round(loss / count, 6) if count else 0.0,
+            "accuracy": round(correct / count, 6) if count else 0.0,
+            "auc": round(auc, 6),
+            "evaluated_rows": int(count),
+        }
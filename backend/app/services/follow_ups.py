@@ -0,0 +1,232 @@
+"""
+Follow-up Service - Scheduled reminders for stalled leads
+
+Every lead in a stage with a follow-up policy (FOLLOW_UP_DAYS) has a
+deadline: its last interaction plus the stage's number of days. The
+FollowUpScheduler keeps these deadlines in a hierarchical timing wheel
+and, on every tick:
+
+1. reads the leads changed since its cursor from the (updated_at, id)
+   index and reschedules or cancels them, so interactions, stage moves
+   and new leads are picked up without scanning the table (only the
+   first pass after startup reads every lead);
+2. advances the wheel and hands the expired leads to the
+   `fire_follow_up_reminders` database function, which recomputes each
+   deadline from the current row and files an action item for those that
+   really passed. Leads whose deadline moved are put back on the wheel.
+
+Each expiry costs O(1) in the wheel and one row in a batched call, and
+the database stays authoritative, so a change the scheduler has not read
+yet can never cause a wrong reminder. Run one scheduler per deployment.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.metrics import metrics
+from app.repositories.action_item_repo import ActionItemRepository
+from app.repositories.lead_repo import LeadRepository
+from app.services.timing_wheel import TimingWheel
+
+
+logger = logging.getLogger(__name__)
+
+reminders_fired_counter = metrics.counter(
+    "follow_up_reminders_fired",
+    "Follow-up deadlines that passed and were filed as action items",
+)
+reminders_rescheduled_counter = metrics.counter(
+    "follow_up_reminders_rescheduled",
+    "Expired follow-up deadlines that had moved and were put back on the wheel",
+)
+
+# Lead columns the scheduler reads
+FOLLOW_UP_COLUMNS = "id,stage,last_interaction_at,last_interaction_days_ago,created_at,updated_at"
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def follow_up_deadline(row: dict, follow_up_days: Dict[str, int]) -> Optional[datetime]:
+    """
+    Compute a lead's follow-up deadline.
+
+    The last interaction is `last_interaction_at`, or for leads that never
+    had an event, `last_interaction_days_ago` days before the lead was
+    created. Must match `fire_follow_up_reminders` in
+    scripts/add_follow_up_reminders_migration.sql.
+
+    Args:
+        row: Lead row with the FOLLOW_UP_COLUMNS fields
+        follow_up_days: Days without interaction before a follow-up, per stage
+
+    Returns:
+        The deadline, or None if the lead's stage has no follow-ups
+    """
+    days = follow_up_days.get(row.get("stage"))
+    if days is None:
+        return None
+    last_interaction = _parse_time(row.get("last_interaction_at"))
+    if last_interaction is None:
+        created_at = _parse_time(row.get("created_at"))
+        if created_at is None:
+            return None
+        last_interaction = created_at - timedelta(days=row.get("last_interaction_days_ago") or 0)
+    return last_interaction + timedelta(days=days)
+
+
+class FollowUpScheduler:
+    """Timing-wheel scheduler filing follow-up action items for stalled leads."""
+
+    def __init__(
+        self,
+        leads: LeadRepository,
+        action_items: ActionItemRepository,
+        follow_up_days: Dict[str, int],
+        tick_seconds: float = 60.0,
+        settle_seconds: float = 2.0,
+        page_size: int = 5000,
+        fire_batch_size: int = 1000,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            leads: Lead repository, with a client that sees every owner's leads
+            action_items: Action item repository
+            follow_up_days: Days without interaction before a follow-up, per stage
+            tick_seconds: Wheel resolution and time between steps
+            settle_seconds: Lead changes newer than this are read on a later
+                step, so late-committing transactions are not skipped
+            page_size: Changed leads read per query
+            fire_batch_size: Expired leads per database call
+        """
+        self._leads = leads
+        self._action_items = action_items
+        self._follow_up_days = dict(follow_up_days)
+        self._tick_seconds = tick_seconds
+        self._settle = timedelta(seconds=settle_seconds)
+        self._page_size = page_size
+        self._fire_batch_size = fire_batch_size
+        self._wheel: Optional[TimingWheel] = None
+        self._cursor: Optional[Tuple[str, str]] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of scheduled follow-up deadlines."""
+        return len(self._wheel) if self._wheel is not None else 0
+
+    def sync(self, now: datetime) -> int:
+        """
+        Apply lead changes since the cursor to the wheel.
+
+        Returns:
+            Number of changed leads read
+        """
+        if self._wheel is None:
+            self._wheel = TimingWheel(now.timestamp(), tick_seconds=self._tick_seconds)
+        until = (now - self._settle).isoformat()
+        read = 0
+        while True:
+            rows = self._leads.get_changed_rows(self._cursor, until, self._page_size, columns=FOLLOW_UP_COLUMNS)
+            for row in rows:
+                deadline = follow_up_deadline(row, self._follow_up_days)
+                if deadline is None:
+                    self._wheel.cancel(row["id"])
+                else:
+                    self._wheel.schedule(row["id"], deadline.timestamp())
+            read += len(rows)
+            if rows:
+                self._cursor = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < self._page_size:
+                return read
+
+    def fire(self, now: datetime) -> int:
+        """
+        Advance the wheel to `now` and file reminders for expired deadlines.
+
+        Returns:
+            Number of reminders filed
+        """
+        if self._wheel is None:
+            return 0
+        expired = self._wheel.advance(now.timestamp())
+        fired = 0
+        for start in range(0, len(expired), self._fire_batch_size):
+            results = self._action_items.fire_follow_ups(
+                expired[start:start + self._fire_batch_size], self._follow_up_days, now
+            )
+            for result in results:
+                if result["fired"]:
+                    fired += 1
+                elif result["due_at"] is not None:
+                    # The lead changed after it was scheduled; its new deadline is later
+                    self._wheel.schedule(result["id"], _parse_time(result["due_at"]).timestamp())
+                    reminders_rescheduled_counter.inc()
+        reminders_fired_counter.inc(fired)
+        return fired
+
+    def step(self, now: Optional[datetime] = None) -> int:
+        """Read lead changes, then fire due reminders; returns the reminders filed."""
+        now = now or datetime.now(timezone.utc)
+        self.sync(now)
+        return self.fire(now)
+
+    async def start(self) -> None:
+        """Start stepping every tick on the running event loop."""
+        if self._task is not None:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task after its current step."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(self.step)
+            except Exception:
+                logger.exception("Follow-up reminder step failed")
+            try:
+                await asyncio.wait_for(self._stop.wait(), self._tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Follow-up scheduler singleton
+_scheduler: Optional[FollowUpScheduler] = None
+
+
+def get_follow_up_scheduler() -> Optional[FollowUpScheduler]:
+    """
+    Get the follow-up reminder scheduler.
+
+    Returns None unless FOLLOW_UP_SCHEDULER_ENABLED is set. The scheduler
+    is started and stopped by the application lifespan.
+    """
+    global _scheduler
+
+    if _scheduler is None and settings.FOLLOW_UP_SCHEDULER_ENABLED:
+        client = get_supabase_client()
+        _scheduler = FollowUpScheduler(
+            LeadRepository(client),
+            ActionItemRepository(client),
+            settings.FOLLOW_UP_DAYS,
+            tick_seconds=settings.FOLLOW_UP_TICK_SECONDS,
+            settle_seconds=settings.LEAD_SYNC_SETTLE_SECONDS,
+        )
+    return _scheduler
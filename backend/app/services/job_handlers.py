@@ -0,0 +1,157 @@
+"""
+Job Handlers - Background work run by the job queue
+
+Each handler receives the claimed Job and a JobContext, reports progress
+through the context and returns a JSON-serializable result. Handlers may
+run more than once for the same job (retries, or a worker that died), so
+they either recompute from scratch idempotently or resume from a
+checkpoint saved in the job's progress.
+"""
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.models.columns import LeadColumns
+from app.repositories.lead_repo import LeadRepository, get_fingerprint_indexes
+from app.repositories.scoring_profile_repo import ScoringProfileRepository
+from app.services.job_queue import Job, JobContext, JobHandler, JobInterrupted, JobRunner, get_job_queue
+from app.services.lead_dedup import LeadDeduplicator
+from app.services.lead_validation import save_errors, validate_leads
+from app.services.rescoring import RescoreJob, run_rescore
+from app.services.scoring_engine import BaseScoringEngine, build_scoring_engine, get_scoring_service
+
+
+# Rows validated, scored and saved per import step (and per checkpoint)
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors kept in an import's progress and result
+MAX_REPORTED_ERRORS = 100
+
+
+def _owner_engine(owner_id: str) -> BaseScoringEngine:
+    """Engine for the owner's saved scoring profile, or the default engine."""
+    profile = ScoringProfileRepository(get_supabase_client()).get_profile(owner_id)
+    return build_scoring_engine(profile) if profile is not None else get_scoring_service()
+
+
+def run_lead_import(job: Job, context: JobContext) -> Dict[str, Any]:
+    """
+    Validate, deduplicate, score and save a large list of leads.
+
+    Works through the payload in chunks of IMPORT_CHUNK_SIZE rows and
+    checkpoints after each saved chunk, so a retried job continues after
+    the last saved chunk instead of importing it again.
+
+    Payload:
+        leads: Raw lead objects in the POST /leads format
+    """
+    rows: List[Any] = job.payload["leads"]
+    owner_id = job.owner_id
+    repository = LeadRepository(get_supabase_client())
+    engine = _owner_engine(owner_id)
+    deduplicator = (
+        LeadDeduplicator(repository, fingerprints=get_fingerprint_indexes())
+        if settings.LEAD_DEDUP_ENABLED else None
+    )
+
+    progress = context.progress
+    done = progress.get("rows_done", 0)
+    created = progress.get("created", 0)
+    merged = progress.get("merged", 0)
+    failed = progress.get("failed", 0)
+    errors: List[dict] = progress.get("errors", [])
+    context.report(total_rows=len(rows), rows_done=done)
+
+    for start in range(done, len(rows), IMPORT_CHUNK_SIZE):
+        if context.stopping:
+            raise JobInterrupted()
+        chunk = rows[start:start + IMPORT_CHUNK_SIZE]
+        leads, indices, chunk_errors = validate_leads(chunk)
+
+        unsaved: List[int] = []
+        if deduplicator is not None:
+            dedup = deduplicator.prepare(owner_id, leads, engine)
+            if dedup.leads:
+                deduplicator.commit(owner_id, dedup, engine)
+            created += dedup.created_count
+            merged += dedup.merged_count
+            unsaved = dedup.failed_rows
+        elif leads:
+            batch = engine.score_columns(LeadColumns.from_rows(leads))
+            _, unsaved = repository.insert_scored_leads(
+                leads, batch.scores, batch.priorities, batch.explanations, owner_id=owner_id
+            )
+            created += len(leads) - len(unsaved)
+
+        if unsaved:
+            chunk_errors = sorted(chunk_errors + save_errors(leads, unsaved, indices), key=lambda error: error.index)
+        for error in chunk_errors:
+            error.index += start
+
+        failed += len(chunk_errors)
+        room = MAX_REPORTED_ERRORS - len(errors)
+        errors.extend(error.model_dump() for error in chunk_errors[:max(room, 0)])
+        context.report(
+            checkpoint=True,
+            rows_done=start + len(chunk),
+            created=created,
+            merged=merged,
+            failed=failed,
+            errors=errors,
+        )
+
+    return {"created": created, "merged": merged, "failed": failed, "errors": errors}
+
+
+def run_rescore_job(job: Job, context: JobContext) -> Dict[str, Any]:
+    """
+    Rescore all of an owner's leads with the parallel rescoring service.
+
+    Rescoring is idempotent, so a retried job simply runs again.
+
+    Payload:
+        dry_run: Count changed leads without writing them
+    """
+    client = get_supabase_client()
+    profile = ScoringProfileRepository(client).get_profile(job.owner_id)
+    rescore = RescoreJob(job.owner_id, dry_run=job.payload.get("dry_run", False))
+
+    def on_progress(progress: RescoreJob) -> None:
+        context.report(**progress.to_status().model_dump(
+            include={"total_leads", "scanned", "changed", "chunks_done", "chunks_total", "workers", "leads_per_second"}
+        ))
+
+    run_rescore(rescore, LeadRepository(client), profile, on_progress=on_progress)
+    if rescore.status == "failed":
+        raise RuntimeError(rescore.error)
+    return rescore.to_status().model_dump(exclude={"job_id", "status", "error"})
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    "lead_import": run_lead_import,
+    "rescore": run_rescore_job,
+}
+
+
+# Job runner singleton
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> Optional[JobRunner]:
+    """
+    Get this process's job runner.
+
+    Returns None unless JOB_RUNNER_ENABLED is set. The runner is started
+    and stopped by the application lifespan.
+    """
+    global _job_runner
+
+    if _job_runner is None and settings.JOB_RUNNER_ENABLED:
+        _job_runner = JobRunner(
+            get_job_queue(),
+            JOB_HANDLERS,
+            concurrency=settings.JOB_WORKERS,
+            poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+            retention_seconds=settings.JOB_RETENTION_HOURS * 3600,
+        )
+    return _job_runner
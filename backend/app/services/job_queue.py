@@ -0,0 +1,590 @@
+"""
+Job Queue Service - Durable local background jobs
+
+Long-running work (imports, rescoring) is enqueued as a job in a local
+SQLite database and executed by worker tasks started from the application
+lifespan, so it leaves the request path and survives worker restarts.
+
+- Claims are atomic (`BEGIN IMMEDIATE`), so every API worker process on the
+  host can share one queue file.
+- A claimed job holds a lease that its runner renews while the handler
+  runs. If the process dies the lease expires and the job is queued again.
+  Each claim gets a token that the runner's updates must match, so a
+  worker whose lease expired cannot overwrite the job's next attempt.
+- Failed attempts are retried with exponential backoff and jitter until
+  `max_attempts` is reached.
+- Claims are fair across owners: owners with fewer running jobs go first,
+  then the owner served least recently, and no owner runs more than
+  `max_running_per_owner` jobs at once.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.schemas import JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+jobs_completed_counter = metrics.counter("jobs_completed", "Background jobs that succeeded")
+jobs_failed_counter = metrics.counter("jobs_failed", "Background jobs that failed permanently")
+jobs_retried_counter = metrics.counter("jobs_retried", "Background job attempts scheduled for retry")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    claim_token TEXT,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner_status ON jobs(owner_id, status);
+CREATE TABLE IF NOT EXISTS job_owners (
+    owner_id TEXT PRIMARY KEY,
+    last_claimed_at REAL NOT NULL
+);
+"""
+
+# Columns read when polling jobs (get, list_for_owner, find_active); only `claim` reads the payload
+STATUS_COLUMNS = (
+    "id, owner_id, kind, status, attempts, max_attempts, run_after, claim_token, "
+    "progress, result, error, created_at, started_at, finished_at"
+)
+
+# Next runnable job: fewest running jobs for the owner, then least recently served owner, then oldest
+CLAIM_SQL = """
+WITH running AS (
+    SELECT owner_id, COUNT(*) AS n FROM jobs WHERE status = 'running' GROUP BY owner_id
+)
+SELECT jobs.id, jobs.owner_id
+FROM jobs
+LEFT JOIN running ON running.owner_id = jobs.owner_id
+LEFT JOIN job_owners ON job_owners.owner_id = jobs.owner_id
+WHERE jobs.status = 'queued'
+  AND jobs.run_after <= :now
+  AND COALESCE(running.n, 0) < :max_running
+ORDER BY COALESCE(running.n, 0), COALESCE(job_owners.last_claimed_at, 0), jobs.created_at
+LIMIT 1
+"""
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for failures that retrying cannot fix."""
+
+
+class JobInterrupted(Exception):
+    """Raised by a job handler that stopped early because the runner is shutting down."""
+
+
+@dataclass
+class Job:
+    """A queued, running or finished background job."""
+
+    id: str
+    owner_id: str
+    kind: str
+    payload: Optional[Dict[str, Any]]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: float
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    claim_token: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        """Job from a `jobs` row; the payload is None unless the row includes it."""
+        return cls(
+            id=row["id"],
+            owner_id=row["owner_id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]) if "payload" in row.keys() else None,
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            progress=json.loads(row["progress"] or "{}"),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            claim_token=row["claim_token"],
+        )
+
+    def to_status(self) -> JobStatus:
+        """Public view of the job (without its payload)."""
+        def timestamp(value: Optional[float]) -> Optional[datetime]:
+            return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+        return JobStatus(
+            id=self.id,
+            kind=self.kind,
+            status=self.status,
+            attempts=self.attempts,
+            max_attempts=self.max_attempts,
+            progress=self.progress,
+            result=self.result,
+            error=self.error,
+            created_at=timestamp(self.created_at),
+            started_at=timestamp(self.started_at),
+            finished_at=timestamp(self.finished_at),
+            next_attempt_at=timestamp(self.run_after) if self.status == "queued" and self.attempts else None,
+        )
+
+
+class JobQueue:
+    """SQLite-backed job queue shared by all worker processes on a host."""
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 60,
+        max_running_per_owner: int = 1,
+        retry_base_seconds: float = 5,
+        retry_max_seconds: float = 300,
+    ):
+        """
+        Initialize the queue, creating the database file if needed.
+
+        Args:
+            path: SQLite database file
+            lease_seconds: How long a claim is valid without a heartbeat
+            max_running_per_owner: Maximum concurrently running jobs per owner
+            retry_base_seconds: Delay before the first retry; doubles per attempt
+            retry_max_seconds: Upper bound on the retry delay
+        """
+        self._path = path
+        self._lease_seconds = lease_seconds
+        self._max_running_per_owner = max_running_per_owner
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "claim_token" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN claim_token TEXT")
+
+    @property
+    def lease_seconds(self) -> float:
+        return self._lease_seconds
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, in autocommit mode with WAL journaling."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(
+        self, owner_id: str, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None
+    ) -> Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            owner_id: Owner the job runs for (used for fair scheduling)
+            kind: Handler name
+            payload: JSON-serializable handler input
+            max_attempts: Attempts before the job fails (defaults to JOB_MAX_ATTEMPTS)
+
+        Returns:
+            The queued job
+        """
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            owner_id=owner_id,
+            kind=kind,
+            payload=payload,
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=now,
+            created_at=now,
+        )
+        self._connection().execute(
+            "INSERT INTO jobs (id, owner_id, kind, payload, status, max_attempts, run_after, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (job.id, owner_id, kind, json.dumps(payload), job.max_attempts, now, now),
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID, without its payload."""
+        row = self._connection().execute(f"SELECT {STATUS_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def list_for_owner(self, owner_id: str, limit: int = 20) -> List[Job]:
+        """An owner's most recent jobs, newest first, without their payloads."""
+        rows = self._connection().execute(
+            f"SELECT {STATUS_COLUMNS} FROM jobs WHERE owner_id = ? ORDER BY created_at DESC LIMIT ?", (owner_id, limit)
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def find_active(self, owner_id: str, kind: str) -> Optional[Job]:
+        """An owner's queued or running job of the given kind, if any, without its payload."""
+        row = self._connection().execute(
+            f"SELECT {STATUS_COLUMNS} FROM jobs WHERE owner_id = ? AND kind = ? AND status IN ('queued', 'running') "
+            "ORDER BY created_at LIMIT 1",
+            (owner_id, kind),
+        ).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def claim(self) -> Optional[Job]:
+        """
+        Claim the next runnable job, or return None if there is none.
+
+        Jobs whose lease expired (their worker died) are first queued again,
+        or failed if they have used all their attempts. The claimed job
+        carries a new `claim_token` to pass to the methods that update it.
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = :now, lease_until = NULL, claim_token = NULL, "
+                "error = 'Worker stopped while running the job' "
+                "WHERE status = 'running' AND lease_until < :now AND attempts >= max_attempts",
+                {"now": now},
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', run_after = :now, lease_until = NULL, claim_token = NULL "
+                "WHERE status = 'running' AND lease_until < :now",
+                {"now": now},
+            )
+            row = conn.execute(CLAIM_SQL, {"now": now, "max_running": self._max_running_per_owner}).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, claim_token = ?, "
+                "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (now + self._lease_seconds, uuid.uuid4().hex, now, row["id"]),
+            )
+            conn.execute(
+                "INSERT INTO job_owners (owner_id, last_claimed_at) VALUES (?, ?) "
+                "ON CONFLICT (owner_id) DO UPDATE SET last_claimed_at = excluded.last_claimed_at",
+                (row["owner_id"], now),
+            )
+            job = Job.from_row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+            conn.execute("COMMIT")
+            return job
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def heartbeat(self, job_id: str, claim_token: str, progress: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Renew a running job's lease and optionally save its progress.
+
+        Returns:
+            False if the claim is no longer held (the lease expired and the
+            job was queued again or claimed by another worker)
+        """
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_until = ?, progress = COALESCE(?, progress) "
+            "WHERE id = ? AND claim_token = ? AND status = 'running'",
+            (time.time() + self._lease_seconds, json.dumps(progress) if progress is not None else None,
+             job_id, claim_token),
+        )
+        return cursor.rowcount > 0
+
+    def complete(
+        self, job_id: str, claim_token: str, result: Optional[Dict[str, Any]],
+        progress: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Mark a job succeeded, if the claim is still held."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = 'succeeded', finished_at = ?, lease_until = NULL, claim_token = NULL, "
+            "error = NULL, result = ?, progress = COALESCE(?, progress) "
+            "WHERE id = ? AND claim_token = ? AND status = 'running'",
+            (time.time(), json.dumps(result) if result is not None else None,
+             json.dumps(progress) if progress is not None else None, job_id, claim_token),
+        )
+        if cursor.rowcount:
+            jobs_completed_counter.inc()
+
+    def fail(
+        self, job_id: str, claim_token: str, error: str, retry: bool = True,
+        progress: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Record a failed attempt, if the claim is still held.
+
+        The job is queued again after a backoff delay while it has attempts
+        left and `retry` is set; otherwise it fails permanently.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND claim_token = ? AND status = 'running'",
+            (job_id, claim_token),
+        ).fetchone()
+        if row is None:
+            return
+        now = time.time()
+        progress_json = json.dumps(progress) if progress is not None else None
+        if retry and row["attempts"] < row["max_attempts"]:
+            delay = min(self._retry_base_seconds * 2 ** (row["attempts"] - 1), self._retry_max_seconds)
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', run_after = ?, lease_until = NULL, claim_token = NULL, "
+                "error = ?, progress = COALESCE(?, progress) WHERE id = ? AND claim_token = ? AND status = 'running'",
+                (now + delay * random.uniform(0.5, 1.0), error, progress_json, job_id, claim_token),
+            )
+            if cursor.rowcount:
+                jobs_retried_counter.inc()
+        else:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_until = NULL, claim_token = NULL, "
+                "error = ?, progress = COALESCE(?, progress) WHERE id = ? AND claim_token = ? AND status = 'running'",
+                (now, error, progress_json, job_id, claim_token),
+            )
+            if cursor.rowcount:
+                jobs_failed_counter.inc()
+
+    def release(self, job_id: str, claim_token: str, progress: Optional[Dict[str, Any]] = None) -> None:
+        """Put an interrupted job back in the queue without using up an attempt, if the claim is still held."""
+        self._connection().execute(
+            "UPDATE jobs SET status = 'queued', run_after = ?, lease_until = NULL, claim_token = NULL, "
+            "attempts = MAX(attempts - 1, 0), progress = COALESCE(?, progress) "
+            "WHERE id = ? AND claim_token = ? AND status = 'running'",
+            (time.time(), json.dumps(progress) if progress is not None else None, job_id, claim_token),
+        )
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete finished jobs older than `max_age_seconds`; returns the number deleted."""
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+            (time.time() - max_age_seconds,),
+        )
+        return cursor.rowcount
+
+
+class JobContext:
+    """Handed to a job handler to report progress and observe shutdown."""
+
+    def __init__(self, queue: JobQueue, job: Job, min_report_interval: float = 1.0):
+        self.job = job
+        self.progress: Dict[str, Any] = dict(job.progress)
+        self.stopping = False
+        self._queue = queue
+        self._min_report_interval = min_report_interval
+        self._last_report = 0.0
+
+    def report(self, checkpoint: bool = False, **progress: Any) -> None:
+        """
+        Update the job's progress.
+
+        Writes are throttled to one per `min_report_interval`; pass
+        `checkpoint=True` for progress a retry must resume from, which is
+        always written immediately.
+        """
+        self.progress.update(progress)
+        now = time.monotonic()
+        if checkpoint or now - self._last_report >= self._min_report_interval:
+            self._last_report = now
+            if not self._queue.heartbeat(self.job.id, self.job.claim_token, self.progress):
+                # The lease was lost; another attempt owns the job now
+                self.stopping = True
+
+
+JobHandler = Callable[[Job, JobContext], Optional[Dict[str, Any]]]
+
+
+class JobRunner:
+    """
+    Worker tasks that claim and run jobs.
+
+    Handlers are blocking functions; each runs in its own daemon thread so
+    a long job never blocks the event loop or delays process exit.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        shutdown_grace_seconds: float = 10,
+        retention_seconds: float = 72 * 3600,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            queue: Queue to claim jobs from
+            handlers: Handler per job kind
+            concurrency: Jobs run at the same time by this process
+            poll_interval: Seconds between claims when the queue is empty
+            shutdown_grace_seconds: How long `stop` waits for running jobs
+            retention_seconds: Age after which finished jobs are deleted
+        """
+        self._queue = queue
+        self._handlers = handlers
+        self._concurrency = concurrency
+        self._poll_interval = poll_interval
+        self._shutdown_grace_seconds = shutdown_grace_seconds
+        self._retention_seconds = retention_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._contexts: Dict[str, JobContext] = {}
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self._tasks:
+            return
+        self._stopping = asyncio.Event()
+        await asyncio.to_thread(self._queue.prune, self._retention_seconds)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self._concurrency)]
+
+    async def stop(self) -> None:
+        """
+        Stop claiming jobs and give running jobs a grace period.
+
+        Running handlers are told to stop via `JobContext.stopping`. Jobs
+        still running after the grace period keep their lease until it
+        expires and are then retried by another worker.
+        """
+        if not self._tasks:
+            return
+        self._stopping.set()
+        for context in self._contexts.values():
+            context.stopping = True
+        done, pending = await asyncio.wait(self._tasks, timeout=self._shutdown_grace_seconds)
+        for task in pending:
+            task.cancel()
+        self._tasks = []
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = await asyncio.to_thread(self._queue.claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            await asyncio.to_thread(self._queue.fail, job.id, job.claim_token, f"Unknown job kind '{job.kind}'", False)
+            return
+
+        context = JobContext(self._queue, job)
+        self._contexts[job.id] = context
+        heartbeat = asyncio.create_task(self._heartbeat(context))
+        try:
+            result = await self._in_thread(handler, job, context)
+        except JobInterrupted:
+            await asyncio.to_thread(self._queue.release, job.id, job.claim_token, context.progress)
+        except PermanentJobError as e:
+            await asyncio.to_thread(self._queue.fail, job.id, job.claim_token, str(e), False, context.progress)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %d", job.id, job.kind, job.attempts)
+            await asyncio.to_thread(
+                self._queue.fail, job.id, job.claim_token, str(e) or type(e).__name__, True, context.progress
+            )
+        else:
+            await asyncio.to_thread(self._queue.complete, job.id, job.claim_token, result, context.progress)
+        finally:
+            heartbeat.cancel()
+            self._contexts.pop(job.id, None)
+
+    async def _heartbeat(self, context: JobContext) -> None:
+        """Renew the lease while the handler runs; tell the handler to stop if the lease was lost."""
+        interval = max(self._queue.lease_seconds / 3, 0.1)
+        job = context.job
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self._queue.heartbeat, job.id, job.claim_token):
+                logger.warning("Job %s (%s) lost its lease; stopping the handler", job.id, job.kind)
+                context.stopping = True
+                return
+
+    @staticmethod
+    async def _in_thread(handler: JobHandler, job: Job, context: JobContext) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(setter, value) -> None:
+            if not future.done():
+                setter(value)
+
+        def target() -> None:
+            try:
+                result = handler(job, context)
+            except BaseException as e:
+                outcome = (future.set_exception, e)
+            else:
+                outcome = (future.set_result, result)
+            try:
+                loop.call_soon_threadsafe(resolve, *outcome)
+            except RuntimeError:
+                # The event loop closed while the job was running
+                pass
+
+        threading.Thread(target=target, name=f"job-{job.id}", daemon=True).start()
+        return await future
+
+
+# Job queue singleton
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue at JOB_QUEUE_PATH."""
+    global _job_queue
+
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            settings.JOB_QUEUE_PATH,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            max_running_per_owner=settings.JOB_MAX_RUNNING_PER_OWNER,
+            retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+            retry_max_seconds=settings.JOB_RETRY_MAX_SECONDS,
+        )
+    return _job_queue
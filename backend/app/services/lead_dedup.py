@@ -0,0 +1,457 @@
+"""
+Lead Deduplication Service - Fingerprint matching at ingestion
+
+The same prospect often arrives more than once, e.g. from the Website form
+and again from LinkedIn. Before leads are saved they are reduced to a
+stable fingerprint of their identifying fields:
+
+    1. normalized contact email, if present;
+    2. otherwise the lead ID, exactly as stored (like the table's
+       unique (lead_id, owner_id) constraint and the lead ID lookups).
+
+The company name is not part of the fingerprint: different contacts at
+the same company are different prospects and are never merged.
+
+Fingerprints are MD5 hex digests of "<kind>:<value>", so the
+`add_lead_dedup_migration.sql` backfill can compute the same value for
+existing rows. The database enforces one lead per (owner_id, fingerprint);
+an in-process bloom filter per owner answers "definitely new" for most
+incoming leads so only possible duplicates are looked up.
+
+Duplicates are merged into the stored lead (interactions summed, intent
+flags OR-ed, most recent interaction kept) and rescored.
+"""
+import hashlib
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.columns import LeadColumns
+from app.services.owner_indexes import OwnerIndexRegistry
+from app.services.scoring_engine import BaseScoringEngine, BatchScores
+
+if TYPE_CHECKING:
+    from app.repositories.lead_repo import LeadRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Mail providers that ignore dots in the local part
+DOTLESS_EMAIL_DOMAINS = {"gmail.com": "gmail.com", "googlemail.com": "gmail.com"}
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of an email address, or None if it is not one.
+
+    Lowercases, strips "+tag" sub-addresses and, for Gmail, dots in the
+    local part.
+    """
+    if not value:
+        return None
+    local, _, domain = value.strip().lower().rpartition("@")
+    if not local or not domain:
+        return None
+    local = local.split("+", 1)[0]
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = DOTLESS_EMAIL_DOMAINS[domain]
+    return f"{local}@{domain}" if local else None
+
+
+def hash_key(key: str) -> str:
+    """MD5 hex digest of a fingerprint key (not used for security)."""
+    return hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def lead_id_key(lead_id: str) -> str:
+    """Fingerprint of a lead ID; matches the SQL backfill for leads without contact details."""
+    return hash_key("lead:" + lead_id)
+
+
+def lead_fingerprint(lead: dict) -> str:
+    """
+    Stable identity fingerprint of a lead.
+
+    Args:
+        lead: Lead dictionary with lead_id and optional contact_email
+
+    Returns:
+        32-character hex fingerprint
+    """
+    email = normalize_email(lead.get("contact_email"))
+    if email is not None:
+        return hash_key("email:" + email)
+    return lead_id_key(lead["lead_id"])
+
+
+def merge_leads(existing: dict, incoming: dict) -> dict:
+    """
+    Merge a duplicate into an existing lead.
+
+    Interaction counts are summed, intent flags OR-ed, the most recent
+    interaction and the largest company size are kept, and missing contact
+    details are filled in. Identity, industry, channel and pipeline stage
+    stay those of the existing lead.
+
+    Args:
+        existing: Stored row or earlier lead the duplicate is merged into
+        incoming: The duplicate lead
+
+    Returns:
+        A new dictionary; scores must be recalculated by the caller
+    """
+    merged = dict(existing)
+    merged["interaction_count"] = existing["interaction_count"] + incoming["interaction_count"]
+    merged["has_requested_pricing"] = bool(existing["has_requested_pricing"] or incoming["has_requested_pricing"])
+    merged["has_demo_request"] = bool(existing["has_demo_request"] or incoming["has_demo_request"])
+    merged["company_size"] = max(existing["company_size"], incoming["company_size"])
+
+    days_ago = [
+        value for value in (existing.get("last_interaction_days_ago"), incoming.get("last_interaction_days_ago"))
+        if value is not None
+    ]
+    merged["last_interaction_days_ago"] = min(days_ago) if days_ago else None
+
+    for field in ("contact_email", "company_name"):
+        if not merged.get(field) and incoming.get(field):
+            merged[field] = incoming[field]
+    return merged
+
+
+class BloomFilter:
+    """
+    Bloom filter over fingerprint hex digests.
+
+    Bit positions use double hashing of the two 64-bit halves of the MD5
+    digest, so no extra hashing is done. Bits are packed into a NumPy
+    uint8 array; adding past `capacity` marks the filter saturated.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize an empty filter.
+
+        Args:
+            capacity: Number of keys the filter is sized for
+            error_rate: Target false positive rate at capacity
+        """
+        self.capacity = max(capacity, 1)
+        self.size = max(int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)), 64)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._offsets = np.arange(self.hash_count, dtype=np.uint64)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def saturated(self) -> bool:
+        """Whether more keys were added than the filter was sized for."""
+        return self._count > self.capacity
+
+    def _positions(self, keys: Sequence[str]) -> np.ndarray:
+        """(len(keys), hash_count) bit positions."""
+        digests = [int(key, 16) for key in keys]
+        high = np.array([digest >> 64 for digest in digests], dtype=np.uint64)[:, None]
+        low = np.array([(digest & 0xFFFFFFFFFFFFFFFF) | 1 for digest in digests], dtype=np.uint64)[:, None]
+        return (high + self._offsets * low) % np.uint64(self.size)
+
+    def add_many(self, keys: Sequence[str]) -> None:
+        """Add fingerprint digests."""
+        if not len(keys):
+            return
+        positions = self._positions(keys).ravel()
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        with self._lock:
+            np.bitwise_or.at(self._bits, positions >> np.uint64(3), masks)
+            self._count += len(keys)
+
+    def might_contain_many(self, keys: Sequence[str]) -> np.ndarray:
+        """Boolean mask: False means the key was definitely never added."""
+        if not len(keys):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).astype(bool).all(axis=1)
+
+
+class FingerprintIndexRegistry(OwnerIndexRegistry[BloomFilter]):
+    """
+    Bounded LRU cache of per-owner fingerprint bloom filters.
+
+    Filters are built on first use from a loader that streams the owner's
+    (lead_id, fingerprint) rows, kept current by `apply_changes`, and
+    rebuilt in the background after `ttl_seconds` or once saturated (see
+    OwnerIndexRegistry). A filter that misses a lead written by another
+    worker only costs a skipped lookup: the insert skips the conflicting
+    row and `LeadDeduplicator.commit` merges it into the stored lead.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Iterable[dict]],
+        max_owners: int = 256,
+        ttl_seconds: float = 3600,
+        error_rate: float = 0.01,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            loader: Returns an iterable of rows (lead_id, fingerprint) for an owner
+            max_owners: Maximum number of owner filters kept in memory
+            ttl_seconds: Age after which an owner's filter is rebuilt
+            error_rate: Target false positive rate of each filter
+        """
+        super().__init__(max_owners, ttl_seconds)
+        self._loader = loader
+        self._error_rate = error_rate
+
+    def _expired(self, index: BloomFilter, built_at: float) -> bool:
+        return index.saturated or super()._expired(index, built_at)
+
+    def _build(self, owner_id: str) -> BloomFilter:
+        keys = []
+        for row in self._loader(owner_id):
+            keys.extend(self._row_keys(row))
+        # Leave room for growth until the next rebuild
+        bloom = BloomFilter(max(2 * len(keys), 1024), self._error_rate)
+        bloom.add_many(keys)
+        return bloom
+
+    def _apply(self, index: BloomFilter, changes: List[Tuple[Optional[dict], Optional[dict]]]) -> None:
+        # Removed leads stay in the filter; they only cost a lookup
+        keys = []
+        for _, after in changes:
+            if after is not None:
+                keys.extend(self._row_keys(after))
+        index.add_many(keys)
+
+    @staticmethod
+    def _row_keys(row: dict) -> List[str]:
+        # Leads can be matched by fingerprint or by lead ID
+        keys = [lead_id_key(row["lead_id"])]
+        if row.get("fingerprint") and row["fingerprint"] != keys[0]:
+            keys.append(row["fingerprint"])
+        return keys
+
+
+@dataclass
+class DedupBatch:
+    """
+    Incoming leads reduced to one merged, scored lead per distinct prospect.
+
+    `leads[g]` is merged into the stored row `existing[g]`, or inserted
+    when that is None. `targets[i]` is the group of input row i.
+    `failed` lists the new groups whose insert failed (set by `commit`).
+    """
+
+    leads: List[dict]
+    existing: List[Optional[dict]]
+    targets: List[int]
+    merged: List[bool]
+    batch: Optional[BatchScores] = None
+    failed: List[int] = field(default_factory=list)
+
+    @property
+    def failed_rows(self) -> List[int]:
+        """Input rows whose group was not saved."""
+        failed = set(self.failed)
+        return [i for i, g in enumerate(self.targets) if g in failed]
+
+    @property
+    def created_count(self) -> int:
+        failed = set(self.failed)
+        return sum(1 for g, row in enumerate(self.existing) if row is None and g not in failed)
+
+    @property
+    def merged_count(self) -> int:
+        failed = set(self.failed)
+        return sum(1 for merged, g in zip(self.merged, self.targets) if merged and g not in failed)
+
+
+class LeadDeduplicator:
+    """Matches incoming leads against an owner's stored leads and merges duplicates."""
+
+    def __init__(
+        self,
+        repository: "LeadRepository",
+        fingerprints: Optional[FingerprintIndexRegistry] = None,
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            repository: Lead repository used for lookups and writes
+            fingerprints: Optional per-owner bloom filters; without them every lead is looked up
+        """
+        self._repository = repository
+        self._fingerprints = fingerprints
+
+    def prepare(self, owner_id: str, leads: Sequence[dict], scoring_engine: BaseScoringEngine) -> DedupBatch:
+        """
+        Merge duplicates within the batch and against stored leads, then score.
+
+        Nothing is written.
+
+        Args:
+            owner_id: The owner ID
+            leads: Validated leads as JSON-compatible dictionaries
+            scoring_engine: Engine used to (re)score the merged leads
+
+        Returns:
+            DedupBatch with one scored lead per distinct prospect
+        """
+        groups: List[dict] = []
+        targets: List[int] = []
+        merged: List[bool] = []
+        by_fingerprint: Dict[str, int] = {}
+        by_lead_id: Dict[str, int] = {}
+
+        for lead in leads:
+            fingerprint = lead_fingerprint(lead)
+            lead_key = lead_id_key(lead["lead_id"])
+            group = by_fingerprint.get(fingerprint, by_lead_id.get(lead_key))
+            if group is None:
+                group = len(groups)
+                groups.append({**lead, "fingerprint": fingerprint})
+                merged.append(False)
+            else:
+                groups[group] = merge_leads(groups[group], lead)
+                merged.append(True)
+            by_fingerprint.setdefault(fingerprint, group)
+            by_lead_id.setdefault(lead_key, group)
+            targets.append(group)
+
+        existing = self._find_existing(owner_id, groups)
+
+        # Several incoming prospects can resolve to the same stored lead
+        group_by_row: Dict[str, int] = {}
+        remap = list(range(len(groups)))
+        for g, row in enumerate(existing):
+            if row is None:
+                continue
+            first = group_by_row.setdefault(row["id"], g)
+            if first != g:
+                groups[first] = merge_leads(groups[first], groups[g])
+                remap[g] = first
+
+        keep = [g for g in range(len(groups)) if remap[g] == g]
+        position = {g: i for i, g in enumerate(keep)}
+        dedup = DedupBatch(
+            leads=[
+                merge_leads(existing[g], groups[g]) if existing[g] is not None else groups[g]
+                for g in keep
+            ],
+            existing=[existing[g] for g in keep],
+            targets=[position[remap[g]] for g in targets],
+            merged=[was_merged or existing[g] is not None for was_merged, g in zip(merged, targets)],
+        )
+        dedup.batch = scoring_engine.score_columns(LeadColumns.from_rows(dedup.leads))
+        return dedup
+
+    def commit(self, owner_id: str, dedup: DedupBatch, scoring_engine: BaseScoringEngine) -> None:
+        """
+        Save a prepared batch: insert new leads and update merged ones.
+
+        A new lead whose insert was skipped because a stored lead already
+        has its fingerprint or lead ID (a concurrent request, or a write the
+        bloom filter had not seen) is merged into that lead instead; `dedup`
+        is updated in place to reflect that. New leads in an insert chunk
+        that failed are recorded in `dedup.failed`.
+
+        Args:
+            owner_id: The owner ID
+            dedup: Batch returned by `prepare`
+            scoring_engine: Engine used to rescore leads merged after a race
+        """
+        batch = dedup.batch
+        new = [g for g, row in enumerate(dedup.existing) if row is None]
+        inserted, failed = self._repository.insert_scored_leads(
+            [dedup.leads[g] for g in new],
+            batch.scores[new],
+            batch.priorities[new],
+            [batch.explanations[g] for g in new] if batch.explanations is not None else None,
+            owner_id=owner_id,
+        )
+
+        dedup.failed = [new[i] for i in failed]
+
+        inserted_fingerprints = {row.get("fingerprint") for row in inserted}
+        failed_groups = set(dedup.failed)
+        raced = [
+            g for g in new
+            if g not in failed_groups and dedup.leads[g]["fingerprint"] not in inserted_fingerprints
+        ]
+        if raced:
+            rows = self._repository.find_leads_by_keys(
+                owner_id,
+                [dedup.leads[g]["fingerprint"] for g in raced],
+                [dedup.leads[g]["lead_id"] for g in raced],
+            )
+            rows_by_fingerprint = {row["fingerprint"]: row for row in rows if row.get("fingerprint")}
+            rows_by_lead_id = {row["lead_id"]: row for row in rows}
+            for g in raced:
+                row = rows_by_fingerprint.get(dedup.leads[g]["fingerprint"]) or rows_by_lead_id.get(dedup.leads[g]["lead_id"])
+                if row is None:
+                    logger.warning("Lead %s was skipped as a duplicate but no match was found", dedup.leads[g]["lead_id"])
+                    continue
+                dedup.existing[g] = row
+                dedup.leads[g] = merge_leads(row, dedup.leads[g])
+            rescored = scoring_engine.score_columns(LeadColumns.from_rows([dedup.leads[g] for g in raced]))
+            for i, g in enumerate(raced):
+                batch.scores[g] = rescored.scores[i]
+                batch.priorities[g] = rescored.priorities[i]
+                if batch.explanations is not None and rescored.explanations is not None:
+                    batch.explanations[g] = rescored.explanations[i]
+            raced_groups = set(raced)
+            dedup.merged = [
+                was_merged or target in raced_groups for was_merged, target in zip(dedup.merged, dedup.targets)
+            ]
+
+        updates = [g for g, row in enumerate(dedup.existing) if row is not None]
+        if updates:
+            self._repository.update_merged_leads(owner_id, [
+                (dedup.existing[g], {
+                    **dedup.leads[g],
+                    "score": int(batch.scores[g]),
+                    "priority": batch.priorities[g].value,
+                    "explanations": batch.explanations[g] if batch.explanations is not None else [],
+                })
+                for g in updates
+            ])
+
+    def _find_existing(self, owner_id: str, groups: List[dict]) -> List[Optional[dict]]:
+        """Stored lead matching each group by fingerprint or lead ID, or None."""
+        existing: List[Optional[dict]] = [None] * len(groups)
+        if not groups:
+            return existing
+
+        fingerprints = [group["fingerprint"] for group in groups]
+        lead_keys = [lead_id_key(group["lead_id"]) for group in groups]
+        if self._fingerprints is not None:
+            bloom = self._fingerprints.get(owner_id)
+            maybe = bloom.might_contain_many(fingerprints) | bloom.might_contain_many(lead_keys)
+            candidates = np.flatnonzero(maybe).tolist()
+        else:
+            candidates = list(range(len(groups)))
+        if not candidates:
+            return existing
+
+        rows = self._repository.find_leads_by_keys(
+            owner_id,
+            [fingerprints[g] for g in candidates],
+            [groups[g]["lead_id"] for g in candidates],
+        )
+        rows_by_fingerprint = {row["fingerprint"]: row for row in rows if row.get("fingerprint")}
+        rows_by_lead_id = {row["lead_id"]: row for row in rows}
+        for g in candidates:
+            existing[g] = rows_by_fingerprint.get(fingerprints[g]) or rows_by_lead_id.get(groups[g]["lead_id"])
+        return existing
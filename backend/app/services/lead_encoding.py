@@ -0,0 +1,205 @@
+"""
+Lead Encoding Service - Sparse fieldsets and a columnar wire format
+
+Lead lists are normally sent as an array of nested LeadResponse objects,
+which repeats every key name and every explanation string once per lead.
+Clients can instead ask for:
+
+- a sparse fieldset (`fields=lead_id,score,priority`), so only the
+  selected columns are read from the database and sent;
+- the columnar encoding, negotiated through the Accept header: one array
+  per field, with low-cardinality strings (industry, channel, stage,
+  priority, company name, explanations) replaced by indexes into a single
+  string table. It is available as JSON, and as MessagePack when the
+  optional `msgpack` package is installed.
+
+Columnar documents look like:
+
+    {
+        "count": 2,
+        "fields": ["lead_id", "industry", "score", "explanations"],
+        "dictionary": ["industry", "explanations"],
+        "strings": ["Technology", "Recent interaction (+20)", "Requested pricing (+30)"],
+        "columns": {
+            "lead_id": ["LEAD-001", "LEAD-002"],
+            "industry": [0, 0],
+            "score": [75, 20],
+            "explanations": [[1, 2], [1]]
+        }
+    }
+
+Columns listed in "dictionary" hold string-table indexes (null stays null).
+"""
+import json
+from typing import Dict, List, Optional, Sequence
+
+from app.core.compression import header_quality
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.leads.columnar+json"
+COLUMNAR_MSGPACK_MEDIA_TYPE = "application/vnd.leads.columnar+msgpack"
+
+# Fields a client can select, in response order
+LEAD_FIELDS: List[str] = [
+    "lead_id",
+    "industry",
+    "company_size",
+    "channel",
+    "interaction_count",
+    "last_interaction_days_ago",
+    "has_requested_pricing",
+    "has_demo_request",
+    "stage",
+    "contact_email",
+    "company_name",
+    "score",
+    "priority",
+    "explanations",
+]
+
+# Fields nested under `score_details` in the row-oriented JSON encoding
+SCORE_FIELDS = ("score", "priority", "explanations")
+
+# Fields with few distinct values, sent as string-table indexes in the columnar encoding
+DICTIONARY_FIELDS = frozenset({"industry", "channel", "stage", "priority", "company_name", "explanations"})
+
+
+def msgpack_available() -> bool:
+    """Whether the optional msgpack dependency is installed."""
+    return msgpack is not None
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Parse a `fields=` query parameter.
+
+    Args:
+        fields: Comma-separated field names, or None for all fields
+
+    Returns:
+        The selected fields in response order
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    if not fields:
+        return list(LEAD_FIELDS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(LEAD_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. Available fields: {', '.join(LEAD_FIELDS)}"
+        )
+    return [name for name in LEAD_FIELDS if name in requested]
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick the lead list encoding for an Accept header.
+
+    Media types are tried in order of their quality value (the `q`
+    parameter, wherever it appears among the parameters); the row-oriented
+    JSON encoding is the default. MessagePack is only offered when the
+    optional dependency is installed.
+
+    Returns:
+        One of the *_MEDIA_TYPE constants
+    """
+    supported = [COLUMNAR_JSON_MEDIA_TYPE, JSON_MEDIA_TYPE]
+    if msgpack is not None:
+        supported.insert(0, COLUMNAR_MSGPACK_MEDIA_TYPE)
+
+    candidates = []
+    for position, part in enumerate((accept or "").split(",")):
+        media_type, _, params = part.partition(";")
+        candidates.append((-header_quality(params), position, media_type.strip().lower()))
+
+    for negative_quality, _, media_type in sorted(candidates):
+        if negative_quality < 0 and media_type in supported:
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def encode_rows(rows: Sequence[dict], fields: Sequence[str]) -> bytes:
+    """
+    Encode rows as a JSON array of LeadResponse-shaped objects limited to `fields`.
+
+    Score fields are nested under `score_details` as in LeadResponse.
+    """
+    top_level = [name for name in fields if name not in SCORE_FIELDS]
+    score_fields = [name for name in fields if name in SCORE_FIELDS]
+    leads = []
+    for row in rows:
+        lead = {name: row.get(name) for name in top_level}
+        if score_fields:
+            lead["score_details"] = {name: row.get(name) for name in score_fields}
+            if "explanations" in score_fields and lead["score_details"]["explanations"] is None:
+                lead["score_details"]["explanations"] = []
+        leads.append(lead)
+    return json.dumps(leads, separators=(",", ":")).encode("utf-8")
+
+
+def to_columnar(rows: Sequence[dict], fields: Sequence[str]) -> dict:
+    """
+    Transpose rows into the columnar document described in the module docstring.
+
+    Args:
+        rows: Lead rows containing at least `fields`
+        fields: Fields to include, in order
+
+    Returns:
+        The columnar document as plain Python objects
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        index = string_ids.get(value)
+        if index is None:
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+
+    columns = {}
+    for name in fields:
+        values = [row.get(name) for row in rows]
+        if name == "explanations":
+            values = [[intern(text) for text in value or []] for value in values]
+        elif name in DICTIONARY_FIELDS:
+            values = [intern(value) for value in values]
+        columns[name] = values
+
+    return {
+        "count": len(rows),
+        "fields": list(fields),
+        "dictionary": [name for name in fields if name in DICTIONARY_FIELDS],
+        "strings": strings,
+        "columns": columns,
+    }
+
+
+def encode_leads(rows: Sequence[dict], fields: Sequence[str], media_type: str) -> bytes:
+    """
+    Encode lead rows for a negotiated media type.
+
+    Args:
+        rows: Lead rows containing at least `fields`
+        fields: Fields to include, in order
+        media_type: Result of `negotiate_media_type`
+
+    Returns:
+        The encoded response body
+    """
+    if media_type == COLUMNAR_MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(to_columnar(rows, fields), use_bin_type=True)
+    if media_type == COLUMNAR_JSON_MEDIA_TYPE:
+        return json.dumps(to_columnar(rows, fields), separators=(",", ":")).encode("utf-8")
+    return encode_rows(rows, fields)
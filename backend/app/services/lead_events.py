@@ -0,0 +1,361 @@
+"""
+Lead Events Service - Interaction event ingestion
+
+Tracking integrations report interactions (email opens, page views,
+pricing requests, ...) as individual events. Rather than rewriting the
+whole lead for each one, events are reduced to a per-lead delta (number
+of interactions, latest interaction time, intent flags) and applied with
+a single set-based statement that appends the events and increments the
+counters in place. The updated rows come back from the same statement,
+so the new score is computed from them without reading the leads, and
+only leads whose score or priority changed get a second, guarded write.
+
+LeadEventBuffer collects events from concurrent requests for a short
+window, so a burst of events for the same lead costs one write.
+Buffered events live in memory until flushed: events still waiting when
+a worker crashes are lost, as with the lead write-behind buffer. A failed
+write is retried with backoff by merging its deltas back into the
+buffer; the interaction write is a single statement, so a failed attempt
+has applied nothing and retrying cannot count an event twice.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.metrics import metrics
+from app.models.schemas import LeadEventType
+from app.repositories.lead_repo import LeadRepository
+from app.services.rescoring import changed_scores
+from app.services.scoring_engine import BaseScoringEngine
+
+
+logger = logging.getLogger(__name__)
+
+flush_leads_histogram = metrics.histogram(
+    "lead_events_flush_leads",
+    "Leads written per coalesced event flush",
+    buckets=(1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+flush_latency_histogram = metrics.histogram(
+    "lead_events_flush_ms",
+    "Time spent applying one coalesced event flush (ms)",
+)
+coalesced_events_counter = metrics.counter(
+    "lead_events_coalesced",
+    "Events merged into another event's write for the same lead",
+)
+failed_events_counter = metrics.counter(
+    "lead_events_failed",
+    "Events dropped by the event buffer after their last retry failed",
+)
+retried_events_counter = metrics.counter(
+    "lead_events_retried",
+    "Events whose write failed and was scheduled for retry",
+)
+
+# (lead_id, event type, occurred_at) as submitted
+LeadEventTuple = Tuple[str, LeadEventType, Optional[datetime]]
+
+
+@dataclass
+class InteractionDelta:
+    """Coalesced effect of one lead's pending events."""
+
+    interactions: int = 0
+    last_interaction_at: Optional[datetime] = None
+    requested_pricing: bool = False
+    requested_demo: bool = False
+    events: List[Tuple[LeadEventType, datetime]] = field(default_factory=list)
+    attempts: int = 0
+
+    def add(self, event_type: LeadEventType, occurred_at: datetime) -> None:
+        """Fold one event into the delta."""
+        self.interactions += 1
+        if self.last_interaction_at is None or occurred_at > self.last_interaction_at:
+            self.last_interaction_at = occurred_at
+        self.requested_pricing |= event_type == LeadEventType.PRICING_REQUEST
+        self.requested_demo |= event_type == LeadEventType.DEMO_REQUEST
+        self.events.append((event_type, occurred_at))
+
+    def merge(self, other: "InteractionDelta") -> None:
+        """Fold another delta for the same lead into this one."""
+        self.interactions += other.interactions
+        if self.last_interaction_at is None or (
+            other.last_interaction_at is not None and other.last_interaction_at > self.last_interaction_at
+        ):
+            self.last_interaction_at = other.last_interaction_at
+        self.requested_pricing |= other.requested_pricing
+        self.requested_demo |= other.requested_demo
+        self.events.extend(other.events)
+        self.attempts = max(self.attempts, other.attempts)
+
+
+def normalize_occurred_at(occurred_at: Optional[datetime], now: Optional[datetime] = None) -> datetime:
+    """
+    Resolve an event time to an aware UTC datetime.
+
+    Missing times default to `now`, naive times are taken as UTC and times
+    in the future (client clock skew) are clamped to `now`.
+    """
+    now = now or datetime.now(timezone.utc)
+    if occurred_at is None:
+        return now
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    return min(occurred_at.astimezone(timezone.utc), now)
+
+
+def coalesce_events(events: Iterable[LeadEventTuple]) -> Dict[str, InteractionDelta]:
+    """
+    Reduce events to one delta per lead.
+
+    Args:
+        events: (lead_id, event type, occurred_at) tuples
+
+    Returns:
+        Deltas keyed by lead_id
+    """
+    now = datetime.now(timezone.utc)
+    deltas: Dict[str, InteractionDelta] = {}
+    for lead_id, event_type, occurred_at in events:
+        delta = deltas.get(lead_id)
+        if delta is None:
+            delta = deltas[lead_id] = InteractionDelta()
+        delta.add(LeadEventType(event_type), normalize_occurred_at(occurred_at, now))
+    return deltas
+
+
+def apply_lead_events(
+    repository: LeadRepository,
+    engine: BaseScoringEngine,
+    owner_id: str,
+    deltas: Dict[str, InteractionDelta],
+) -> Tuple[int, int]:
+    """
+    Apply coalesced events to an owner's leads and rescore them.
+
+    Args:
+        repository: Lead repository
+        engine: The owner's scoring engine
+        owner_id: The owner ID
+        deltas: Deltas keyed by lead_id, from `coalesce_events`
+
+    Returns:
+        Tuple of (leads updated, leads whose score or priority changed)
+
+    Raises:
+        Exception: If the interaction write failed; nothing was applied.
+            A failed score write is only logged: the events are stored and
+            the scores catch up on the lead's next event or a rescore.
+    """
+    if not deltas:
+        return 0, 0
+    events = [
+        {"lead_id": lead_id, "event_type": event_type.value, "occurred_at": occurred_at.isoformat()}
+        for lead_id, delta in deltas.items()
+        for event_type, occurred_at in delta.events
+    ]
+    updates = [
+        {
+            "lead_id": lead_id,
+            "interactions": delta.interactions,
+            "last_interaction_at": delta.last_interaction_at.isoformat(),
+            "requested_pricing": delta.requested_pricing,
+            "requested_demo": delta.requested_demo,
+        }
+        for lead_id, delta in deltas.items()
+    ]
+    rows = repository.apply_interactions(owner_id, events, updates)
+    try:
+        rescored = repository.apply_interaction_scores(owner_id, rows, changed_scores(rows, engine))
+    except Exception:
+        logger.exception("Failed to rescore %d leads after applying their events for owner %s", len(rows), owner_id)
+        rescored = 0
+    return len(rows), rescored
+
+
+class LeadEventBuffer:
+    """
+    Coalesces interaction events per lead and applies them in batches.
+
+    Events are merged into a pending delta per (owner, lead) as they are
+    submitted. Every `window_ms` milliseconds, or as soon as
+    `max_batch_leads` leads are pending, the deltas are applied per owner
+    in chunks of `max_batch_leads` leads. Submitters wait when
+    `max_pending_events` events are already pending.
+
+    The deltas of a chunk that fails are merged back into the pending
+    deltas after a backoff of `retry_base_ms` milliseconds, doubling per
+    attempt; they are dropped and counted as failed once `max_retries`
+    retries have failed.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[str, Dict[str, InteractionDelta]], Tuple[int, int]],
+        window_ms: int = 250,
+        max_batch_leads: int = 1000,
+        max_pending_events: int = 100000,
+        max_retries: int = 3,
+        retry_base_ms: int = 500,
+    ):
+        """
+        Initialize the buffer.
+
+        Args:
+            apply: Blocking callable applying one owner's deltas, e.g. a
+                partial of `apply_lead_events`
+            window_ms: Maximum time an event waits before being applied
+            max_batch_leads: Leads per apply call; reaching it triggers a flush
+            max_pending_events: Pending events before submitters wait
+            max_retries: Retries of a failed chunk before its events are dropped
+            retry_base_ms: Delay before the first retry; doubles per attempt
+        """
+        self._apply = apply
+        self._window = window_ms / 1000
+        self._max_batch_leads = max_batch_leads
+        self._max_pending_events = max_pending_events
+        self._max_retries = max_retries
+        self._retry_base = retry_base_ms / 1000
+        self._pending: Dict[str, Dict[str, InteractionDelta]] = {}
+        # (due time, owner_id, deltas) of failed chunks waiting for their retry
+        self._retries: List[Tuple[float, str, Dict[str, InteractionDelta]]] = []
+        self._pending_leads = 0
+        self._pending_events = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._has_room: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    async def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting events and apply everything still pending, including retries."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def submit(self, owner_id: str, events: List[LeadEventTuple]) -> None:
+        """
+        Queue an owner's events for the next flush.
+
+        Returns once the events are buffered, not when they are written.
+
+        Raises:
+            RuntimeError: If the buffer is not running
+        """
+        while self.is_running and self._pending_events >= self._max_pending_events:
+            self._has_room.clear()
+            await self._has_room.wait()
+        if not self.is_running:
+            raise RuntimeError("Lead event buffer is not running")
+
+        self._merge(owner_id, coalesce_events(events))
+        if self._pending_leads >= self._max_batch_leads:
+            self._wake.set()
+
+    def _merge(self, owner_id: str, deltas: Dict[str, InteractionDelta]) -> None:
+        """Fold deltas into the pending deltas."""
+        pending = self._pending.setdefault(owner_id, {})
+        for lead_id, delta in deltas.items():
+            existing = pending.get(lead_id)
+            if existing is None:
+                pending[lead_id] = delta
+                self._pending_leads += 1
+            else:
+                existing.merge(delta)
+            self._pending_events += delta.interactions
+
+    def _requeue_due_retries(self) -> None:
+        """Merge failed chunks whose backoff has elapsed back into the pending deltas."""
+        now = time.monotonic()
+        waiting = []
+        for retry in self._retries:
+            due, owner_id, deltas = retry
+            if due <= now:
+                self._merge(owner_id, deltas)
+            else:
+                waiting.append(retry)
+        self._retries = waiting
+
+    async def _run(self) -> None:
+        """Flush pending deltas every window until stopped."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._window)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            closing = self._closing
+            self._requeue_due_retries()
+            await self._flush()
+            if closing:
+                break
+
+        # Stopping: keep retrying failed chunks until they succeed or run out of attempts
+        while self._retries:
+            await asyncio.sleep(max(0.0, min(due for due, _, _ in self._retries) - time.monotonic()))
+            self._requeue_due_retries()
+            await self._flush()
+
+    def _retry_or_drop(self, owner_id: str, chunk: Dict[str, InteractionDelta]) -> None:
+        """Schedule a failed chunk's deltas for retry, dropping those out of attempts."""
+        retry: Dict[str, InteractionDelta] = {}
+        dropped = 0
+        for lead_id, delta in chunk.items():
+            delta.attempts += 1
+            if delta.attempts > self._max_retries:
+                dropped += delta.interactions
+            else:
+                retry[lead_id] = delta
+        if dropped:
+            failed_events_counter.inc(dropped)
+            logger.error("Dropped %d interaction events for owner %s after %d retries", dropped, owner_id, self._max_retries)
+        if retry:
+            attempt = min(delta.attempts for delta in retry.values())
+            due = time.monotonic() + self._retry_base * 2 ** (attempt - 1)
+            self._retries.append((due, owner_id, retry))
+            retried_events_counter.inc(sum(delta.interactions for delta in retry.values()))
+
+    async def _flush(self) -> None:
+        """Apply every pending delta, one call per owner and chunk of leads."""
+        pending, events = self._pending, self._pending_events
+        if not pending:
+            return
+        self._pending, self._pending_leads, self._pending_events = {}, 0, 0
+        self._has_room.set()
+
+        started = time.perf_counter()
+        leads = 0
+        for owner_id, deltas in pending.items():
+            lead_ids = list(deltas)
+            for start in range(0, len(lead_ids), self._max_batch_leads):
+                chunk = {lead_id: deltas[lead_id] for lead_id in lead_ids[start:start + self._max_batch_leads]}
+                try:
+                    await asyncio.to_thread(self._apply, owner_id, chunk)
+                except Exception:
+                    logger.exception("Failed to apply interaction events for owner %s", owner_id)
+                    self._retry_or_drop(owner_id, chunk)
+            leads += len(lead_ids)
+
+        coalesced_events_counter.inc(events - leads)
+        flush_leads_histogram.observe(leads)
+        flush_latency_histogram.observe((time.perf_counter() - started) * 1000)
@@ -0,0 +1,160 @@
+"""
+Lead Export Service - Streaming encoders
+
+Encoders consume an iterator of row pages and yield encoded byte chunks,
+so an export never holds more than one page in memory regardless of the
+number of leads. Parquet export requires the optional `pyarrow` package.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+EXPORT_COLUMNS: List[str] = [
+    "lead_id",
+    "industry",
+    "company_size",
+    "channel",
+    "interaction_count",
+    "last_interaction_days_ago",
+    "has_requested_pricing",
+    "has_demo_request",
+    "stage",
+    "score",
+    "priority",
+    "explanations",
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed."""
+    return pq is not None
+
+
+def encode_csv(pages: Iterable[List[dict]]) -> Iterator[bytes]:
+    """Encode pages as CSV with a header row; explanations are joined with '; '."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    for page in pages:
+        for row in page:
+            writer.writerow([
+                "; ".join(row.get("explanations") or []) if column == "explanations" else row.get(column)
+                for column in EXPORT_COLUMNS
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(pages: Iterable[List[dict]]) -> Iterator[bytes]:
+    """Encode pages as newline-delimited JSON, one lead per line."""
+    for page in pages:
+        yield "".join(
+            json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}) + "\n"
+            for row in page
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def encode_parquet(pages: Iterable[List[dict]]) -> Iterator[bytes]:
+    """Encode pages as a Parquet file, writing one row group per page."""
+    if pq is None:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+    
+    schema = pa.schema([
+        ("lead_id", pa.string()),
+        ("industry", pa.string()),
+        ("company_size", pa.int32()),
+        ("channel", pa.string()),
+        ("interaction_count", pa.int32()),
+        ("last_interaction_days_ago", pa.int32()),
+        ("has_requested_pricing", pa.bool_()),
+        ("has_demo_request", pa.bool_()),
+        ("stage", pa.string()),
+        ("score", pa.int16()),
+        ("priority", pa.string()),
+        ("explanations", pa.list_(pa.string())),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for page in pages:
+            table = pa.Table.from_pydict(
+                {column: [row.get(column) for row in page] for column in EXPORT_COLUMNS},
+                schema=schema,
+            )
+            writer.write_table(table)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a byte stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_export(pages: Iterable[List[dict]], export_format: str, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Encode an export in the requested format.
+    
+    Args:
+        pages: Iterator of row pages
+        export_format: "csv", "ndjson" or "parquet"
+        gzip: Gzip the output (ignored for Parquet, which compresses internally)
+        
+    Returns:
+        Iterator of encoded byte chunks
+    """
+    if export_format == "parquet":
+        return encode_parquet(pages)
+    
+    encoder = encode_csv if export_format == "csv" else encode_ndjson
+    chunks = encoder(pages)
+    return gzip_stream(chunks) if gzip else chunks
@@ -0,0 +1,330 @@
+"""
+Lead Search Service - In-process n-gram search index
+
+Fallback for deployments without the Postgres trigram search function.
+Each owner gets an inverted index over lowercased lead IDs (trigram
+postings plus a sorted key list for prefix lookups) and a value index
+over the low-cardinality industry and channel fields.
+
+Ranking matches the `search_leads` SQL function:
+    0. lead_id equals the query
+    1. lead_id starts with the query
+    2. industry or channel equals the query
+    3. industry or channel starts with the query
+    4. lead_id contains the query
+    5. industry or channel contains the query
+Within a tier, leads are ordered by score (highest first), then lead_id.
+
+Selective queries touch only the shortest posting lists; the cost of broad
+queries (one or two characters, or a prefix shared by every lead ID) grows
+with the number of matches. Queries shorter than a trigram match lead IDs
+through the postings of every trigram containing them.
+"""
+import bisect
+import heapq
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.owner_indexes import OwnerIndexRegistry
+
+
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str) -> set:
+    """Distinct trigrams of a lowercased string."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class NGramIndex:
+    """
+    Inverted index over one owner's leads.
+
+    Documents are append-only; updating a lead's searchable fields marks
+    the old document dead and appends a new one. Score-only updates are
+    applied in place.
+    """
+
+    VALUE_FIELDS = ("industry", "channel")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lead_ids: List[str] = []
+        self._doc_by_lead: Dict[str, int] = {}
+        self._doc_values: List[Tuple[str, str]] = []
+        self._scores = np.zeros(1024, dtype=np.int16)
+        self._live = np.zeros(1024, dtype=bool)
+        self._size = 0
+        self._grams: Dict[str, array] = {}
+        self._sorted_keys: List[str] = []
+        self._sorted_docs = array("i")
+        # Documents whose lead ID is too short to have trigrams
+        self._short_docs = array("i")
+        self._values: Dict[str, Dict[str, array]] = {field: {} for field in self.VALUE_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._doc_by_lead)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "NGramIndex":
+        """
+        Build an index from rows with lead_id, industry, channel and score.
+
+        The sorted key list is built with one sort at the end instead of
+        an insertion per row.
+        """
+        index = cls()
+        with index._lock:
+            for row in rows:
+                index._add(row, sorted_insert=False)
+            keys = [lead_id.lower() for lead_id in index._lead_ids]
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            index._sorted_keys = [keys[doc] for doc in order]
+            index._sorted_docs = array("i", order)
+        return index
+
+    def add(self, row: dict) -> None:
+        """Add or update a lead from a row with lead_id, industry, channel and score."""
+        with self._lock:
+            self._add(row, sorted_insert=True)
+
+    def _add(self, row: dict, sorted_insert: bool) -> None:
+        lead_id = row["lead_id"]
+        values = (row["industry"].lower(), row["channel"].lower())
+        doc = self._doc_by_lead.get(lead_id)
+
+        if doc is not None and self._doc_values[doc] == values:
+            self._scores[doc] = row["score"]
+            return
+        if doc is not None:
+            self._remove_doc(doc)
+
+        self._append(lead_id, values, row["score"], sorted_insert)
+
+    def remove(self, lead_id: str) -> None:
+        """Remove a lead from the index."""
+        with self._lock:
+            doc = self._doc_by_lead.pop(lead_id, None)
+            if doc is not None:
+                self._remove_doc(doc)
+
+    def _append(self, lead_id: str, values: Tuple[str, str], score: int, sorted_insert: bool) -> None:
+        doc = self._size
+        if doc == len(self._scores):
+            self._scores = np.concatenate([self._scores, np.zeros_like(self._scores)])
+            self._live = np.concatenate([self._live, np.zeros_like(self._live)])
+        self._size += 1
+        self._scores[doc] = score
+        self._live[doc] = True
+        self._lead_ids.append(lead_id)
+        self._doc_values.append(values)
+        self._doc_by_lead[lead_id] = doc
+
+        key = lead_id.lower()
+        if len(key) < NGRAM_SIZE:
+            self._short_docs.append(doc)
+        for gram in _ngrams(key):
+            self._grams.setdefault(gram, array("i")).append(doc)
+        if sorted_insert:
+            position = bisect.bisect_right(self._sorted_keys, key)
+            self._sorted_keys.insert(position, key)
+            self._sorted_docs.insert(position, doc)
+
+        for field, value in zip(self.VALUE_FIELDS, values):
+            self._values[field].setdefault(value, array("i")).append(doc)
+
+    def _remove_doc(self, doc: int) -> None:
+        # Postings keep the dead document; queries filter on the live mask
+        self._live[doc] = False
+        if self._doc_by_lead.get(self._lead_ids[doc]) == doc:
+            del self._doc_by_lead[self._lead_ids[doc]]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Find leads whose lead_id, industry or channel match the query.
+
+        Args:
+            query: Search text (case-insensitive)
+            limit: Page size
+            offset: Number of ranked results to skip
+
+        Returns:
+            Tuple of (lead IDs for the requested page, total number of matches)
+        """
+        # Same normalization as the SQL function: trim spaces, then lowercase
+        term = query.strip(" ").lower()
+        if not term:
+            return [], 0
+
+        with self._lock:
+            emitted = np.zeros(self._size, dtype=bool)
+            wanted = offset + limit
+            page: List[int] = []
+            total = 0
+
+            for tier in self._tiers(term):
+                docs = self._take_new(tier(emitted), emitted)
+                if len(docs) == 0:
+                    continue
+                total += len(docs)
+
+                need = wanted - len(page)
+                if need > 0:
+                    page.extend(self._top(docs, need))
+
+            lead_ids = [self._lead_ids[doc] for doc in page[offset:wanted]]
+
+        return lead_ids, total
+
+    def _top(self, docs: np.ndarray, need: int) -> List[int]:
+        """The best `need` documents of a tier by score (highest first), then lead_id."""
+        keys = -self._scores[docs].astype(np.int32)
+        lead_ids = self._lead_ids
+        ties: List[int] = []
+        if len(docs) > need:
+            # Everything scoring above the cut-off is in; ties at the cut-off are broken by lead_id
+            cutoff = np.partition(keys, need - 1)[need - 1]
+            above = keys < cutoff
+            ties = heapq.nsmallest(
+                need - int(above.sum()), docs[keys == cutoff].tolist(), key=lead_ids.__getitem__
+            )
+            docs, keys = docs[above], keys[above]
+        ranked = sorted(zip(keys.tolist(), [lead_ids[doc] for doc in docs.tolist()], docs.tolist()))
+        return [doc for _, _, doc in ranked] + ties
+
+    def _take_new(self, docs: np.ndarray, emitted: np.ndarray) -> np.ndarray:
+        """Deduplicate live documents not yet emitted by a better tier, and mark them emitted."""
+        if len(docs) == 0:
+            return docs
+        if len(docs) * 16 > self._size:
+            # Large tiers: a mask pass is cheaper than sorting for uniqueness
+            mask = np.zeros(self._size, dtype=bool)
+            mask[docs] = True
+            docs = np.flatnonzero(mask & self._live[:self._size] & ~emitted).astype(np.int32)
+        else:
+            docs = np.unique(docs)
+            docs = docs[self._live[docs] & ~emitted[docs]]
+        emitted[docs] = True
+        return docs
+
+    def _tiers(self, term: str) -> List[Callable[[np.ndarray], np.ndarray]]:
+        """
+        Candidate generators for each ranking tier, best tier first.
+
+        Each generator receives the emitted mask so later, more expensive
+        tiers can skip documents already ranked higher.
+        """
+        empty = np.zeros(0, dtype=np.int32)
+        keys = self._sorted_keys
+        sorted_docs = np.frombuffer(self._sorted_docs, dtype=np.int32) if self._sorted_docs else empty
+        start = bisect.bisect_left(keys, term)
+        exact_end = bisect.bisect_right(keys, term, lo=start)
+        prefix_end = bisect.bisect_left(keys, term + "\uffff", lo=exact_end)
+
+        def lead_exact(emitted: np.ndarray) -> np.ndarray:
+            return sorted_docs[start:exact_end]
+
+        def lead_prefix(emitted: np.ndarray) -> np.ndarray:
+            return sorted_docs[exact_end:prefix_end]
+
+        def lead_substring(emitted: np.ndarray) -> np.ndarray:
+            if len(term) < NGRAM_SIZE:
+                return short_substring(emitted)
+            grams = _ngrams(term)
+            postings = sorted((self._grams.get(gram) for gram in grams), key=lambda p: len(p) if p else 0)
+            if not postings[0]:
+                return empty
+
+            candidates = np.frombuffer(postings[0], dtype=np.int32)
+            candidates = candidates[~emitted[candidates]]
+            used = 1
+            for posting in postings[1:]:
+                # Once candidates are few, verifying them beats intersecting a long posting list
+                if len(candidates) == 0 or len(candidates) * 16 < len(posting):
+                    break
+                candidates = np.intersect1d(
+                    candidates, np.frombuffer(posting, dtype=np.int32), assume_unique=True
+                )
+                used += 1
+
+            if used == len(postings) and len(term) == NGRAM_SIZE:
+                return candidates
+            lead_ids = self._lead_ids
+            return np.array(
+                [doc for doc in candidates.tolist() if term in lead_ids[doc].lower()],
+                dtype=np.int32
+            )
+
+        def short_substring(emitted: np.ndarray) -> np.ndarray:
+            # Every lead ID containing the term has a trigram containing it, unless it is shorter than one
+            arrays = [
+                np.frombuffer(posting, dtype=np.int32)
+                for gram, posting in self._grams.items() if term in gram
+            ]
+            lead_ids = self._lead_ids
+            short = [doc for doc in self._short_docs if term in lead_ids[doc].lower()]
+            if short:
+                arrays.append(np.array(short, dtype=np.int32))
+            if not arrays:
+                return empty
+            candidates = np.concatenate(arrays)
+            return candidates[~emitted[candidates]]
+
+        value_matches: List[List[array]] = [[], [], []]
+        for field in self.VALUE_FIELDS:
+            for value, docs in self._values[field].items():
+                if value == term:
+                    value_matches[0].append(docs)
+                elif value.startswith(term):
+                    value_matches[1].append(docs)
+                elif term in value:
+                    value_matches[2].append(docs)
+
+        def value_tier(tier: int) -> Callable[[np.ndarray], np.ndarray]:
+            def match(emitted: np.ndarray) -> np.ndarray:
+                arrays = [np.frombuffer(docs, dtype=np.int32) for docs in value_matches[tier] if docs]
+                return np.concatenate(arrays) if arrays else empty
+            return match
+
+        return [lead_exact, lead_prefix, value_tier(0), value_tier(1), lead_substring, value_tier(2)]
+
+
+class LeadSearchIndexRegistry(OwnerIndexRegistry[NGramIndex]):
+    """
+    Bounded LRU cache of per-owner search indexes.
+
+    Indexes are built on first use from a loader that streams the owner's
+    rows, kept current by `apply_changes`, and rebuilt in the background
+    after `ttl_seconds` to pick up writes made by other worker processes
+    (see OwnerIndexRegistry).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Iterable[dict]],
+        max_owners: int = 64,
+        ttl_seconds: float = 300,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            loader: Returns an iterable of rows (lead_id, industry, channel, score) for an owner
+            max_owners: Maximum number of owner indexes kept in memory
+            ttl_seconds: Age after which an owner's index is rebuilt
+        """
+        super().__init__(max_owners, ttl_seconds)
+        self._loader = loader
+
+    def _build(self, owner_id: str) -> NGramIndex:
+        return NGramIndex.from_rows(self._loader(owner_id))
+
+    def _apply(self, index: NGramIndex, changes: List[Tuple[Optional[dict], Optional[dict]]]) -> None:
+        for before, after in changes:
+            if after is not None:
+                index.add(after)
+            elif before is not None:
+                index.remove(before["lead_id"])
@@ -0,0 +1,247 @@
+"""
+Lead Similarity Service - In-process lookalike search
+
+Each owner's leads are embedded as the AI scoring engine's input features
+(AIScoringEngine._prepare_feature_matrix, the vectorized
+_prepare_features), log-compressed where heavy-tailed and standardized
+with the owner's mean and spread, plus one-hot industry and channel.
+Similarity is the cosine of two embeddings.
+
+The numeric block is held in one contiguous float32 matrix per owner.
+The one-hot block is not materialized: a one-hot dot product is
+ONE_HOT_WEIGHT² when two leads share the category and 0 otherwise, so it
+is computed from int32 category codes, which keeps the index at about
+30 bytes per lead and lets new categories appear without reshaping it.
+
+A query scores the matrix in blocks of BLOCK_ROWS leads (a matrix-vector
+product plus two code comparisons per block, sized to stay in cache),
+keeps each block's best k with argpartition and merges the candidates,
+so its cost is linear in the number of leads with a small constant.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.columns import LeadColumns
+from app.services.owner_indexes import OwnerIndexRegistry
+from app.services.scoring_engine import AIScoringEngine
+
+
+# Features (from AIScoringEngine.FEATURE_NAMES) compressed with log1p before standardizing
+LOG_FEATURES = ("interaction_count", "last_interaction_days_ago", "company_size")
+
+# Value of the industry and channel one-hot entries, relative to one standard deviation
+ONE_HOT_WEIGHT = 1.0
+
+# Leads scored per block of a query
+BLOCK_ROWS = 65536
+
+# Fields a row needs to be embedded (a missing last_interaction_days_ago reads as 0)
+REQUIRED_FIELDS = (
+    "lead_id", "industry", "channel", "company_size",
+    "interaction_count", "has_requested_pricing", "has_demo_request",
+)
+
+# Only the feature extraction of the engine is used; no model is loaded
+_feature_engine = AIScoringEngine(model_path=None)
+_log_mask = np.array([name in LOG_FEATURES for name in AIScoringEngine.FEATURE_NAMES])
+
+
+def _raw_features(columns: LeadColumns) -> np.ndarray:
+    """Feature matrix with heavy-tailed features log-compressed."""
+    features = _feature_engine._prepare_feature_matrix(columns)
+    features[:, _log_mask] = np.log1p(np.maximum(features[:, _log_mask], 0))
+    return features
+
+
+class LeadSimilarityIndex:
+    """
+    Embedding matrix over one owner's leads.
+
+    Updating a lead overwrites its row in place; removed leads leave a
+    dead row until the index is rebuilt. The standardization is fixed
+    when the index is built.
+    """
+
+    def __init__(self, columns: LeadColumns):
+        """Build the index from an owner's leads."""
+        self._lock = threading.Lock()
+        features = _raw_features(columns)
+        if len(columns):
+            self._mean = features.mean(axis=0)
+            scale = features.std(axis=0)
+            self._scale = np.where(scale > 0, scale, 1.0)
+        else:
+            self._mean = np.zeros(features.shape[1])
+            self._scale = np.ones(features.shape[1])
+
+        n = len(columns)
+        capacity = max(1024, n)
+        self._numeric = np.zeros((capacity, features.shape[1]), dtype=np.float32)
+        self._industry = np.full(capacity, -1, dtype=np.int32)
+        self._channel = np.full(capacity, -1, dtype=np.int32)
+        self._inv_norm = np.zeros(capacity, dtype=np.float32)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._codes: Dict[str, Dict[str, int]] = {"industry": {}, "channel": {}}
+        self._lead_ids: List[str] = columns.lead_id.tolist()
+        self._row_by_lead: Dict[str, int] = {lead_id: row for row, lead_id in enumerate(self._lead_ids)}
+        self._size = n
+
+        if n:
+            self._numeric[:n] = (features - self._mean) / self._scale
+            for field, target in (("industry", self._industry), ("channel", self._channel)):
+                values, codes = np.unique(getattr(columns, field), return_inverse=True)
+                self._codes[field] = {value: code for code, value in enumerate(values.tolist())}
+                target[:n] = codes
+            self._inv_norm[:n] = self._inverse_norms(self._numeric[:n])
+            self._live[:n] = True
+            # A lead_id listed twice keeps its last row
+            self._live[:n][np.setdiff1d(np.arange(n), list(self._row_by_lead.values()))] = False
+
+    def __len__(self) -> int:
+        return len(self._row_by_lead)
+
+    @staticmethod
+    def _inverse_norms(numeric: np.ndarray) -> np.ndarray:
+        # Each lead has exactly one industry and one channel entry in the one-hot block
+        squared = np.einsum("ij,ij->i", numeric, numeric) + 2 * ONE_HOT_WEIGHT ** 2
+        return 1.0 / np.sqrt(squared)
+
+    def _code(self, field: str, value: str) -> int:
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def add(self, row: dict) -> None:
+        """Add or update a lead from a row with the REQUIRED_FIELDS."""
+        numeric = ((_raw_features(LeadColumns.from_rows([row])) - self._mean) / self._scale).astype(np.float32)
+        with self._lock:
+            lead_id = row["lead_id"]
+            position = self._row_by_lead.get(lead_id)
+            if position is None:
+                position = self._size
+                if position == len(self._live):
+                    self._grow()
+                self._size += 1
+                self._lead_ids.append(lead_id)
+                self._row_by_lead[lead_id] = position
+            self._numeric[position] = numeric[0]
+            self._industry[position] = self._code("industry", row["industry"])
+            self._channel[position] = self._code("channel", row["channel"])
+            self._inv_norm[position] = self._inverse_norms(numeric)[0]
+            self._live[position] = True
+
+    def remove(self, lead_id: str) -> None:
+        """Remove a lead from the index."""
+        with self._lock:
+            position = self._row_by_lead.pop(lead_id, None)
+            if position is not None:
+                self._live[position] = False
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._live)
+        for name in ("_numeric", "_industry", "_channel", "_inv_norm", "_live"):
+            current = getattr(self, name)
+            grown = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    def similar(self, lead_id: str, k: int = 10) -> Optional[List[Tuple[str, float]]]:
+        """
+        Find the leads most similar to a lead.
+
+        Args:
+            lead_id: The reference lead
+            k: Number of leads to return
+
+        Returns:
+            Up to k (lead_id, cosine similarity) pairs, most similar first,
+            excluding the reference lead; None if the lead is not indexed
+        """
+        with self._lock:
+            position = self._row_by_lead.get(lead_id)
+            if position is None:
+                return None
+            size = self._size
+            numeric, industry, channel = self._numeric, self._industry, self._channel
+            inv_norm, live, lead_ids = self._inv_norm, self._live, self._lead_ids
+            query = numeric[position].copy()
+            query_industry, query_channel = industry[position], channel[position]
+            query_inv_norm = inv_norm[position]
+
+        same_category = np.float32(ONE_HOT_WEIGHT ** 2)
+        candidate_rows = []
+        candidate_scores = []
+        for start in range(0, size, BLOCK_ROWS):
+            stop = min(size, start + BLOCK_ROWS)
+            scores = numeric[start:stop] @ query
+            np.add(scores, same_category, out=scores, where=industry[start:stop] == query_industry)
+            np.add(scores, same_category, out=scores, where=channel[start:stop] == query_channel)
+            scores *= inv_norm[start:stop]
+            scores[~live[start:stop]] = -np.inf
+            if start <= position < stop:
+                scores[position - start] = -np.inf
+
+            if len(scores) > k:
+                best = np.argpartition(scores, -k)[-k:]
+                candidate_rows.append(best + start)
+                candidate_scores.append(scores[best])
+            else:
+                candidate_rows.append(np.arange(start, stop))
+                candidate_scores.append(scores)
+
+        if not candidate_rows:
+            return []
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        if len(scores) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return [
+            (lead_ids[row], max(-1.0, min(1.0, score * float(query_inv_norm))))
+            for row, score in zip(rows[order].tolist(), scores[order].tolist())
+            if score != -np.inf
+        ]
+
+
+class LeadSimilarityIndexRegistry(OwnerIndexRegistry[LeadSimilarityIndex]):
+    """
+    Bounded LRU cache of per-owner similarity indexes.
+
+    Indexes are built on first use from a loader returning the owner's
+    leads as LeadColumns, kept current by `apply_changes`, and rebuilt in
+    the background after `ttl_seconds` to pick up writes made by other
+    worker processes and refresh the standardization (see
+    OwnerIndexRegistry).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], LeadColumns],
+        max_owners: int = 8,
+        ttl_seconds: float = 600,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            loader: Returns an owner's leads as LeadColumns
+            max_owners: Maximum number of owner indexes kept in memory
+            ttl_seconds: Age after which an owner's index is rebuilt
+        """
+        super().__init__(max_owners, ttl_seconds)
+        self._loader = loader
+
+    def _build(self, owner_id: str) -> LeadSimilarityIndex:
+        return LeadSimilarityIndex(self._loader(owner_id))
+
+    def _apply(self, index: LeadSimilarityIndex, changes: List[Tuple[Optional[dict], Optional[dict]]]) -> None:
+        for before, after in changes:
+            if before is not None and (after is None or after.get("lead_id") != before.get("lead_id")):
+                index.remove(before["lead_id"])
+            if after is not None and all(after.get(name) is not None for name in REQUIRED_FIELDS):
+                index.add(after)
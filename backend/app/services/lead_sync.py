@@ -0,0 +1,101 @@
+"""
+Lead Sync Service - Delta sync cursors for dashboard lead lists
+
+A cursor is an opaque token holding the (updated_at, id) position of the
+last change a client has seen. Each call returns the leads changed after
+that position plus the IDs deleted since, and a new cursor; a call
+without a cursor returns every lead, so the same loop performs the
+initial download and later incremental syncs.
+
+Timestamps are assigned when a row is written, but a transaction can
+commit after later-stamped rows are already visible. Changes newer than
+LEAD_SYNC_SETTLE_SECONDS are therefore held back to the next call, so a
+late commit is not skipped by a cursor that already moved past it.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.models.schemas import LeadChangesResponse
+from app.repositories.lead_repo import LeadRepository
+
+
+# Position before every lead with a given updated_at
+_MIN_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def encode_cursor(updated_at: str, lead_uuid: str) -> str:
+    """Encode a (updated_at, id) position as an opaque cursor."""
+    raw = json.dumps({"t": updated_at, "id": lead_uuid}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        updated_at, lead_uuid = position["t"], position["id"]
+        if datetime.fromisoformat(updated_at).tzinfo is None:
+            raise ValueError("Cursor timestamp has no time zone")
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid sync cursor") from e
+    if not isinstance(lead_uuid, str):
+        raise ValueError("Invalid sync cursor")
+    return updated_at, lead_uuid
+
+
+def get_lead_changes(
+    repository: LeadRepository,
+    owner_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 1000,
+) -> LeadChangesResponse:
+    """
+    Get the leads changed and deleted since a cursor.
+
+    Args:
+        repository: Lead repository
+        owner_id: The owner ID
+        cursor: Cursor from the previous call, or None for a full download
+        limit: Maximum changed leads to return
+
+    Returns:
+        Changed leads, deleted lead IDs and the next cursor. Clients apply
+        `deleted` before `leads`, and call again right away while
+        `has_more` is set.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+    settled = datetime.now(timezone.utc) - timedelta(seconds=settings.LEAD_SYNC_SETTLE_SECONDS)
+    if after is not None and datetime.fromisoformat(after[0]) >= settled:
+        return LeadChangesResponse(cursor=cursor, has_more=False)
+    until = settled.isoformat()
+
+    rows = repository.get_changed_lead_rows(owner_id, after, until, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        # Stop at the last returned lead; deletions up to then belong to this page
+        until = rows[-1]["updated_at"]
+        next_cursor = encode_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+    else:
+        next_cursor = encode_cursor(until, _MIN_ID)
+
+    # A full download has nothing to delete
+    deleted = repository.get_deleted_lead_ids(owner_id, after[0], until) if after is not None else []
+    return LeadChangesResponse(
+        leads=repository.rows_to_leads(rows),
+        deleted=deleted,
+        cursor=next_cursor,
+        has_more=has_more,
+    )
@@ -0,0 +1,131 @@
+"""
+Per-owner in-process index registry
+
+Base class for the bounded LRU caches of per-owner indexes (search
+n-grams, dedup bloom filters, similarity matrices). An index is built
+from the database on first use, kept current by a lead change listener,
+and rebuilt after a TTL to pick up writes made by other worker processes.
+
+Building an index reads every lead of the owner, so builds are
+single-flight per owner: concurrent callers wait for the one build in
+progress instead of starting their own. An expired index keeps being
+served while its replacement is built on a background thread, and
+changes that arrive during a build are replayed onto the new index
+before it is published, so none are lost.
+
+`get` blocks while a missing index is built; call it from a worker
+thread (e.g. `asyncio.to_thread`), not from the event loop.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+IndexT = TypeVar("IndexT")
+Change = Tuple[Optional[dict], Optional[dict]]
+
+
+class OwnerIndexRegistry(Generic[IndexT]):
+    """Bounded LRU cache of per-owner indexes with single-flight, background rebuilds."""
+
+    def __init__(self, max_owners: int, ttl_seconds: float):
+        """
+        Initialize the registry.
+
+        Args:
+            max_owners: Maximum number of owner indexes kept in memory
+            ttl_seconds: Age after which an owner's index is rebuilt
+        """
+        self._max_owners = max_owners
+        self._ttl_seconds = ttl_seconds
+        self._indexes: "OrderedDict[str, Tuple[IndexT, float]]" = OrderedDict()
+        self._building: Dict[str, threading.Event] = {}
+        self._pending: Dict[str, List[Change]] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, owner_id: str) -> IndexT:
+        """Build an owner's index from the database."""
+        raise NotImplementedError
+
+    def _apply(self, index: IndexT, changes: List[Change]) -> None:
+        """Apply lead changes to an index."""
+        raise NotImplementedError
+
+    def _expired(self, index: IndexT, built_at: float) -> bool:
+        """Whether an index must be rebuilt."""
+        return time.monotonic() - built_at >= self._ttl_seconds
+
+    def get(self, owner_id: str) -> IndexT:
+        """
+        Get the owner's index.
+
+        A missing index is built before returning (waiting for a build
+        already in progress); an expired one is returned as is while a
+        background thread rebuilds it.
+        """
+        with self._lock:
+            entry = self._indexes.get(owner_id)
+            if entry is not None:
+                self._indexes.move_to_end(owner_id)
+                if not self._expired(*entry):
+                    return entry[0]
+                refresh = owner_id not in self._building
+
+        if entry is None:
+            return self._load(owner_id, wait=True)
+        if refresh:
+            threading.Thread(target=self._refresh, args=(owner_id,), daemon=True).start()
+        return entry[0]
+
+    def apply_changes(self, owner_id: str, changes: List[Change]) -> None:
+        """Lead change listener: update the owner's index if it is loaded or being built."""
+        with self._lock:
+            entry = self._indexes.get(owner_id)
+            pending = self._pending.get(owner_id)
+            if pending is not None:
+                pending.extend(changes)
+        if entry is not None:
+            self._apply(entry[0], changes)
+
+    def _refresh(self, owner_id: str) -> None:
+        try:
+            self._load(owner_id, wait=False)
+        except Exception:
+            logger.exception("Failed to rebuild %s for owner %s", type(self).__name__, owner_id)
+
+    def _load(self, owner_id: str, wait: bool) -> Optional[IndexT]:
+        """Build and publish the owner's index, unless another thread is already building it."""
+        while True:
+            with self._lock:
+                entry = self._indexes.get(owner_id)
+                if entry is not None and not self._expired(*entry):
+                    return entry[0]
+                building = self._building.get(owner_id)
+                if building is None:
+                    building = self._building[owner_id] = threading.Event()
+                    self._pending[owner_id] = []
+                    break
+            if not wait:
+                return None
+            building.wait()
+
+        try:
+            index = self._build(owner_id)
+            with self._lock:
+                changes = self._pending.pop(owner_id)
+                if changes:
+                    self._apply(index, changes)
+                self._indexes[owner_id] = (index, time.monotonic())
+                self._indexes.move_to_end(owner_id)
+                while len(self._indexes) > self._max_owners:
+                    self._indexes.popitem(last=False)
+            return index
+        finally:
+            with self._lock:
+                self._pending.pop(owner_id, None)
+                del self._building[owner_id]
+            building.set()
@@ -0,0 +1,227 @@
+"""
+Readiness Service - Startup warm-up and cached dependency health
+
+A worker is ready to receive traffic once its warm-up has finished (the
+Supabase client is built, the default scoring engine and the shared AI
+model are loaded and have scored a sample lead) and its last database
+check succeeded recently.
+
+ReadinessProbe runs both in a background task: warm-up first, retrying
+failed steps, then a database round trip every
+READINESS_PROBE_INTERVAL_SECONDS. The /ready endpoint only reads the
+cached result, so load balancer probes cost no database work however
+often they arrive.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.database import check_database_connection, get_supabase_client
+from app.models.columns import LeadColumns
+from app.models.schemas import LeadInput, ScoringProfileUpdate
+from app.services.scoring_engine import build_scoring_engine, get_scoring_service
+
+
+logger = logging.getLogger(__name__)
+
+# Lead scored once by each engine during warm-up
+WARM_UP_LEAD = LeadInput(
+    lead_id="WARM-UP",
+    industry="Technology",
+    company_size=100,
+    channel="Website",
+    interaction_count=3,
+    last_interaction_days_ago=2,
+    has_requested_pricing=True,
+    has_demo_request=False,
+)
+
+
+def warm_up_scoring_engine() -> None:
+    """Build the default scoring engine and run both scoring paths once."""
+    engine = get_scoring_service()
+    engine.calculate_score(WARM_UP_LEAD)
+    engine.score_columns(LeadColumns.from_leads([WARM_UP_LEAD]))
+
+
+def warm_up_scoring_model() -> None:
+    """Load the shared AI engine's weights artifact used by "ai" scoring profiles."""
+    engine = build_scoring_engine(ScoringProfileUpdate(engine_type="ai"))
+    engine.score_columns(LeadColumns.from_leads([WARM_UP_LEAD]))
+
+
+# Warm-up steps, run in order
+WARM_UP_STEPS: Dict[str, Callable[[], Any]] = {
+    "database_client": get_supabase_client,
+    "scoring_engine": warm_up_scoring_engine,
+    "scoring_model": warm_up_scoring_model,
+}
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one warm-up step or database check."""
+
+    ok: bool
+    checked_at: str
+    duration_ms: float
+    error: Optional[str] = None
+
+
+def _result(ok: bool, started: float, error: Optional[str] = None) -> CheckResult:
+    return CheckResult(
+        ok=ok,
+        checked_at=datetime.now(timezone.utc).isoformat(),
+        duration_ms=round((time.perf_counter() - started) * 1000, 3),
+        error=error,
+    )
+
+
+class ReadinessProbe:
+    """
+    Background warm-up and database prober with a cached readiness state.
+
+    Only one database check is in flight at a time; a check that outlives
+    its timeout is reported as failed and the next one is skipped until it
+    returns, so a hanging database does not pile up blocked threads.
+    """
+
+    def __init__(
+        self,
+        warm_up_steps: Optional[Dict[str, Callable[[], Any]]] = None,
+        check_database: Callable[[], bool] = check_database_connection,
+        interval_seconds: float = 5.0,
+        timeout_seconds: float = 2.0,
+        max_age_seconds: float = 30.0,
+    ):
+        """
+        Initialize the probe.
+
+        Args:
+            warm_up_steps: Named blocking callables that must succeed once
+                before the worker is ready (default: WARM_UP_STEPS)
+            check_database: Blocking callable running one cheap query,
+                returning whether it succeeded
+            interval_seconds: Time between database checks (and warm-up retries)
+            timeout_seconds: Time after which a database check counts as failed
+            max_age_seconds: A successful check older than this no longer
+                counts, e.g. when the prober itself is stuck
+        """
+        self._warm_up_steps = warm_up_steps if warm_up_steps is not None else WARM_UP_STEPS
+        self._check_database = check_database
+        self._interval = interval_seconds
+        self._timeout = timeout_seconds
+        self._max_age = max_age_seconds
+        self._warm_up: Dict[str, CheckResult] = {}
+        self._database: Optional[CheckResult] = None
+        self._database_checked: Optional[float] = None
+        self._in_flight: Optional[asyncio.Future] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def warmed_up(self) -> bool:
+        return all(
+            name in self._warm_up and self._warm_up[name].ok for name in self._warm_up_steps
+        )
+
+    async def start(self) -> None:
+        """Start warm-up and periodic database checks on the running event loop."""
+        if self._task is not None:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.warmed_up:
+                await self.run_warm_up()
+            await self.check_database()
+            try:
+                await asyncio.wait_for(self._stop.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_warm_up(self) -> None:
+        """Run the warm-up steps that have not succeeded yet, in order."""
+        for name, step in self._warm_up_steps.items():
+            if name in self._warm_up and self._warm_up[name].ok:
+                continue
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(step)
+            except Exception as e:
+                logger.warning("Warm-up step %s failed: %s", name, e)
+                self._warm_up[name] = _result(False, started, str(e) or type(e).__name__)
+                # Later steps usually depend on earlier ones; retry on the next round
+                return
+            self._warm_up[name] = _result(True, started)
+
+    async def check_database(self) -> None:
+        """Run one database round trip and cache its outcome and latency."""
+        if self._in_flight is not None and not self._in_flight.done():
+            # The previous check is still blocked; keep reporting it as failed
+            return
+        started = time.perf_counter()
+        self._in_flight = asyncio.ensure_future(asyncio.to_thread(self._check_database))
+        try:
+            ok = await asyncio.wait_for(asyncio.shield(self._in_flight), self._timeout)
+            error = None if ok else "Database query failed"
+        except asyncio.TimeoutError:
+            ok, error = False, f"Database query timed out after {self._timeout:g}s"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        self._database = _result(ok, started, error)
+        self._database_checked = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the cached readiness state.
+
+        Returns:
+            Dictionary with `ready`, the last database check (with its age)
+            and the result of each warm-up step
+        """
+        database = asdict(self._database) if self._database is not None else None
+        fresh = False
+        if database is not None:
+            age = time.monotonic() - self._database_checked
+            database["age_seconds"] = round(age, 3)
+            fresh = age <= self._max_age
+        return {
+            "ready": self.warmed_up and fresh and self._database.ok,
+            "database": database,
+            "warm_up": {
+                name: asdict(self._warm_up[name]) if name in self._warm_up else None
+                for name in self._warm_up_steps
+            },
+        }
+
+
+# Readiness probe singleton
+_readiness_probe: Optional[ReadinessProbe] = None
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    """Get this worker's readiness probe; the application lifespan starts it."""
+    global _readiness_probe
+
+    if _readiness_probe is None:
+        _readiness_probe = ReadinessProbe(
+            interval_seconds=settings.READINESS_PROBE_INTERVAL_SECONDS,
+            timeout_seconds=settings.READINESS_PROBE_TIMEOUT_SECONDS,
+            max_age_seconds=settings.READINESS_MAX_AGE_SECONDS,
+        )
+    return _readiness_probe
@@ -0,0 +1,228 @@
+"""
+Rescoring Service - Parallel full rescore of an owner's leads
+
+After a scoring configuration or model change every stored score may be
+stale. A rescore splits the owner's leads into consecutive id ranges
+(keyset boundaries found from the (owner_id, id) index) and hands each
+range to a process pool. Every worker process reads its range page by
+page, scores the page as one columnar batch with its own engine instance,
+and writes back only the rows whose score or priority changed with a
+single set-based UPDATE per page.
+
+Reads, scoring and writes all happen in the workers, so throughput grows
+with the number of processes until the database becomes the bottleneck.
+In-process caches of the web workers (e.g. the in-memory search index)
+pick up the new scores when they expire.
+"""
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import chain
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.models.columns import LeadColumns
+from app.models.schemas import RescoreJobStatus, ScoringProfile
+from app.repositories.lead_repo import LeadChange, LeadRepository
+from app.services.scoring_engine import BaseScoringEngine, build_scoring_engine, get_scoring_service
+
+
+logger = logging.getLogger(__name__)
+
+# Columns read per lead: scoring features plus the current score to diff against
+RESCORE_COLUMNS = LeadRepository.FEATURE_COLUMNS + ",score,priority"
+
+
+def changed_scores(rows: List[dict], engine: BaseScoringEngine) -> List[LeadChange]:
+    """
+    Rescore a page of rows and keep the ones whose score or priority changed.
+
+    Args:
+        rows: Lead rows with the RESCORE_COLUMNS fields
+        engine: Scoring engine to apply
+
+    Returns:
+        (row before, row after) pairs for the changed rows
+    """
+    if not rows:
+        return []
+    batch = engine.score_columns(LeadColumns.from_rows(rows))
+    old_scores = np.fromiter((row["score"] for row in rows), dtype=np.int64, count=len(rows))
+    old_priorities = np.array([row["priority"] for row in rows], dtype=object)
+    new_priorities = np.array([priority.value for priority in batch.priorities], dtype=object)
+
+    changed = np.flatnonzero((batch.scores != old_scores) | (new_priorities != old_priorities))
+    return [
+        (rows[i], {
+            **rows[i],
+            "score": int(batch.scores[i]),
+            "priority": new_priorities[i],
+            "explanations": batch.explanations[i] if batch.explanations is not None else [],
+        })
+        for i in changed.tolist()
+    ]
+
+
+# Per-process state of pool workers, set by _init_worker
+_worker_engine: Optional[BaseScoringEngine] = None
+_worker_repository: Optional[LeadRepository] = None
+
+
+def _init_worker(profile: Optional[ScoringProfile]) -> None:
+    """Build the scoring engine and database client once per worker process."""
+    global _worker_engine, _worker_repository
+    _worker_engine = build_scoring_engine(profile) if profile is not None else get_scoring_service()
+    _worker_repository = LeadRepository(get_supabase_client())
+
+
+def _rescore_range(
+    owner_id: str, after_id: Optional[str], until_id: Optional[str], page_size: int, dry_run: bool
+) -> Tuple[int, int]:
+    """Rescore the leads in (after_id, until_id]; returns (scanned, changed)."""
+    scanned = changed = 0
+    pages = _worker_repository.iter_lead_pages(
+        owner_id, columns=RESCORE_COLUMNS, page_size=page_size, after_id=after_id, until_id=until_id
+    )
+    for page in pages:
+        changes = changed_scores(page, _worker_engine)
+        if changes and not dry_run:
+            _worker_repository.apply_rescores(owner_id, changes)
+        scanned += len(page)
+        changed += len(changes)
+    return scanned, changed
+
+
+class RescoreJob:
+    """Progress of one rescore, updated as key ranges finish."""
+
+    def __init__(self, owner_id: str, workers: Optional[int] = None, dry_run: bool = False):
+        """
+        Initialize a job.
+
+        Args:
+            owner_id: Owner whose leads are rescored
+            workers: Worker processes (defaults to RESCORE_WORKERS, or one per core)
+            dry_run: Count changed leads without writing them
+        """
+        self.job_id = uuid.uuid4().hex
+        self.owner_id = owner_id
+        self.workers = workers or settings.RESCORE_WORKERS or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.total_leads = 0
+        self.scanned = 0
+        self.changed = 0
+        self.chunks_done = 0
+        self.chunks_total: Optional[int] = None
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self._finished or time.monotonic()) - self._started
+
+    @property
+    def leads_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.scanned / elapsed if elapsed > 0 else 0.0
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Mark the job completed, or failed with a reason."""
+        self._finished = time.monotonic()
+        self.status = "failed" if error else "completed"
+        self.error = error
+
+    def to_status(self) -> RescoreJobStatus:
+        """Snapshot of the job for API responses."""
+        return RescoreJobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            dry_run=self.dry_run,
+            total_leads=self.total_leads,
+            scanned=self.scanned,
+            changed=self.changed,
+            chunks_done=self.chunks_done,
+            chunks_total=self.chunks_total,
+            workers=self.workers,
+            elapsed_seconds=round(self.elapsed_seconds, 3),
+            leads_per_second=round(self.leads_per_second, 1),
+            error=self.error,
+        )
+
+
+def run_rescore(
+    job: RescoreJob,
+    repository: LeadRepository,
+    profile: Optional[ScoringProfile],
+    chunk_size: Optional[int] = None,
+    page_size: Optional[int] = None,
+    on_progress: Optional[Callable[[RescoreJob], None]] = None,
+) -> RescoreJob:
+    """
+    Rescore all of an owner's leads with a process pool.
+
+    Key ranges are submitted as soon as their boundary is found, and at most
+    two ranges per worker are in flight, so workers start immediately and
+    the parent never holds more than a handful of pending futures.
+
+    Args:
+        job: Job to run and update
+        repository: Repository used to count leads and find range boundaries
+        profile: The owner's scoring profile, or None for the default engine
+        chunk_size: Leads per key range (defaults to RESCORE_CHUNK_SIZE)
+        page_size: Rows per read within a range (defaults to RESCORE_PAGE_SIZE)
+        on_progress: Called after each finished range
+
+    Returns:
+        The finished job
+    """
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+    page_size = page_size or settings.RESCORE_PAGE_SIZE
+    try:
+        job.total_leads = repository.count_leads(job.owner_id)
+        # Spawned workers do not inherit the parent's threads, locks or sockets
+        with ProcessPoolExecutor(
+            max_workers=job.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(profile,),
+        ) as pool:
+            pending = set()
+            submitted = 0
+
+            def collect() -> None:
+                nonlocal pending
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scanned, changed = future.result()
+                    job.scanned += scanned
+                    job.changed += changed
+                    job.chunks_done += 1
+                    if on_progress is not None:
+                        on_progress(job)
+
+            after_id: Optional[str] = None
+            boundaries = chain(repository.iter_keyset_boundaries(job.owner_id, chunk_size), [None])
+            for until_id in boundaries:
+                if len(pending) >= 2 * job.workers:
+                    collect()
+                pending.add(pool.submit(_rescore_range, job.owner_id, after_id, until_id, page_size, job.dry_run))
+                submitted += 1
+                after_id = until_id
+            job.chunks_total = submitted
+            while pending:
+                collect()
+    except Exception as e:
+        logger.exception("Rescore %s for owner %s failed", job.job_id, job.owner_id)
+        job.finish(error=str(e) or type(e).__name__)
+        return job
+
+    job.finish()
+    return job
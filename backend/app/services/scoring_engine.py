@@ -3,8 +3,44 @@ Lead Scoring Service - Core Business Logic
 
 This module implements rule-based lead scoring that is extensible for future ML integration.
 """
+import os
 from abc import ABC, abstractmethod
-from app.models.schemas import LeadInput, ScoringResult, Priority
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.models.columns import LeadColumns
+from app.core.config import settings
+from app.models.schemas import LeadInput, ScoringProfileUpdate, ScoringResult, ScoringWeights, Priority
+from app.services.calibration import ScoringModelWeights
+from app.services.scoring_rules import CompiledRules, get_scoring_rules_watcher
+
+
+# Priority values indexed by tier code (0 = Cold, 1 = Warm, 2 = Hot)
+PRIORITY_BY_CODE = np.array([Priority.COLD, Priority.WARM, Priority.HOT], dtype=object)
+
+
+@dataclass
+class BatchScores:
+    """Scores for a batch of leads, aligned with the input columns."""
+    
+    scores: np.ndarray
+    priorities: np.ndarray
+    explanations: Optional[List[List[str]]] = None
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+    
+    def to_results(self) -> List[ScoringResult]:
+        """Convert to one ScoringResult per lead."""
+        explanations = self.explanations or [[] for _ in range(len(self))]
+        return [
+            ScoringResult.model_construct(
+                score=int(score), priority=priority, explanations=explanation
+            )
+            for score, priority, explanation in zip(self.scores, self.priorities, explanations)
+        ]
 
 
 class BaseScoringEngine(ABC):
@@ -27,6 +63,40 @@ class BaseScoringEngine(ABC):
         """
         pass
     
+    def calculate_scores(self, leads: Sequence[LeadInput]) -> List[ScoringResult]:
+        """
+        Calculate scores for many leads at once.
+        
+        Args:
+            leads: LeadInput objects to score
+            
+        Returns:
+            One ScoringResult per lead, in input order
+        """
+        return self.score_columns(LeadColumns.from_leads(leads)).to_results()
+    
+    def score_columns(self, columns: LeadColumns, explain: bool = True) -> BatchScores:
+        """
+        Score a columnar batch of leads.
+        
+        The default implementation calls `calculate_score` per lead.
+        Engines that can evaluate their rules on whole arrays should
+        override this with a vectorized implementation.
+        
+        Args:
+            columns: Leads in columnar form
+            explain: Whether to build explanation strings
+            
+        Returns:
+            BatchScores aligned with the input columns
+        """
+        results = [self.calculate_score(lead) for lead in columns.to_leads()]
+        return BatchScores(
+            scores=np.fromiter((r.score for r in results), dtype=np.int64, count=len(results)),
+            priorities=np.array([r.priority for r in results], dtype=object),
+            explanations=[r.explanations for r in results] if explain else None,
+        )
+    
     def _calculate_priority(self, score: int, hot_threshold: int = 70, warm_threshold: int = 40) -> Priority:
         """
         Determine lead priority based on score thresholds.
@@ -67,6 +137,25 @@ class RuleBasedScoringEngine(BaseScoringEngine):
     HOT_THRESHOLD: int = 70
     WARM_THRESHOLD: int = 40
     
+    def __init__(self, weights: Optional[ScoringWeights] = None):
+        """
+        Initialize the engine.
+    
+        Args:
+            weights: Optional configuration overriding the class defaults
+        """
+        if weights is not None:
+            for name, value in weights.model_dump(exclude={"name"}).items():
+                setattr(self, name.upper(), value)
+    
+    @property
+    def weights(self) -> ScoringWeights:
+        """The engine's current configuration."""
+        return ScoringWeights(**{
+            name: getattr(self, name.upper())
+            for name in ScoringWeights.model_fields if name != "name"
+        })
+    
     def calculate_score(self, lead: LeadInput) -> ScoringResult:
         """Calculate score using weighted rules."""
         score = 0
@@ -105,23 +194,85 @@ class RuleBasedScoringEngine(BaseScoringEngine):
         priority = self._calculate_priority(score, self.HOT_THRESHOLD, self.WARM_THRESHOLD)
         
         return ScoringResult(score=score, priority=priority, explanations=explanations)
+    
+    def score_columns(self, columns: LeadColumns, explain: bool = True) -> BatchScores:
+        """Vectorized equivalent of `calculate_score` over a columnar batch."""
+        engagement = np.minimum(
+            columns.interaction_count * self.ENGAGEMENT_POINTS_PER_INTERACTION,
+            self.ENGAGEMENT_MAX_POINTS
+        )
+        recent = columns.last_interaction_days_ago <= self.RECENCY_THRESHOLD_DAYS
+        pricing = columns.has_requested_pricing.astype(bool)
+        demo = columns.has_demo_request.astype(bool)
+        large = columns.company_size > self.LARGE_COMPANY_THRESHOLD
+        
+        scores = (
+            engagement
+            + recent * self.RECENCY_POINTS
+            + pricing * self.PRICING_REQUEST_POINTS
+            + demo * self.DEMO_REQUEST_POINTS
+            + large * self.LARGE_COMPANY_POINTS
+        )
+        scores = np.minimum(scores, self.MAX_SCORE)
+        codes = (scores >= self.HOT_THRESHOLD).astype(np.int8) + (scores >= self.WARM_THRESHOLD)
+        
+        explanations = None
+        if explain:
+            recency_text = f"Recent interaction within {self.RECENCY_THRESHOLD_DAYS} days (+{self.RECENCY_POINTS})"
+            pricing_text = f"Requested pricing information (+{self.PRICING_REQUEST_POINTS})"
+            demo_text = f"Requested product demo (+{self.DEMO_REQUEST_POINTS})"
+            large_text = f"Large company (>{self.LARGE_COMPANY_THRESHOLD} employees) (+{self.LARGE_COMPANY_POINTS})"
+            engagement_text = {
+                int(points): f"High engagement detected (+{points})" for points in np.unique(engagement)
+            }
+            
+            explanations = []
+            for points, is_recent, is_pricing, is_demo, is_large in zip(
+                engagement.tolist(), recent.tolist(), pricing.tolist(), demo.tolist(), large.tolist()
+            ):
+                lines = []
+                if points > 0:
+                    lines.append(engagement_text[points])
+                if is_recent:
+                    lines.append(recency_text)
+                if is_pricing:
+                    lines.append(pricing_text)
+                if is_demo:
+                    lines.append(demo_text)
+                if is_large:
+                    lines.append(large_text)
+                explanations.append(lines)
+        
+        return BatchScores(scores=scores, priorities=PRIORITY_BY_CODE[codes], explanations=explanations)
 
 
 class AIScoringEngine(BaseScoringEngine):
     """
     AI-powered lead scoring using ML models.
     
-    This is a placeholder for future ML integration.
-    When implemented, this will:
-    - Load a trained model (e.g., XGBoost, Neural Network)
-    - Use the model to predict conversion probability
+    Loads a logistic weights artifact produced by
+    `scripts/train_scoring_weights.py` and scores leads by predicted
+    conversion probability (0-100). Without an artifact it falls back
+    to rule-based scoring.
+    
+    Future work:
+    - Richer models (e.g., XGBoost, Neural Network)
     - Generate human-readable insights using LLM
     
-    Example future usage:
-        engine = AIScoringEngine(model_path="models/lead_scorer.pkl")
+    Example usage:
+        engine = AIScoringEngine(model_path="models/scoring_weights.json")
         result = engine.calculate_score(lead)
     """
     
+    # Model input features, in order; names match LeadInput / LeadColumns fields
+    FEATURE_NAMES: list[str] = [
+        "interaction_count",
+        "last_interaction_days_ago",
+        "has_requested_pricing",
+        "has_demo_request",
+        "company_size",
+    ]
+    
     def __init__(self, model_path: str = None, llm_client = None):
         """
         Initialize AI scoring engine.
@@ -132,26 +283,30 @@ class AIScoringEngine(BaseScoringEngine):
         """
         self.model_path = model_path
         self.llm_client = llm_client
-        self._model = None
-        # self._load_model()  # Uncomment when implementing
+        self._model: Optional[ScoringModelWeights] = None
+        self._load_model()
     
     def _load_model(self):
-        """Load the ML model from disk."""
-        # Future implementation:
-        # import joblib
-        # self._model = joblib.load(self.model_path)
-        pass
+        """Load the weights artifact from disk, if one exists at model_path."""
+        if not self.model_path or not os.path.exists(self.model_path):
+            return
+        model = ScoringModelWeights.load(self.model_path)
+        if model.feature_names != self.FEATURE_NAMES:
+            raise ValueError(
+                f"Model {self.model_path} expects features {model.feature_names}, "
+                f"engine provides {self.FEATURE_NAMES}"
+            )
+        self._model = model
     
     def _prepare_features(self, lead: LeadInput) -> list:
         """Convert lead data to feature vector for model input."""
-        return [
-            lead.interaction_count,
-            lead.last_interaction_days_ago,
-            int(lead.has_requested_pricing),
-            int(lead.has_demo_request),
-            lead.company_size,
-            # Add more features as needed
-        ]
+        return [int(getattr(lead, name)) for name in self.FEATURE_NAMES]
+    
+    def _prepare_feature_matrix(self, columns: LeadColumns) -> np.ndarray:
+        """Vectorized `_prepare_features`: one row per lead, columns in FEATURE_NAMES order."""
+        return np.column_stack([
+            getattr(columns, name).astype(np.float64) for name in self.FEATURE_NAMES
+        ])
     
     def _generate_ai_explanation(self, lead: LeadInput, score: int, priority: Priority) -> list[str]:
         """
@@ -183,16 +338,25 @@ class AIScoringEngine(BaseScoringEngine):
     
     def calculate_score(self, lead: LeadInput) -> ScoringResult:
         """
-        Calculate score using AI/ML model.
+        Calculate score using the trained weights artifact.
         
-        Currently falls back to rule-based scoring.
-        Replace with actual model prediction when ready.
+        With a loaded model the score is the predicted conversion
+        probability scaled to 0-100, tiered with the artifact's calibrated
+        thresholds. Without one (no file at model_path) the built-in
+        RuleBasedScoringEngine scores the lead. Explanations come from
+        `_generate_ai_explanation` in both cases.
         """
-        # Future implementation:
-        # features = self._prepare_features(lead)
-        # score = int(self._model.predict_proba([features])[0][1] * 100)
+        if self._model is not None:
+            features = np.array([self._prepare_features(lead)], dtype=np.float64)
+            score = int(np.rint(self._model.predict_proba(features)[0] * 100))
+            priority = self._calculate_priority(score, self._model.hot_threshold, self._model.warm_threshold)
+            return ScoringResult(
+                score=score,
+                priority=priority,
+                explanations=self._generate_ai_explanation(lead, score, priority)
+            )
         
-        # Fallback to rule-based until model is trained
+        # No weights artifact: fall back to the built-in rules
         fallback_engine = RuleBasedScoringEngine()
         rule_result = fallback_engine.calculate_score(lead)
         
@@ -206,25 +370,119 @@ class AIScoringEngine(BaseScoringEngine):
             priority=rule_result.priority,
             explanations=ai_explanations
         )
+    
+    def score_columns(self, columns: LeadColumns, explain: bool = True) -> BatchScores:
+        """Vectorized equivalent of `calculate_score` over a columnar batch."""
+        if self._model is not None:
+            scores = np.rint(
+                self._model.predict_proba(self._prepare_feature_matrix(columns)) * 100
+            ).astype(np.int64)
+            codes = (scores >= self._model.hot_threshold).astype(np.int8) + (scores >= self._model.warm_threshold)
+            batch = BatchScores(scores=scores, priorities=PRIORITY_BY_CODE[codes])
+        else:
+            batch = RuleBasedScoringEngine().score_columns(columns, explain=False)
+        if explain:
+            batch.explanations = [
+                self._generate_ai_explanation(lead, int(score), priority)
+                for lead, score, priority in zip(columns.to_leads(), batch.scores, batch.priorities)
+            ]
+        return batch
 
 
-# Change this to switch between rule-based and AI scoring
-SCORING_ENGINE_TYPE = "rule_based"  # Options: "rule_based", "ai"
+class DeclarativeScoringEngine(BaseScoringEngine):
+    """
+    Rule-based scoring driven by a compiled YAML rule set.
+    
+    See app/services/scoring_rules.py for the rule format. The engine
+    keeps a reference to one CompiledRules object, so a request scored
+    while the file is reloaded uses a single consistent rule set.
+    """
+    
+    def __init__(self, rules: CompiledRules):
+        """
+        Initialize the engine.
+        
+        Args:
+            rules: Compiled rule set
+        """
+        self.rules = rules
+    
+    def calculate_score(self, lead: LeadInput) -> ScoringResult:
+        """Calculate score by evaluating the compiled rules."""
+        score, code, explanations = self.rules.evaluate(lead)
+        return ScoringResult(score=score, priority=PRIORITY_BY_CODE[code], explanations=explanations)
+    
+    def score_columns(self, columns: LeadColumns, explain: bool = True) -> BatchScores:
+        """Vectorized equivalent of `calculate_score` over a columnar batch."""
+        scores, codes, explanations = self.rules.evaluate_columns(columns, explain=explain)
+        return BatchScores(scores=scores, priorities=PRIORITY_BY_CODE[codes], explanations=explanations)
+
+
+# AI engine singleton; loading the weights artifact is too costly to repeat per request
+_ai_engine: Optional[AIScoringEngine] = None
+
+
+def _get_ai_engine() -> AIScoringEngine:
+    global _ai_engine
+    
+    if _ai_engine is None:
+        _ai_engine = AIScoringEngine(
+            model_path=settings.SCORING_MODEL_PATH,
+            # llm_client=your_llm_client
+        )
+    return _ai_engine
+
+
+def build_scoring_engine(profile: ScoringProfileUpdate) -> BaseScoringEngine:
+    """
+    Construct the engine described by an owner's scoring profile.
+    
+    Args:
+        profile: Engine type and rule weights
+        
+    Returns:
+        A RuleBasedScoringEngine with the profile's weights, or the AI engine.
+        A rule_based profile replaces the shared YAML rules for its owner.
+    """
+    if profile.engine_type == "ai":
+        return _get_ai_engine()
+    return RuleBasedScoringEngine(profile.weights)
 
 
 def get_scoring_service() -> BaseScoringEngine:
     """
-    Factory function for dependency injection.
+    Factory function for the default scoring engine.
     
-    Returns the configured scoring engine based on SCORING_ENGINE_TYPE.
-    Can be extended to use environment variables for configuration.
+    Returns the engine selected by settings.SCORING_ENGINE_TYPE. This is
+    the engine for owners without a scoring profile; request handlers
+    should depend on `app.api.deps.get_scoring_engine`, which resolves the
+    caller's own profile.
+    
+    Rule-based scoring uses the YAML rules at SCORING_RULES_PATH when
+    they have loaded, and the built-in RuleBasedScoringEngine otherwise.
     """
-    if SCORING_ENGINE_TYPE == "ai":
-        return AIScoringEngine(
-            model_path="models/lead_scorer.pkl",
-            # llm_client=your_llm_client
-        )
-    else:
-        return RuleBasedScoringEngine()
+    if settings.SCORING_ENGINE_TYPE == "ai":
+        return _get_ai_engine()
+    
+    watcher = get_scoring_rules_watcher()
+    rules = watcher.rules if watcher is not None else None
+    if rules is not None:
+        return DeclarativeScoringEngine(rules)
+    return RuleBasedScoringEngine()
+
+
+def engine_name(engine: BaseScoringEngine) -> str:
+    """
+    Name of an engine as reported by the API.
+    
+    Returns:
+        "rules" for the YAML rules, "ai" for the AI engine, "rule_based" for ScoringWeights
+    """
+    if isinstance(engine, DeclarativeScoringEngine):
+        return "rules"
+    if isinstance(engine, AIScoringEngine):
+        return "ai"
+    return "rule_based"
+
 
 LeadScoringService = RuleBasedScoringEngine
@@ -0,0 +1,132 @@
+"""
+Scoring Engine Registry - Per-owner engines cached by profile version
+
+Owners can save their own scoring profile (engine type and weights). The
+registry keeps constructed engines in a bounded LRU keyed by
+(owner_id, profile version), so a profile is loaded and its engine built
+once per version rather than once per request.
+
+The current version of each owner's profile is itself cached for
+`version_ttl_seconds`; after that a single-column lookup detects whether
+another worker saved a new version. Saves made through this worker call
+`invalidate` and take effect immediately.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.metrics import metrics
+from app.models.schemas import ScoringProfile
+from app.services.scoring_engine import BaseScoringEngine
+
+
+class ScoringEngineRegistry:
+    """Bounded LRU cache of per-owner scoring engines."""
+
+    def __init__(
+        self,
+        load_version: Callable[[str], int],
+        load_profile: Callable[[str], Optional[ScoringProfile]],
+        build_engine: Callable[[ScoringProfile], BaseScoringEngine],
+        default_engine: Callable[[], BaseScoringEngine],
+        max_engines: int = 256,
+        version_ttl_seconds: float = 30,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            load_version: Returns an owner's profile version (0 if none)
+            load_profile: Returns an owner's profile, or None
+            build_engine: Constructs an engine for a profile
+            default_engine: Returns the engine for owners without a profile
+            max_engines: Maximum number of owner engines kept in memory
+            version_ttl_seconds: How long an owner's profile version is trusted without re-checking
+        """
+        self._load_version = load_version
+        self._load_profile = load_profile
+        self._build_engine = build_engine
+        self._default_engine = default_engine
+        self._max_engines = max_engines
+        self._version_ttl_seconds = version_ttl_seconds
+
+        self._engines: "OrderedDict[Tuple[str, int], BaseScoringEngine]" = OrderedDict()
+        self._versions: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._build_locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self._hits = metrics.counter("scoring_engine_cache_hits", "Scoring engines served from the registry")
+        self._builds = metrics.counter("scoring_engine_builds", "Scoring engines constructed from a profile")
+
+    def get(self, owner_id: str) -> BaseScoringEngine:
+        """Get the scoring engine for an owner's current profile version."""
+        version = self._current_version(owner_id)
+        if version == 0:
+            return self._default_engine()
+
+        key = (owner_id, version)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self._hits.inc()
+                return engine
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # One build per (owner, version), even when concurrent requests miss together
+        with build_lock:
+            with self._lock:
+                engine = self._engines.get(key)
+            if engine is not None:
+                self._hits.inc()
+                return engine
+
+            profile = self._load_profile(owner_id)
+            if profile is None:
+                self._remember_version(owner_id, 0)
+                return self._default_engine()
+
+            engine = self._build_engine(profile)
+            self._builds.inc()
+            self._store(owner_id, profile.version, engine)
+            with self._lock:
+                self._build_locks.pop(key, None)
+        return engine
+
+    def invalidate(self, owner_id: str) -> None:
+        """Forget an owner's cached version and engines, e.g. after saving a new profile."""
+        with self._lock:
+            self._versions.pop(owner_id, None)
+            for key in [key for key in self._engines if key[0] == owner_id]:
+                del self._engines[key]
+
+    def _current_version(self, owner_id: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._versions.get(owner_id)
+            if entry is not None and now - entry[1] < self._version_ttl_seconds:
+                return entry[0]
+
+        version = self._load_version(owner_id)
+        self._remember_version(owner_id, version)
+        return version
+
+    def _remember_version(self, owner_id: str, version: int) -> None:
+        with self._lock:
+            self._versions[owner_id] = (version, time.monotonic())
+            self._versions.move_to_end(owner_id)
+            # Version entries are tiny; keep more of them than engines
+            while len(self._versions) > self._max_engines * 4:
+                self._versions.popitem(last=False)
+
+    def _store(self, owner_id: str, version: int, engine: BaseScoringEngine) -> None:
+        with self._lock:
+            # Older versions of this owner's engine can never be requested again
+            for key in [key for key in self._engines if key[0] == owner_id and key[1] != version]:
+                del self._engines[key]
+            self._engines[(owner_id, version)] = engine
+            self._engines.move_to_end((owner_id, version))
+            while len(self._engines) > self._max_engines:
+                self._engines.popitem(last=False)
+        self._remember_version(owner_id, version)
@@ -0,0 +1,373 @@
+"""
+Scoring Rules Service - Declarative YAML scoring rules
+
+Rules are read from a YAML file, validated against ScoringRuleSet and
+compiled once into flat lists of closures:
+
+- per-lead closures, each specialized for its rule shape (unconditional,
+  single condition, several conditions, per-unit points) so evaluation
+  does no dictionary lookups or operator dispatch;
+- column closures that evaluate a rule over a whole LeadColumns batch
+  with NumPy.
+
+Explanations for fixed-point rules are formatted at compile time; per-unit
+rules cache one string per distinct point value.
+
+ScoringRulesWatcher holds the current compiled rules and reloads the file
+when it changes. Reloads build a new CompiledRules and swap a single
+reference, so requests already holding the old rules finish with them and
+an invalid file never replaces a valid one.
+"""
+import asyncio
+import logging
+import operator
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import yaml
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.columns import LeadColumns
+from app.models.schemas import LeadInput, RuleCondition, ScoringRule, ScoringRuleSet
+
+
+logger = logging.getLogger(__name__)
+
+# Lead fields rules may reference, by kind
+NUMERIC_FIELDS = {"interaction_count", "last_interaction_days_ago", "company_size"}
+BOOLEAN_FIELDS = {"has_requested_pricing", "has_demo_request"}
+TEXT_FIELDS = {"industry", "channel", "stage"}
+RULE_FIELDS = NUMERIC_FIELDS | BOOLEAN_FIELDS | TEXT_FIELDS
+
+OPERATORS: Dict[str, Callable] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# (points, explanation) for a rule that fired, None otherwise
+LeadRule = Callable[[LeadInput], Optional[Tuple[int, str]]]
+ColumnRule = Callable[[LeadColumns], np.ndarray]
+
+
+class ScoringRulesError(ValueError):
+    """Raised when a rule file cannot be parsed, validated or compiled."""
+
+
+def _field_getter(field: str) -> Callable[[LeadInput], object]:
+    if field == "stage":
+        # Compare enum members by value so "in" lists of plain strings work
+        return lambda lead: lead.stage.value if hasattr(lead.stage, "value") else lead.stage
+    if field == "last_interaction_days_ago":
+        return lambda lead: lead.last_interaction_days_ago or 0
+    return operator.attrgetter(field)
+
+
+def _check_condition(rule: ScoringRule, condition: RuleCondition) -> None:
+    if condition.field not in RULE_FIELDS:
+        raise ScoringRulesError(f"Rule '{rule.name}': unknown field '{condition.field}'")
+    is_list = isinstance(condition.value, list)
+    if condition.op in ("in", "not in") and not is_list:
+        raise ScoringRulesError(f"Rule '{rule.name}': '{condition.op}' needs a list value")
+    if condition.op not in ("in", "not in") and is_list:
+        raise ScoringRulesError(f"Rule '{rule.name}': '{condition.op}' needs a single value")
+    if condition.op in ("<", "<=", ">", ">=") and condition.field not in NUMERIC_FIELDS:
+        raise ScoringRulesError(f"Rule '{rule.name}': '{condition.op}' needs a numeric field")
+
+
+def _compile_lead_condition(conditions: List[RuleCondition]) -> Optional[Callable[[LeadInput], bool]]:
+    tests = []
+    for condition in conditions:
+        get = _field_getter(condition.field)
+        if condition.op in ("in", "not in"):
+            values = tuple(condition.value)
+            if condition.op == "in":
+                tests.append(lambda lead, get=get, values=values: get(lead) in values)
+            else:
+                tests.append(lambda lead, get=get, values=values: get(lead) not in values)
+        else:
+            compare, value = OPERATORS[condition.op], condition.value
+            tests.append(lambda lead, get=get, compare=compare, value=value: compare(get(lead), value))
+
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    return lambda lead: all(test(lead) for test in tests)
+
+
+def _compile_column_condition(conditions: List[RuleCondition]) -> Optional[Callable[[LeadColumns], np.ndarray]]:
+    tests = []
+    for condition in conditions:
+        field = condition.field
+        if condition.op in ("in", "not in"):
+            values, invert = list(condition.value), condition.op == "not in"
+            tests.append(lambda columns, field=field, values=values, invert=invert:
+                         np.isin(getattr(columns, field), values, invert=invert))
+        else:
+            compare, value = OPERATORS[condition.op], condition.value
+            tests.append(lambda columns, field=field, compare=compare, value=value:
+                         np.asarray(compare(getattr(columns, field), value), dtype=bool))
+
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+
+    def all_of(columns: LeadColumns) -> np.ndarray:
+        mask = tests[0](columns)
+        for test in tests[1:]:
+            mask &= test(columns)
+        return mask
+    return all_of
+
+
+def _compile_rule(rule: ScoringRule) -> Tuple[LeadRule, ColumnRule, Callable[[int], str]]:
+    """Compile one rule into its per-lead closure, column closure and explanation formatter."""
+    for condition in rule.when:
+        _check_condition(rule, condition)
+    if rule.per is not None and rule.per not in NUMERIC_FIELDS | BOOLEAN_FIELDS:
+        raise ScoringRulesError(f"Rule '{rule.name}': 'per' needs a numeric field, got '{rule.per}'")
+
+    template_args = {
+        "value": rule.when[0].value if rule.when else None,
+        "max_points": rule.max_points,
+    }
+    try:
+        rule.explanation.format(points=rule.points, **template_args)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ScoringRulesError(f"Rule '{rule.name}': invalid explanation template ({e})") from e
+
+    texts: Dict[int, str] = {}
+
+    def explain(points: int) -> str:
+        text = texts.get(points)
+        if text is None:
+            text = texts[points] = rule.explanation.format(points=points, **template_args)
+        return text
+
+    lead_test = _compile_lead_condition(rule.when)
+    column_test = _compile_column_condition(rule.when)
+
+    if rule.per is None:
+        hit = (rule.points, explain(rule.points))
+        points = rule.points
+        if not points:
+            lead_rule: LeadRule = lambda lead: None
+        elif lead_test is None:
+            lead_rule = lambda lead: hit
+        else:
+            lead_rule = lambda lead: hit if lead_test(lead) else None
+
+        def column_rule(columns: LeadColumns) -> np.ndarray:
+            if column_test is None:
+                return np.full(len(columns), points, dtype=np.int64)
+            return column_test(columns) * points
+    else:
+        get = _field_getter(rule.per)
+        per_field, per_points, cap = rule.per, rule.points, rule.max_points
+
+        def lead_rule(lead: LeadInput) -> Optional[Tuple[int, str]]:
+            if lead_test is not None and not lead_test(lead):
+                return None
+            points = get(lead) * per_points
+            if cap is not None and points > cap:
+                points = cap
+            if not points:
+                return None
+            return points, explain(points)
+
+        def column_rule(columns: LeadColumns) -> np.ndarray:
+            points = getattr(columns, per_field).astype(np.int64) * per_points
+            if cap is not None:
+                points = np.minimum(points, cap)
+            if column_test is not None:
+                points = points * column_test(columns)
+            return points
+
+    return lead_rule, column_rule, explain
+
+
+class CompiledRules:
+    """A validated rule set compiled to closures."""
+
+    def __init__(self, rule_set: ScoringRuleSet, source: str = ""):
+        """
+        Compile a rule set.
+
+        Args:
+            rule_set: Validated rule definitions
+            source: Where the rules came from, for logging
+
+        Raises:
+            ScoringRulesError: If a rule references unknown fields or has a bad template
+        """
+        self.rule_set = rule_set
+        self.source = source
+        self.loaded_at = datetime.now(timezone.utc)
+        self.max_score = rule_set.max_score
+        self.hot_threshold = rule_set.hot_threshold
+        self.warm_threshold = rule_set.warm_threshold
+
+        compiled = [_compile_rule(rule) for rule in rule_set.rules]
+        self._lead_rules: List[LeadRule] = [lead_rule for lead_rule, _, _ in compiled]
+        self._column_rules: List[ColumnRule] = [column_rule for _, column_rule, _ in compiled]
+        self._explainers: List[Callable[[int], str]] = [explain for _, _, explain in compiled]
+
+    def evaluate(self, lead: LeadInput) -> Tuple[int, int, List[str]]:
+        """
+        Score one lead.
+
+        Returns:
+            Tuple of (score, tier code 0/1/2 for Cold/Warm/Hot, explanations)
+        """
+        score = 0
+        explanations: List[str] = []
+        for rule in self._lead_rules:
+            hit = rule(lead)
+            if hit is not None:
+                score += hit[0]
+                explanations.append(hit[1])
+
+        score = min(max(score, 0), self.max_score)
+        code = (score >= self.hot_threshold) + (score >= self.warm_threshold)
+        return score, code, explanations
+
+    def evaluate_columns(
+        self, columns: LeadColumns, explain: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[List[List[str]]]]:
+        """
+        Score a columnar batch of leads.
+
+        Returns:
+            Tuple of (scores, tier codes, explanations or None)
+        """
+        rule_points = [column_rule(columns) for column_rule in self._column_rules]
+        scores = np.zeros(len(columns), dtype=np.int64)
+        for points in rule_points:
+            scores += points
+        np.clip(scores, 0, self.max_score, out=scores)
+        codes = (scores >= self.hot_threshold).astype(np.int8) + (scores >= self.warm_threshold)
+
+        explanations = None
+        if explain:
+            explainers = self._explainers
+            explanations = []
+            for row in zip(*(points.tolist() for points in rule_points)):
+                explanations.append([explainers[i](points) for i, points in enumerate(row) if points])
+
+        return scores, codes, explanations
+
+
+def load_rules(path: str) -> CompiledRules:
+    """
+    Read, validate and compile a YAML rule file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ScoringRulesError: If the file is not a valid rule set
+    """
+    with open(path) as f:
+        try:
+            document = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ScoringRulesError(f"{path}: invalid YAML ({e})") from e
+
+    try:
+        rule_set = ScoringRuleSet.model_validate(document)
+    except ValidationError as e:
+        raise ScoringRulesError(f"{path}: {e}") from e
+
+    return CompiledRules(rule_set, source=path)
+
+
+class ScoringRulesWatcher:
+    """
+    Holds the current compiled rules and reloads them when the file changes.
+
+    `rules` is None until a valid file has been loaded; callers fall back
+    to the built-in RuleBasedScoringEngine in that case.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the watcher and load the file once.
+
+        Args:
+            path: Path to the YAML rule file
+        """
+        self.path = os.path.abspath(path)
+        self._rules: Optional[CompiledRules] = None
+        self._reload_lock = threading.Lock()
+        self._reloads = metrics.counter("scoring_rules_reloads", "Successful scoring rule reloads")
+        self._failures = metrics.counter("scoring_rules_reload_failures", "Rejected scoring rule files")
+        self.reload()
+
+    @property
+    def rules(self) -> Optional[CompiledRules]:
+        return self._rules
+
+    def reload(self) -> bool:
+        """
+        Load the rule file and swap it in if it is valid.
+
+        Returns:
+            True if new rules were installed
+        """
+        with self._reload_lock:
+            try:
+                rules = load_rules(self.path)
+            except FileNotFoundError:
+                logger.warning("Scoring rules file %s not found; keeping current rules", self.path)
+                return False
+            except ScoringRulesError as e:
+                self._failures.inc()
+                logger.error("Rejected scoring rules: %s", e)
+                return False
+
+            # Single reference assignment: readers see the old or the new rules, never a mix
+            self._rules = rules
+            self._reloads.inc()
+            logger.info("Loaded %d scoring rules from %s", len(rules.rule_set.rules), self.path)
+            return True
+
+    async def watch(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Reload the rules whenever the file changes, until stop_event is set.
+
+        The parent directory is watched rather than the file itself, since
+        editors and deploy tools usually replace files by rename.
+        """
+        from watchfiles import awatch
+
+        directory = os.path.dirname(self.path)
+        async for changes in awatch(directory, stop_event=stop_event):
+            if any(os.path.abspath(changed) == self.path for _, changed in changes):
+                await asyncio.to_thread(self.reload)
+
+
+# Rule watcher singleton
+_watcher: Optional[ScoringRulesWatcher] = None
+
+
+def get_scoring_rules_watcher() -> Optional[ScoringRulesWatcher]:
+    """
+    Get the scoring rules watcher.
+
+    Returns None when SCORING_RULES_PATH is empty. The file is loaded on
+    first use; the application lifespan runs `watch` for hot reload.
+    """
+    global _watcher
+
+    if _watcher is None and settings.SCORING_RULES_PATH:
+        _watcher = ScoringRulesWatcher(settings.SCORING_RULES_PATH)
+
+    return _watcher
@@ -0,0 +1,173 @@
+"""
+Scoring Simulator Service - What-if analysis for rule-based scoring
+
+Evaluates several candidate ScoringWeights over the same columnar lead
+batch in one vectorized pass. Configurations are stacked into (K, 1)
+parameter columns and broadcast against the (N,) feature arrays, so K
+candidates cost K array operations per rule rather than K * N Python
+calls. Leads are processed in fixed-size blocks to bound the (K, block)
+intermediates.
+
+The baseline is either another ScoringWeights or the live scoring engine
+(YAML rules, AI model), whose `score_columns` output is compared as is.
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.models.columns import LeadColumns
+from app.models.schemas import (
+    CandidateSimulation, ScoringSimulationResponse, ScoringWeights, TierChange
+)
+from app.services.scoring_engine import PRIORITY_BY_CODE, BaseScoringEngine
+
+
+# Leads evaluated per block; (K + 1) x BLOCK_SIZE int32 scores stay in cache-friendly sizes
+BLOCK_SIZE = 262144
+
+PRIORITY_LABELS = [priority.value for priority in PRIORITY_BY_CODE]
+
+
+def _stack(configs: Sequence[ScoringWeights], name: str) -> np.ndarray:
+    """One weight field across all configurations, as a (K, 1) column."""
+    return np.array([getattr(config, name) for config in configs], dtype=np.int32)[:, None]
+
+
+def simulate_scores(columns: LeadColumns, configs: Sequence[ScoringWeights]) -> np.ndarray:
+    """
+    Score every lead under every configuration.
+
+    Mirrors `RuleBasedScoringEngine.score_columns` with each constant
+    replaced by a (K, 1) column, so all configurations broadcast together.
+
+    Args:
+        columns: Leads in columnar form
+        configs: K scoring configurations
+
+    Returns:
+        (K, N) int32 score matrix
+    """
+    engagement = np.minimum(
+        columns.interaction_count.astype(np.int32) * _stack(configs, "engagement_points_per_interaction"),
+        _stack(configs, "engagement_max_points")
+    )
+    scores = engagement
+    scores += (columns.last_interaction_days_ago <= _stack(configs, "recency_threshold_days")) * _stack(configs, "recency_points")
+    scores += columns.has_requested_pricing.astype(bool) * _stack(configs, "pricing_request_points")
+    scores += columns.has_demo_request.astype(bool) * _stack(configs, "demo_request_points")
+    scores += (columns.company_size > _stack(configs, "large_company_threshold")) * _stack(configs, "large_company_points")
+    return np.minimum(scores, _stack(configs, "max_score"), out=scores)
+
+
+def priority_codes(scores: np.ndarray, configs: Sequence[ScoringWeights]) -> np.ndarray:
+    """Tier codes (0 = Cold, 1 = Warm, 2 = Hot) for a (K, N) score matrix."""
+    codes = (scores >= _stack(configs, "hot_threshold")).astype(np.int8)
+    codes += scores >= _stack(configs, "warm_threshold")
+    return codes
+
+
+def _engine_block(engine: BaseScoringEngine, block: LeadColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """(1, N) scores and tier codes of a block under a scoring engine."""
+    batch = engine.score_columns(block, explain=False)
+    # Compared against the object array itself: NumPy would coerce a bare str-Enum to a plain string
+    codes = (np.asarray(batch.priorities, dtype=object)[:, None] == PRIORITY_BY_CODE).argmax(axis=1)
+    return batch.scores.astype(np.int32)[None, :], codes.astype(np.int8)[None, :]
+
+
+def simulate(
+    columns: LeadColumns,
+    baseline: Union[ScoringWeights, BaseScoringEngine],
+    candidates: Sequence[ScoringWeights],
+    max_changed_leads: int = 100,
+) -> ScoringSimulationResponse:
+    """
+    Compare candidate configurations against a baseline over the same leads.
+
+    Args:
+        columns: The owner's leads in columnar form
+        baseline: Configuration the leads are currently scored with, or the
+            engine that scores them when it has no ScoringWeights form
+        candidates: Configurations to evaluate
+        max_changed_leads: Maximum number of changed leads listed per candidate
+
+    Returns:
+        Priority distributions, transition counts and changed leads per candidate
+    """
+    engine = baseline if isinstance(baseline, BaseScoringEngine) else None
+    configs = [None if engine is not None else baseline, *candidates]
+    weighted = configs[1:] if engine is not None else configs
+    k = len(configs)
+    n = len(columns)
+
+    tier_counts = np.zeros((k, 3), dtype=np.int64)
+    score_sums = np.zeros(k, dtype=np.int64)
+    # transition_counts[c, 3 * baseline_code + candidate_code]
+    transition_counts = np.zeros((k, 9), dtype=np.int64)
+    # Changed leads per candidate as (score delta, lead index, baseline score, candidate score, baseline code)
+    changed: List[List[np.ndarray]] = [[] for _ in range(k)]
+
+    for start in range(0, n, BLOCK_SIZE):
+        block = columns.slice(start, start + BLOCK_SIZE)
+        scores = simulate_scores(block, weighted)
+        codes = priority_codes(scores, weighted)
+        if engine is not None:
+            engine_scores, engine_codes = _engine_block(engine, block)
+            scores = np.concatenate([engine_scores, scores])
+            codes = np.concatenate([engine_codes, codes])
+        score_sums += scores.sum(axis=1)
+
+        pairs = codes[0].astype(np.int64) * 3 + codes
+        for c in range(k):
+            tier_counts[c] += np.bincount(codes[c], minlength=3)
+            transition_counts[c] += np.bincount(pairs[c], minlength=9)
+            if c == 0 or max_changed_leads == 0:
+                continue
+            (moved,) = np.nonzero(codes[c] != codes[0])
+            if len(moved) == 0:
+                continue
+            delta = np.abs(scores[c, moved] - scores[0, moved])
+            if len(moved) > max_changed_leads:
+                top = np.argpartition(-delta, max_changed_leads - 1)[:max_changed_leads]
+                moved, delta = moved[top], delta[top]
+            changed[c].append(np.stack([delta, moved + start, scores[0, moved], scores[c, moved], codes[0, moved]]))
+
+    def codes_for(c: int, score: int) -> int:
+        return int(score >= configs[c].hot_threshold) + int(score >= configs[c].warm_threshold)
+
+    def result(c: int) -> CandidateSimulation:
+        transitions: Dict[str, int] = {}
+        changed_count = 0
+        for pair in np.flatnonzero(transition_counts[c]):
+            before, after = divmod(int(pair), 3)
+            if before != after:
+                transitions[f"{PRIORITY_LABELS[before]}->{PRIORITY_LABELS[after]}"] = int(transition_counts[c, pair])
+                changed_count += int(transition_counts[c, pair])
+
+        changed_leads: List[TierChange] = []
+        if changed[c]:
+            rows = np.concatenate(changed[c], axis=1)
+            # Biggest score change first, then input order
+            order = np.lexsort((rows[1], -rows[0]))[:max_changed_leads]
+            for _, index, current, simulated, current_code in rows[:, order].T.tolist():
+                changed_leads.append(TierChange(
+                    lead_id=columns.lead_id[index],
+                    current_score=current,
+                    simulated_score=simulated,
+                    current_priority=PRIORITY_BY_CODE[current_code],
+                    simulated_priority=PRIORITY_BY_CODE[codes_for(c, simulated)],
+                ))
+
+        return CandidateSimulation(
+            weights=configs[c],
+            priority_counts={label: int(count) for label, count in zip(PRIORITY_LABELS, tier_counts[c])},
+            average_score=round(float(score_sums[c]) / n, 2) if n else 0.0,
+            changed_count=changed_count,
+            transitions=transitions,
+            changed_leads=changed_leads,
+        )
+
+    return ScoringSimulationResponse(
+        total_leads=n,
+        baseline=result(0),
+        candidates=[result(c) for c in range(1, k)],
+    )
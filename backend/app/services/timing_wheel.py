@@ -0,0 +1,131 @@
+"""
+Hierarchical timing wheel
+
+Keeps a large number of keyed deadlines and reports the ones that have
+passed as time advances. Level 0 has one slot per tick; each higher level
+has slots `slots` times as wide, so four levels of 64 one-minute slots
+span about 32 years. A deadline is filed in the lowest level whose span
+covers it and moves down a level each time its slot comes due
+("cascading"), so scheduling, cancelling and expiring a key are O(1) and
+each key is touched at most once per level over its lifetime. Deadlines
+beyond the top level's span wait in its furthest slot and are re-filed
+when that slot comes due.
+
+The wheel is not thread-safe; one owner thread schedules and advances it.
+"""
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimingWheel:
+    """Hierarchical timing wheel over keys with deadlines in epoch seconds."""
+
+    def __init__(self, start: float, tick_seconds: float = 60.0, slots: int = 64, levels: int = 4):
+        """
+        Initialize the wheel.
+
+        Args:
+            start: Current time in epoch seconds
+            tick_seconds: Resolution; a key expires on the first tick at or after its deadline
+            slots: Slots per level
+            levels: Number of levels
+        """
+        self._tick_seconds = tick_seconds
+        self._slots = slots
+        self._levels = levels
+        # Width of one slot, in ticks, per level
+        self._widths = [slots ** level for level in range(levels)]
+        self._span = slots ** levels
+        self._current = math.floor(start / tick_seconds)
+        self._wheels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        # key -> (level, slot), or (-1, -1) for keys already due
+        self._locations: Dict[Hashable, Tuple[int, int]] = {}
+        self._due: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Set a key's deadline (epoch seconds), replacing any earlier one."""
+        self.cancel(key)
+        self._file(key, math.ceil(deadline / self._tick_seconds))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Remove a key; returns whether it was scheduled."""
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        if level < 0:
+            del self._due[key]
+        else:
+            del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Move the wheel forward to `now`.
+
+        Returns:
+            The keys whose deadlines have passed, which are removed
+        """
+        expired = list(self._due)
+        for key in expired:
+            del self._locations[key]
+        self._due.clear()
+
+        target = math.floor(now / self._tick_seconds)
+        if not self._locations:
+            self._current = max(self._current, target)
+            return expired
+
+        while self._current < target:
+            self._current += 1
+            # Cascade higher levels whose slot boundary was reached, widest first
+            for level in range(self._levels - 1, 0, -1):
+                if self._current % self._widths[level] == 0:
+                    slot = (self._current // self._widths[level]) % self._slots
+                    entries = self._wheels[level][slot]
+                    self._wheels[level][slot] = {}
+                    for key, tick in entries.items():
+                        del self._locations[key]
+                        self._file(key, tick)
+                    if self._due:
+                        expired.extend(self._due)
+                        for key in self._due:
+                            del self._locations[key]
+                        self._due.clear()
+
+            slot = self._current % self._slots
+            entries = self._wheels[0][slot]
+            if entries:
+                self._wheels[0][slot] = {}
+                for key, tick in entries.items():
+                    del self._locations[key]
+                    if tick <= self._current:
+                        expired.append(key)
+                    else:
+                        # Parked beyond a single-level wheel's span
+                        self._file(key, tick)
+        return expired
+
+    def _file(self, key: Hashable, tick: int) -> None:
+        """Put a key into the slot for its expiry tick."""
+        delta = tick - self._current
+        if delta <= 0:
+            self._due[key] = tick
+            self._locations[key] = (-1, -1)
+            return
+        for level in range(self._levels):
+            if delta < self._widths[level] * self._slots:
+                break
+        else:
+            # Beyond the top level's span: park in its furthest slot
+            level = self._levels - 1
+            delta = self._span - self._widths[level]
+        slot = ((self._current + delta) // self._widths[level]) % self._slots
+        self._wheels[level][slot][key] = tick
+        self._locations[key] = (level, slot)
@@ -0,0 +1,85 @@
+-- Follow-up reminders for stalled leads
+-- app/services/follow_ups.py keeps every open lead's follow-up deadline
+-- (last interaction + a per-stage number of days) in an in-memory timing
+-- wheel, follows lead changes through the updated_at index and, when a
+-- deadline passes, files a persisted action item.
+-- Requires add_lead_sync_migration.sql (updated_at) and
+-- add_lead_events_migration.sql (last_interaction_at).
+
+-- Lead changes across all owners, in (updated_at, id) order
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at ON leads(updated_at, id);
+
+CREATE TABLE IF NOT EXISTS action_items (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    lead_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    action_text TEXT NOT NULL,
+    due_at TIMESTAMPTZ NOT NULL,
+    is_done BOOLEAN NOT NULL DEFAULT false,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    done_at TIMESTAMPTZ
+);
+
+-- One reminder per lead deadline, and at most one open reminder per lead and kind
+CREATE UNIQUE INDEX IF NOT EXISTS idx_action_items_deadline ON action_items(owner_id, lead_id, kind, due_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_action_items_open ON action_items(owner_id, lead_id, kind) WHERE NOT is_done;
+
+-- Open items per owner, oldest deadline first
+CREATE INDEX IF NOT EXISTS idx_action_items_owner_pending ON action_items(owner_id, due_at) WHERE NOT is_done;
+
+ALTER TABLE action_items ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own action items" ON action_items
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+CREATE POLICY "Users can update own action items" ON action_items
+    FOR UPDATE
+    USING (auth.uid() = owner_id);
+
+GRANT ALL ON action_items TO authenticated;
+GRANT ALL ON action_items TO anon;
+
+-- Fire the reminders of leads whose wheel deadline expired.
+-- The deadline is recomputed from the lead's current row, so leads that
+-- changed since they were scheduled (new interaction, other stage,
+-- deleted) are not reminded about. p_follow_up_days maps stages to days,
+-- e.g. {"new": 7, "meeting": 3, "negotiation": 2}; other stages get none.
+-- Returns each lead still present with its current deadline (NULL if its
+-- stage has none) and whether that deadline has passed.
+CREATE OR REPLACE FUNCTION fire_follow_up_reminders(p_ids UUID[], p_follow_up_days JSONB, p_now TIMESTAMPTZ)
+RETURNS TABLE(id UUID, due_at TIMESTAMPTZ, fired BOOLEAN)
+LANGUAGE sql
+AS $$
+    WITH due AS (
+        SELECT leads.id,
+               leads.owner_id,
+               leads.lead_id,
+               last_interaction,
+               last_interaction + make_interval(days => (p_follow_up_days ->> leads.stage)::INTEGER) AS due_at
+        FROM leads
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(
+                leads.last_interaction_at,
+                leads.created_at - make_interval(days => leads.last_interaction_days_ago)
+            ) AS last_interaction
+        ) AS interaction
+        WHERE leads.id = ANY(p_ids)
+    ),
+    filed AS (
+        INSERT INTO action_items (owner_id, lead_id, kind, action_text, due_at)
+        SELECT owner_id,
+               lead_id,
+               'follow_up',
+               format('Re-engage %s - no contact for %s days', lead_id, (p_now::date - last_interaction::date)),
+               due_at
+        FROM due
+        WHERE due_at <= p_now
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT due.id, due.due_at, COALESCE(due.due_at <= p_now, false) FROM due;
+$$;
+
+GRANT EXECUTE ON FUNCTION fire_follow_up_reminders(UUID[], JSONB, TIMESTAMPTZ) TO authenticated;
@@ -0,0 +1,140 @@
+-- Per-owner pipeline aggregates
+-- One row per (owner, dimension, bucket) holding a lead count and score sum.
+-- The API applies deltas on every lead write; GET /dashboard/analytics reads
+-- only these rows. scripts/reconcile_analytics.py verifies them against a
+-- full scan and can rebuild them.
+
+CREATE TABLE IF NOT EXISTS lead_aggregates (
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    dimension TEXT NOT NULL CHECK (dimension IN ('stage', 'priority', 'industry', 'channel', 'score_bucket')),
+    bucket TEXT NOT NULL,
+    lead_count BIGINT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (owner_id, dimension, bucket)
+);
+
+ALTER TABLE lead_aggregates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own aggregates" ON lead_aggregates
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+CREATE POLICY "Users can insert own aggregates" ON lead_aggregates
+    FOR INSERT
+    WITH CHECK (auth.uid() = owner_id);
+
+CREATE POLICY "Users can update own aggregates" ON lead_aggregates
+    FOR UPDATE
+    USING (auth.uid() = owner_id);
+
+GRANT ALL ON lead_aggregates TO authenticated;
+GRANT ALL ON lead_aggregates TO anon;
+
+-- Add count/score deltas to an owner's buckets in one atomic statement.
+-- p_deltas: [{"dimension": "stage", "bucket": "meeting", "count": 1, "score": 75}, ...]
+CREATE OR REPLACE FUNCTION apply_lead_aggregate_deltas(p_owner_id UUID, p_deltas JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO lead_aggregates (owner_id, dimension, bucket, lead_count, score_sum)
+    SELECT
+        p_owner_id,
+        delta->>'dimension',
+        delta->>'bucket',
+        (delta->>'count')::BIGINT,
+        (delta->>'score')::BIGINT
+    FROM jsonb_array_elements(p_deltas) AS delta
+    ON CONFLICT (owner_id, dimension, bucket) DO UPDATE
+    SET lead_count = lead_aggregates.lead_count + EXCLUDED.lead_count,
+        score_sum = lead_aggregates.score_sum + EXCLUDED.score_sum,
+        updated_at = NOW();
+$$;
+
+-- Recompute an owner's buckets from the leads table in one transaction.
+CREATE OR REPLACE FUNCTION rebuild_lead_aggregates(p_owner_id UUID)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM lead_aggregates WHERE owner_id = p_owner_id;
+
+    INSERT INTO lead_aggregates (owner_id, dimension, bucket, lead_count, score_sum)
+    SELECT p_owner_id, dimension, bucket, COUNT(*), SUM(score)
+    FROM leads,
+    LATERAL (VALUES
+        ('stage', stage),
+        ('priority', priority),
+        ('industry', industry),
+        ('channel', channel),
+        ('score_bucket', CASE
+            WHEN score >= 90 THEN '90-100'
+            ELSE (score / 10 * 10)::TEXT || '-' || (score / 10 * 10 + 9)::TEXT
+        END)
+    ) AS buckets(dimension, bucket)
+    WHERE owner_id = p_owner_id
+    GROUP BY dimension, bucket;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_lead_aggregate_deltas(UUID, JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_lead_aggregates(UUID) TO authenticated;
+
+-- Move leads to new pipeline stages and apply the stage bucket deltas in
+-- one statement. The current rows are locked before they are read, so two
+-- concurrent moves of the same lead serialize and the second one sees the
+-- first one's stage as the previous stage; aggregates never drift on
+-- routine traffic.
+-- p_transitions: [{"lead_id": "LEAD-001", "stage": "meeting"}, ...]; if a
+-- lead is listed more than once, the last transition wins.
+-- Returns each moved lead (as JSON) with its previous stage.
+CREATE OR REPLACE FUNCTION update_lead_stages(
+    p_owner_id UUID,
+    p_transitions JSONB,
+    p_update_aggregates BOOLEAN DEFAULT true
+)
+RETURNS TABLE(previous_stage TEXT, lead JSONB)
+LANGUAGE sql
+AS $$
+    WITH target AS (
+        SELECT DISTINCT ON (item->>'lead_id') item->>'lead_id' AS lead_id, item->>'stage' AS stage
+        FROM jsonb_array_elements(p_transitions) WITH ORDINALITY AS transitions(item, position)
+        ORDER BY item->>'lead_id', position DESC
+    ),
+    locked AS (
+        SELECT leads.id, leads.stage AS previous_stage, target.stage AS new_stage
+        FROM leads
+        JOIN target ON target.lead_id = leads.lead_id
+        WHERE leads.owner_id = p_owner_id
+        ORDER BY leads.id
+        FOR UPDATE OF leads
+    ),
+    moved AS (
+        UPDATE leads
+        SET stage = locked.new_stage
+        FROM locked
+        WHERE leads.id = locked.id
+        RETURNING locked.previous_stage, leads.stage, leads.score, to_jsonb(leads) AS lead
+    ),
+    deltas AS (
+        SELECT bucket, SUM(lead_count) AS lead_count, SUM(score_sum) AS score_sum
+        FROM (
+            SELECT previous_stage AS bucket, -1 AS lead_count, -score AS score_sum FROM moved
+            UNION ALL
+            SELECT stage, 1, score FROM moved
+        ) AS changes
+        GROUP BY bucket
+        HAVING SUM(lead_count) <> 0 OR SUM(score_sum) <> 0
+    ),
+    applied AS (
+        INSERT INTO lead_aggregates (owner_id, dimension, bucket, lead_count, score_sum)
+        SELECT p_owner_id, 'stage', bucket, lead_count, score_sum
+        FROM deltas
+        WHERE p_update_aggregates
+        ON CONFLICT (owner_id, dimension, bucket) DO UPDATE
+        SET lead_count = lead_aggregates.lead_count + EXCLUDED.lead_count,
+            score_sum = lead_aggregates.score_sum + EXCLUDED.score_sum,
+            updated_at = NOW()
+    )
+    SELECT previous_stage, lead FROM moved;
+$$;
+
+GRANT EXECUTE ON FUNCTION update_lead_stages(UUID, JSONB, BOOLEAN) TO authenticated;
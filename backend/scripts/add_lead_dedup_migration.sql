@@ -0,0 +1,60 @@
+-- Lead deduplication at ingestion
+-- Adds the identifying contact fields and a per-owner unique fingerprint.
+-- The fingerprint is md5('email:' || normalized email), else
+-- md5('lead:' || lead_id) with the lead ID exactly as stored; see
+-- app/services/lead_dedup.py. The company name
+-- is not part of it, so contacts at the same company stay separate leads.
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS contact_email TEXT;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS company_name TEXT;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
+-- Existing leads have no contact details, so they are fingerprinted by
+-- lead ID, which is unique per owner.
+UPDATE leads
+SET fingerprint = md5('lead:' || lead_id)
+WHERE fingerprint IS NULL;
+
+-- Earlier versions fingerprinted leads without an email by company name
+-- (merging different contacts at one company) and by case-folded lead ID
+-- (which the exact lead_id lookups could not match). Re-key those rows by
+-- the exact lead ID: first to a unique placeholder, so no row takes a key
+-- another row still holds while the statement runs.
+UPDATE leads
+SET fingerprint = md5('id:' || id::text)
+WHERE (contact_email IS NULL OR position('@' IN contact_email) = 0)
+  AND fingerprint IS DISTINCT FROM md5('lead:' || lead_id);
+
+UPDATE leads
+SET fingerprint = md5('lead:' || lead_id)
+WHERE fingerprint = md5('id:' || id::text);
+
+-- One lead per prospect per owner; also the ON CONFLICT target of inserts
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_owner_fingerprint ON leads(owner_id, fingerprint);
+
+-- Insert lead rows, skipping any that conflict with a stored lead on either
+-- unique key: (owner_id, fingerprint) or unique_lead_owner (lead_id, owner_id).
+-- A conflict means a concurrent request, or another worker whose write this
+-- process's bloom filter has not seen, saved the same prospect; the caller
+-- looks the skipped rows up and merges them instead. Returns the inserted rows.
+-- Runs with the caller's privileges, so RLS still applies.
+CREATE OR REPLACE FUNCTION insert_leads(p_rows JSONB)
+RETURNS SETOF leads
+LANGUAGE sql
+AS $$
+    INSERT INTO leads (
+        owner_id, lead_id, industry, company_size, channel, interaction_count,
+        last_interaction_days_ago, has_requested_pricing, has_demo_request,
+        score, priority, explanations, stage, contact_email, company_name, fingerprint
+    )
+    SELECT owner_id, lead_id, industry, company_size, channel, interaction_count,
+           COALESCE(last_interaction_days_ago, 0), has_requested_pricing, has_demo_request,
+           score, priority, COALESCE(explanations, '{}'), COALESCE(stage, 'new'),
+           contact_email, company_name, fingerprint
+    FROM jsonb_populate_recordset(NULL::leads, p_rows)
+    ON CONFLICT DO NOTHING
+    RETURNING *;
+$$;
+
+GRANT EXECUTE ON FUNCTION insert_leads(JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION insert_leads(JSONB) TO anon;
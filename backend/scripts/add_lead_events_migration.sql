@@ -0,0 +1,99 @@
+-- Interaction event ingestion
+-- Tracking events (email opens, page views, pricing requests, ...) are
+-- appended to `lead_events`, and the lead's engagement counters are
+-- updated in place with atomic increments instead of a read-modify-write
+-- of the whole lead. Used by app/services/lead_events.py.
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS last_interaction_at TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS lead_events (
+    id BIGSERIAL PRIMARY KEY,
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    lead_id TEXT NOT NULL,
+    event_type TEXT NOT NULL CHECK (event_type IN (
+        'email_open', 'email_click', 'page_view', 'form_submit',
+        'call', 'meeting', 'pricing_request', 'demo_request'
+    )),
+    occurred_at TIMESTAMPTZ NOT NULL,
+    received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_lead_events_owner_lead_occurred ON lead_events(owner_id, lead_id, occurred_at DESC);
+
+ALTER TABLE lead_events ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own lead events" ON lead_events
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+CREATE POLICY "Users can insert own lead events" ON lead_events
+    FOR INSERT
+    WITH CHECK (auth.uid() = owner_id);
+
+GRANT ALL ON lead_events TO authenticated;
+GRANT ALL ON lead_events TO anon;
+GRANT USAGE, SELECT ON SEQUENCE lead_events_id_seq TO authenticated;
+
+-- Append events and apply coalesced per-lead deltas in one statement.
+-- p_events:  [{"lead_id": "LEAD-001", "event_type": "page_view", "occurred_at": "..."}, ...]
+-- p_updates: [{"lead_id": "LEAD-001", "interactions": 3, "last_interaction_at": "...",
+--              "requested_pricing": false, "requested_demo": true}, ...]
+-- Events for leads the owner does not have are dropped. Returns the
+-- updated lead rows, whose score fields are still the pre-event ones.
+CREATE OR REPLACE FUNCTION apply_lead_events(p_owner_id UUID, p_events JSONB, p_updates JSONB)
+RETURNS SETOF leads
+LANGUAGE sql
+AS $$
+    WITH appended AS (
+        INSERT INTO lead_events (owner_id, lead_id, event_type, occurred_at)
+        SELECT p_owner_id, e.lead_id, e.event_type, e.occurred_at
+        FROM jsonb_to_recordset(p_events) AS e(lead_id TEXT, event_type TEXT, occurred_at TIMESTAMPTZ)
+        JOIN leads ON leads.owner_id = p_owner_id AND leads.lead_id = e.lead_id
+        RETURNING 1
+    )
+    UPDATE leads
+    SET interaction_count = leads.interaction_count + u.interactions,
+        last_interaction_at = GREATEST(leads.last_interaction_at, u.last_interaction_at),
+        last_interaction_days_ago = LEAST(
+            leads.last_interaction_days_ago,
+            GREATEST(0, (NOW() AT TIME ZONE 'UTC')::date - (u.last_interaction_at AT TIME ZONE 'UTC')::date)
+        ),
+        has_requested_pricing = leads.has_requested_pricing OR u.requested_pricing,
+        has_demo_request = leads.has_demo_request OR u.requested_demo
+    FROM jsonb_to_recordset(p_updates) AS u(
+        lead_id TEXT, interactions INTEGER, last_interaction_at TIMESTAMPTZ,
+        requested_pricing BOOLEAN, requested_demo BOOLEAN
+    )
+    WHERE leads.owner_id = p_owner_id
+      AND leads.lead_id = u.lead_id
+    RETURNING leads.*;
+$$;
+
+-- Write scores computed from the rows apply_lead_events returned, but only
+-- where the scoring inputs are still the ones that were scored. A lead
+-- incremented again in the meantime is skipped; the writer of the later
+-- increment scores it from the newer counters. Returns the updated ids.
+CREATE OR REPLACE FUNCTION apply_lead_event_scores(p_owner_id UUID, p_updates JSONB)
+RETURNS TABLE(id UUID)
+LANGUAGE sql
+AS $$
+    UPDATE leads
+    SET score = u.score,
+        priority = u.priority,
+        explanations = u.explanations
+    FROM jsonb_to_recordset(p_updates) AS u(
+        id UUID, interaction_count INTEGER, last_interaction_days_ago INTEGER,
+        has_requested_pricing BOOLEAN, has_demo_request BOOLEAN,
+        score INTEGER, priority TEXT, explanations TEXT[]
+    )
+    WHERE leads.id = u.id
+      AND leads.owner_id = p_owner_id
+      AND leads.interaction_count = u.interaction_count
+      AND leads.last_interaction_days_ago = u.last_interaction_days_ago
+      AND leads.has_requested_pricing = u.has_requested_pricing
+      AND leads.has_demo_request = u.has_demo_request
+    RETURNING leads.id;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_lead_events(UUID, JSONB, JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION apply_lead_event_scores(UUID, JSONB) TO authenticated;
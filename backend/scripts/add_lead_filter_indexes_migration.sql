@@ -0,0 +1,14 @@
+-- Composite indexes for owner-scoped lead queries
+-- Every lead query filters on owner_id and orders by score, so each index
+-- leads with owner_id and ends with score DESC to serve filter + sort together.
+
+CREATE INDEX IF NOT EXISTS idx_leads_owner_score ON leads(owner_id, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_priority_score ON leads(owner_id, priority, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_stage ON leads(owner_id, stage, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_industry_score ON leads(owner_id, industry, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_channel_score ON leads(owner_id, channel, score DESC);
+
+-- Superseded by the composite indexes above
+DROP INDEX IF EXISTS idx_leads_owner;
+
+ANALYZE leads;
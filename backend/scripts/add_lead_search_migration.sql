@@ -0,0 +1,59 @@
+-- Trigram-indexed lead search
+-- Backs GET /leads/search with prefix and substring matching on
+-- lead_id, industry and channel. Requires the pg_trgm extension.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_leads_lead_id_trgm ON leads USING GIN (lower(lead_id) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_leads_industry_trgm ON leads USING GIN (lower(industry) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_leads_channel_trgm ON leads USING GIN (lower(channel) gin_trgm_ops);
+
+-- Keyset pagination over an owner's leads (streaming reads, index builds)
+CREATE INDEX IF NOT EXISTS idx_leads_owner_id_keyset ON leads(owner_id, id);
+
+-- Ranked search. Runs with the caller's privileges, so RLS still applies.
+-- Ranking: exact lead_id, lead_id prefix, exact industry/channel,
+-- industry/channel prefix, lead_id substring, industry/channel substring;
+-- then score (highest first), then lead_id in code point order (matching
+-- the in-process index of app/services/lead_search.py).
+CREATE OR REPLACE FUNCTION search_leads(
+    p_owner_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS SETOF leads
+LANGUAGE sql
+STABLE
+AS $$
+    WITH term AS (
+        SELECT
+            lower(trim(p_query)) AS value,
+            replace(replace(replace(lower(trim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') AS pattern
+    )
+    SELECT l.*
+    FROM leads l, term t
+    WHERE l.owner_id = p_owner_id
+      AND t.value <> ''
+      AND (
+          lower(l.lead_id) LIKE '%' || t.pattern || '%'
+          OR lower(l.industry) LIKE '%' || t.pattern || '%'
+          OR lower(l.channel) LIKE '%' || t.pattern || '%'
+      )
+    ORDER BY
+        CASE
+            WHEN lower(l.lead_id) = t.value THEN 0
+            WHEN lower(l.lead_id) LIKE t.pattern || '%' THEN 1
+            WHEN lower(l.industry) = t.value OR lower(l.channel) = t.value THEN 2
+            WHEN lower(l.industry) LIKE t.pattern || '%' OR lower(l.channel) LIKE t.pattern || '%' THEN 3
+            WHEN lower(l.lead_id) LIKE '%' || t.pattern || '%' THEN 4
+            ELSE 5
+        END,
+        l.score DESC,
+        l.lead_id COLLATE "C"
+    LIMIT p_limit
+    OFFSET p_offset;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_leads(UUID, TEXT, INTEGER, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION search_leads(UUID, TEXT, INTEGER, INTEGER) TO anon;
@@ -0,0 +1,72 @@
+-- Delta sync for dashboard lead lists
+-- `updated_at` is set on every insert and on every update that changes the
+-- row (stage changes, merges, rescores), so clients can fetch only the
+-- leads changed since their last sync. Deleted leads (and the old lead_id
+-- of a renamed lead) are recorded in `lead_tombstones`.
+--
+-- clock_timestamp() is used instead of NOW() so rows changed by one long
+-- statement still get distinct, increasing timestamps.
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+
+CREATE INDEX IF NOT EXISTS idx_leads_owner_updated_at ON leads(owner_id, updated_at, id);
+
+CREATE TABLE IF NOT EXISTS lead_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    lead_id TEXT NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_lead_tombstones_owner_deleted_at ON lead_tombstones(owner_id, deleted_at);
+
+ALTER TABLE lead_tombstones ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own lead tombstones" ON lead_tombstones
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+GRANT ALL ON lead_tombstones TO authenticated;
+GRANT ALL ON lead_tombstones TO anon;
+
+CREATE OR REPLACE FUNCTION touch_lead_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NEW;
+        END IF;
+        IF NEW.lead_id IS DISTINCT FROM OLD.lead_id THEN
+            INSERT INTO lead_tombstones (owner_id, lead_id) VALUES (OLD.owner_id, OLD.lead_id);
+        END IF;
+    END IF;
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS leads_touch_updated_at ON leads;
+CREATE TRIGGER leads_touch_updated_at
+    BEFORE INSERT OR UPDATE ON leads
+    FOR EACH ROW EXECUTE FUNCTION touch_lead_updated_at();
+
+CREATE OR REPLACE FUNCTION record_lead_tombstone()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO lead_tombstones (owner_id, lead_id) VALUES (OLD.owner_id, OLD.lead_id);
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS leads_record_tombstone ON leads;
+CREATE TRIGGER leads_record_tombstone
+    AFTER DELETE ON leads
+    FOR EACH ROW EXECUTE FUNCTION record_lead_tombstone();
+
+-- Tombstones older than the longest expected client offline period can be
+-- removed; clients with an older cursor must then do a full resync:
+--     DELETE FROM lead_tombstones WHERE deleted_at < NOW() - INTERVAL '30 days';
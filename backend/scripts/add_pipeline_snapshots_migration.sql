@@ -0,0 +1,35 @@
+-- Daily pipeline snapshots for trend charts
+-- One compact row per owner per day, written by scripts/snapshot_pipeline.py
+-- from lead_aggregates (never from raw leads). GET /dashboard/trends reads
+-- a date range from the primary key, so a one-year query touches ~365 rows.
+
+CREATE TABLE IF NOT EXISTS pipeline_snapshots (
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    snapshot_date DATE NOT NULL,
+    total_leads INTEGER NOT NULL DEFAULT 0,
+    hot_leads INTEGER NOT NULL DEFAULT 0,
+    warm_leads INTEGER NOT NULL DEFAULT 0,
+    cold_leads INTEGER NOT NULL DEFAULT 0,
+    stage_counts JSONB NOT NULL DEFAULT '{}',
+    mean_score NUMERIC(5, 2) NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (owner_id, snapshot_date)
+);
+
+ALTER TABLE pipeline_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own snapshots" ON pipeline_snapshots
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+CREATE POLICY "Users can insert own snapshots" ON pipeline_snapshots
+    FOR INSERT
+    WITH CHECK (auth.uid() = owner_id);
+
+CREATE POLICY "Users can update own snapshots" ON pipeline_snapshots
+    FOR UPDATE
+    USING (auth.uid() = owner_id);
+
+GRANT ALL ON pipeline_snapshots TO authenticated;
+GRANT ALL ON pipeline_snapshots TO anon;
+GRANT ALL ON pipeline_snapshots TO service_role;
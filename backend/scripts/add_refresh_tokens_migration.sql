@@ -0,0 +1,73 @@
+-- Rotating refresh tokens
+-- Each login starts a token family; every refresh replaces the presented
+-- token with a new one in the same family. Only an HMAC of the token is
+-- stored. The user's email is kept on the row so a refresh can issue an
+-- access token without reading the users table.
+--
+-- Presenting a token that was already rotated means it was copied, so the
+-- whole family is revoked and the user has to log in again.
+--
+-- Expired and revoked rows can be removed periodically with:
+--     DELETE FROM refresh_tokens WHERE expires_at < NOW() - INTERVAL '1 day';
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    family_id UUID NOT NULL DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    token_hash TEXT NOT NULL UNIQUE,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family ON refresh_tokens(family_id) WHERE revoked_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires_at ON refresh_tokens(expires_at);
+
+-- Exchange a live token for a new one in the same family, in one round trip.
+-- Returns the new row, or no rows if the token is unknown, expired or revoked.
+CREATE OR REPLACE FUNCTION rotate_refresh_token(
+    p_token_hash TEXT, p_new_token_hash TEXT, p_expires_at TIMESTAMPTZ
+)
+RETURNS SETOF refresh_tokens
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    current_token refresh_tokens;
+BEGIN
+    UPDATE refresh_tokens
+    SET revoked_at = NOW()
+    WHERE token_hash = p_token_hash
+      AND revoked_at IS NULL
+      AND expires_at > NOW()
+    RETURNING * INTO current_token;
+
+    IF NOT FOUND THEN
+        -- Reuse of a rotated token: revoke the rest of its family
+        UPDATE refresh_tokens
+        SET revoked_at = NOW()
+        WHERE revoked_at IS NULL
+          AND family_id = (
+              SELECT family_id FROM refresh_tokens
+              WHERE token_hash = p_token_hash AND revoked_at IS NOT NULL
+          );
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO refresh_tokens (family_id, user_id, email, token_hash, expires_at)
+    VALUES (current_token.family_id, current_token.user_id, current_token.email, p_new_token_hash, p_expires_at)
+    RETURNING *;
+END;
+$$;
+
+-- Revoke the family of a token (logout).
+CREATE OR REPLACE FUNCTION revoke_refresh_token_family(p_token_hash TEXT)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE refresh_tokens
+    SET revoked_at = NOW()
+    WHERE revoked_at IS NULL
+      AND family_id = (SELECT family_id FROM refresh_tokens WHERE token_hash = p_token_hash);
+$$;
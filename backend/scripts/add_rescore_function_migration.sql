@@ -0,0 +1,24 @@
+-- Set-based score updates for parallel rescoring
+-- Used by app/services/rescoring.py to write only the leads whose score or
+-- priority changed, one statement per page instead of one per lead.
+
+-- p_updates: [{"id": "<uuid>", "score": 75, "priority": "Hot", "explanations": ["..."]}, ...]
+-- Runs with the caller's privileges, so RLS still applies.
+CREATE OR REPLACE FUNCTION apply_lead_rescores(p_owner_id UUID, p_updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE leads
+        SET score = u.score,
+            priority = u.priority,
+            explanations = u.explanations
+        FROM jsonb_to_recordset(p_updates) AS u(id UUID, score INTEGER, priority TEXT, explanations TEXT[])
+        WHERE leads.id = u.id
+          AND leads.owner_id = p_owner_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_lead_rescores(UUID, JSONB) TO authenticated;
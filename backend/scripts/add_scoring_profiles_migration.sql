@@ -0,0 +1,46 @@
+-- Per-owner scoring profiles
+-- One row per owner holding the scoring engine type and rule weights.
+-- `version` increases on every save; the API caches constructed engines
+-- keyed by (owner_id, version) and only polls this column to detect changes.
+
+CREATE TABLE IF NOT EXISTS scoring_profiles (
+    owner_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL DEFAULT 1,
+    engine_type TEXT NOT NULL DEFAULT 'rule_based' CHECK (engine_type IN ('rule_based', 'ai')),
+    weights JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE scoring_profiles ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own scoring profile" ON scoring_profiles
+    FOR SELECT
+    USING (auth.uid() = owner_id);
+
+CREATE POLICY "Users can insert own scoring profile" ON scoring_profiles
+    FOR INSERT
+    WITH CHECK (auth.uid() = owner_id);
+
+CREATE POLICY "Users can update own scoring profile" ON scoring_profiles
+    FOR UPDATE
+    USING (auth.uid() = owner_id);
+
+GRANT ALL ON scoring_profiles TO authenticated;
+GRANT ALL ON scoring_profiles TO anon;
+
+-- Create or replace an owner's profile, bumping its version atomically.
+CREATE OR REPLACE FUNCTION save_scoring_profile(p_owner_id UUID, p_engine_type TEXT, p_weights JSONB)
+RETURNS SETOF scoring_profiles
+LANGUAGE sql
+AS $$
+    INSERT INTO scoring_profiles (owner_id, version, engine_type, weights, updated_at)
+    VALUES (p_owner_id, 1, p_engine_type, p_weights, NOW())
+    ON CONFLICT (owner_id) DO UPDATE
+    SET version = scoring_profiles.version + 1,
+        engine_type = EXCLUDED.engine_type,
+        weights = EXCLUDED.weights,
+        updated_at = NOW()
+    RETURNING *;
+$$;
+
+GRANT EXECUTE ON FUNCTION save_scoring_profile(UUID, TEXT, JSONB) TO authenticated;
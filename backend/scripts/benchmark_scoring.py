@@ -0,0 +1,269 @@
+"""
+Scoring engine microbenchmark and equivalence check.
+
+Generates fixed-seed lead populations (the same distributions as
+scripts/generate_leads.py) and, for every registered engine, measures:
+
+- single: `calculate_score` called once per lead
+- batch: `score_columns` with explanations
+- batch_scores: `score_columns` without explanations
+
+reporting ns/lead (best of --repeat runs) and traced allocations per lead
+(peak bytes and net memory blocks from tracemalloc, measured in a separate
+untimed run so tracing does not distort the timings).
+
+It then checks that engines which claim to be equivalent to the built-in
+rules produce the same score and priority for every lead, and that each
+engine's batch path agrees with its single-lead path. Explanation
+differences are counted and reported but do not fail the run. The exit
+status is 1 if any check fails, so the script can guard CI.
+
+Examples:
+    # Default sizes (1k to 1M), results as JSON for tracking across commits
+    python -m scripts.benchmark_scoring --output bench.json
+
+    # Quick run of two engines
+    python -m scripts.benchmark_scoring --sizes 1000,10000 --engine rule_based --engine declarative
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.columns import LeadColumns
+from app.models.schemas import LeadInput
+from app.services.scoring_engine import (
+    AIScoringEngine, BaseScoringEngine, DeclarativeScoringEngine, RuleBasedScoringEngine
+)
+from app.services.scoring_rules import load_rules
+from scripts.generate_leads import DEFAULT_DISTRIBUTIONS, iter_chunks, synthetic_owner_ids
+
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+
+# Reference engine for the equivalence check
+REFERENCE_ENGINE = "rule_based"
+
+
+def _declarative_engine() -> DeclarativeScoringEngine:
+    return DeclarativeScoringEngine(load_rules(settings.SCORING_RULES_PATH))
+
+
+# name -> (factory, whether scores and priorities must equal the reference engine's)
+ENGINES: Dict[str, Tuple[Callable[[], BaseScoringEngine], bool]] = {
+    "rule_based": (RuleBasedScoringEngine, True),
+    "declarative": (_declarative_engine, True),
+    # Without a weights artifact the AI engine scores with the built-in rules
+    "ai_fallback": (lambda: AIScoringEngine(model_path=None), True),
+    "ai_model": (lambda: AIScoringEngine(model_path=settings.SCORING_MODEL_PATH), False),
+}
+
+
+def generate_population(count: int, seed: int) -> LeadColumns:
+    """Generate `count` leads; the same seed and count always give the same leads."""
+    owners = synthetic_owner_ids(1, seed)
+    chunks = iter_chunks(count, 100_000, seed, owners, DEFAULT_DISTRIBUTIONS, "BENCH")
+    return LeadColumns.concat([columns for _, _, columns in chunks])
+
+
+def _best_ns(run: Callable[[], object], repeat: int) -> int:
+    """Best wall time of `repeat` runs, in nanoseconds, with the GC paused."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter_ns()
+            run()
+            elapsed = time.perf_counter_ns() - started
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _allocations(run: Callable[[], object]) -> Tuple[int, int]:
+    """(peak traced bytes, net allocated blocks) of one run, keeping its result alive."""
+    gc.collect()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    result = run()
+    blocks = sys.getallocatedblocks() - blocks_before
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, blocks
+
+
+def measure(
+    engine: BaseScoringEngine, columns: LeadColumns, leads: List[LeadInput], repeat: int
+) -> List[dict]:
+    """Time and trace one engine on one population in every mode."""
+    modes = {
+        "single": (lambda: [engine.calculate_score(lead) for lead in leads], len(leads)),
+        "batch": (lambda: engine.score_columns(columns), len(columns)),
+        "batch_scores": (lambda: engine.score_columns(columns, explain=False), len(columns)),
+    }
+    results = []
+    for mode, (run, count) in modes.items():
+        if count == 0:
+            continue
+        elapsed = _best_ns(run, repeat)
+        peak, blocks = _allocations(run)
+        results.append({
+            "mode": mode,
+            "leads": count,
+            "ns_per_lead": round(elapsed / count, 1),
+            "leads_per_second": round(count / (elapsed / 1e9)),
+            "peak_bytes_per_lead": round(peak / count, 1),
+            "blocks_per_lead": round(blocks / count, 2),
+        })
+    return results
+
+
+def compare(
+    name: str, engine: BaseScoringEngine, reference: BaseScoringEngine, columns: LeadColumns, leads: List[LeadInput],
+    rule_equivalent: bool,
+) -> List[dict]:
+    """Equivalence checks of one engine on one population."""
+    checks = []
+    batch = engine.score_columns(columns)
+
+    # Batch path against the engine's own single-lead path
+    single = [engine.calculate_score(lead) for lead in leads]
+    n = len(single)
+    single_scores = np.array([result.score for result in single], dtype=np.int64)
+    checks.append({
+        "check": "batch_matches_single",
+        "engine": name,
+        "leads": n,
+        "score_mismatches": int((single_scores != batch.scores[:n]).sum()),
+        "priority_mismatches": sum(
+            result.priority != priority for result, priority in zip(single, batch.priorities[:n])
+        ),
+        "explanation_mismatches": sum(
+            result.explanations != explanations for result, explanations in zip(single, batch.explanations[:n])
+        ),
+    })
+
+    if name != REFERENCE_ENGINE:
+        expected = reference.score_columns(columns)
+        checks.append({
+            "check": f"matches_{REFERENCE_ENGINE}",
+            "engine": name,
+            "leads": len(columns),
+            "required": rule_equivalent,
+            "score_mismatches": int((batch.scores != expected.scores).sum()),
+            "priority_mismatches": int((batch.priorities != expected.priorities).sum()),
+            "explanation_mismatches": sum(
+                a != b for a, b in zip(batch.explanations, expected.explanations)
+            ),
+        })
+
+    for check in checks:
+        check["passed"] = (
+            not check.get("required", True)
+            or check["score_mismatches"] == check["priority_mismatches"] == 0
+        )
+    return checks
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark scoring engines and check their equivalence.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated population sizes")
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES), help="Engine to run (repeatable; default: all)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the populations")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement (best is reported)")
+    parser.add_argument("--single-max", type=int, default=100_000, help="Leads scored one by one per population")
+    parser.add_argument("--check-max", type=int, default=10_000, help="Leads compared one by one per population")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = args.engine or list(ENGINES)
+    engines = {}
+    for name in names:
+        factory, rule_equivalent = ENGINES[name]
+        try:
+            engines[name] = (factory(), rule_equivalent)
+        except (OSError, ValueError) as e:
+            print(f"Skipping engine {name}: {e}", file=sys.stderr)
+    reference = ENGINES[REFERENCE_ENGINE][0]()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "benchmarks": [],
+        "checks": [],
+    }
+
+    for size in sizes:
+        columns = generate_population(size, args.seed)
+        single_leads = columns.slice(0, min(size, args.single_max)).to_leads()
+        check_leads = single_leads[:args.check_max]
+        print(f"{size:,} leads", file=sys.stderr)
+
+        for name, (engine, rule_equivalent) in engines.items():
+            for result in measure(engine, columns, single_leads, args.repeat):
+                report["benchmarks"].append({"engine": name, "population": size, **result})
+                print(
+                    f"  {name:<12} {result['mode']:<13} {result['ns_per_lead']:>12,.0f} ns/lead  "
+                    f"{result['peak_bytes_per_lead']:>10,.0f} B/lead  {result['blocks_per_lead']:>7.2f} blocks/lead",
+                    file=sys.stderr,
+                )
+            report["checks"].extend(
+                {"population": size, **check}
+                for check in compare(name, engine, reference, columns, check_leads, rule_equivalent)
+            )
+
+    failed = [check for check in report["checks"] if not check["passed"]]
+    for check in report["checks"]:
+        if check["explanation_mismatches"] or not check["passed"]:
+            status = "FAIL" if not check["passed"] else "note"
+            print(
+                f"{status}: {check['engine']} {check['check']} on {check['population']:,} leads: "
+                f"{check['score_mismatches']} score, {check['priority_mismatches']} priority, "
+                f"{check['explanation_mismatches']} explanation mismatches",
+                file=sys.stderr,
+            )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
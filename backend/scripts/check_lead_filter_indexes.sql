@@ -0,0 +1,49 @@
+-- Verify that every filter supported by GET /dashboard/leads uses its index
+-- Run after add_lead_filter_indexes_migration.sql. Raises an exception naming
+-- the first query whose plan falls back to a sequential scan or does not use
+-- the index expected for it (e.g. settles for idx_leads_owner_score and
+-- filters the rows instead of using the filter's composite index).
+-- Sequential scans are disabled so the check does not depend on table size.
+
+BEGIN;
+
+SET LOCAL enable_seqscan = off;
+
+DO $$
+DECLARE
+    owner UUID := gen_random_uuid();
+    check_query RECORD;
+    plan JSON;
+    plan_text TEXT;
+BEGIN
+    FOR check_query IN
+        SELECT * FROM (VALUES
+            ('owner', 'idx_leads_owner_score',
+                format('SELECT * FROM leads WHERE owner_id = %L ORDER BY score DESC, lead_id', owner)),
+            ('industry', 'idx_leads_owner_industry_score',
+                format('SELECT * FROM leads WHERE owner_id = %L AND industry = %L ORDER BY score DESC, lead_id', owner, 'Technology')),
+            ('channel', 'idx_leads_owner_channel_score',
+                format('SELECT * FROM leads WHERE owner_id = %L AND channel = %L ORDER BY score DESC, lead_id', owner, 'Website')),
+            ('stage', 'idx_leads_owner_stage',
+                format('SELECT * FROM leads WHERE owner_id = %L AND stage = %L ORDER BY score DESC, lead_id', owner, 'meeting')),
+            ('priority', 'idx_leads_owner_priority_score',
+                format('SELECT * FROM leads WHERE owner_id = %L AND priority = %L ORDER BY score DESC, lead_id', owner, 'Hot')),
+            ('score range', 'idx_leads_owner_score',
+                format('SELECT * FROM leads WHERE owner_id = %L AND score >= 40 AND score <= 69 ORDER BY score DESC, lead_id', owner)),
+            ('paginated', 'idx_leads_owner_score',
+                format('SELECT * FROM leads WHERE owner_id = %L ORDER BY score DESC, lead_id LIMIT 50 OFFSET 100', owner))
+        ) AS q(name, expected_index, sql)
+    LOOP
+        EXECUTE 'EXPLAIN (FORMAT JSON) ' || check_query.sql INTO plan;
+        plan_text := plan::text;
+        IF plan_text LIKE '%Seq Scan%' THEN
+            RAISE EXCEPTION 'Filter "%" does not use an index: %', check_query.name, plan;
+        END IF;
+        IF position(format('"Index Name": "%s"', check_query.expected_index) IN plan_text) = 0 THEN
+            RAISE EXCEPTION 'Filter "%" does not use %: %', check_query.name, check_query.expected_index, plan;
+        END IF;
+        RAISE NOTICE 'Filter "%" uses %', check_query.name, check_query.expected_index;
+    END LOOP;
+END $$;
+
+ROLLBACK;
@@ -11,13 +11,18 @@ CREATE TABLE IF NOT EXISTS leads (
     channel TEXT NOT NULL,
     interaction_count INTEGER NOT NULL DEFAULT 0 CHECK (interaction_count >= 0),
     last_interaction_days_ago INTEGER NOT NULL DEFAULT 0 CHECK (last_interaction_days_ago >= 0),
+    last_interaction_at TIMESTAMPTZ,
     has_requested_pricing BOOLEAN NOT NULL DEFAULT false,
     has_demo_request BOOLEAN NOT NULL DEFAULT false,
     score INTEGER NOT NULL CHECK (score >= 0 AND score <= 100),
     priority TEXT NOT NULL CHECK (priority IN ('Hot', 'Warm', 'Cold')),
     stage TEXT NOT NULL DEFAULT 'new' CHECK (stage IN ('new', 'meeting', 'negotiation', 'closed', 'rejected')),
     explanations TEXT[] DEFAULT '{}',
+    contact_email TEXT,
+    company_name TEXT,
+    fingerprint TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp(),
     CONSTRAINT unique_lead_owner UNIQUE (lead_id, owner_id)
 );
 
@@ -25,7 +30,25 @@ CREATE TABLE IF NOT EXISTS leads (
 CREATE INDEX IF NOT EXISTS idx_leads_score ON leads(score DESC);
 CREATE INDEX IF NOT EXISTS idx_leads_priority ON leads(priority);
 CREATE INDEX IF NOT EXISTS idx_leads_stage ON leads(stage);
-CREATE INDEX IF NOT EXISTS idx_leads_owner ON leads(owner_id);
+
+-- Composite indexes for owner-scoped filtering ordered by score
+CREATE INDEX IF NOT EXISTS idx_leads_owner_score ON leads(owner_id, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_priority_score ON leads(owner_id, priority, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_stage ON leads(owner_id, stage, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_industry_score ON leads(owner_id, industry, score DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_owner_channel_score ON leads(owner_id, channel, score DESC);
+
+-- Keyset pagination over an owner's leads
+CREATE INDEX IF NOT EXISTS idx_leads_owner_id_keyset ON leads(owner_id, id);
+
+-- Lead deduplication: one lead per prospect fingerprint per owner
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_owner_fingerprint ON leads(owner_id, fingerprint);
+
+-- Delta sync: leads changed since a cursor (trigger and tombstones in add_lead_sync_migration.sql)
+CREATE INDEX IF NOT EXISTS idx_leads_owner_updated_at ON leads(owner_id, updated_at, id);
+
+-- Follow-up reminders: lead changes across owners (add_follow_up_reminders_migration.sql)
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at ON leads(updated_at, id);
 
 -- Enable Row Level Security
 ALTER TABLE leads ENABLE ROW LEVEL SECURITY;
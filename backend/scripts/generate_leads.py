@@ -0,0 +1,340 @@
+"""
+Synthetic lead generator for scale testing.
+
+Generates large, reproducible populations of realistic leads spread across
+many owners, scores them with the configured scoring engine in vectorized
+batches, and either loads them into the leads table with parallel chunked
+upserts or writes them to CSV/NDJSON files for offline import.
+
+Examples:
+    # Write one million leads for 50 synthetic owners to a gzipped CSV file
+    python -m scripts.generate_leads --count 1000000 --owners 50 --output leads.csv.gz
+
+    # Load 200k leads into Supabase for two existing users
+    python -m scripts.generate_leads --count 200000 --owner-id <uuid> --owner-id <uuid>
+
+    # Override distributions from a YAML file
+    python -m scripts.generate_leads --count 100000 --owners 10 --config dist.yaml --output leads.ndjson
+
+The same --seed, --count, --chunk-size and distributions always produce the
+same leads, regardless of the number of workers.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.columns import LeadColumns
+from app.services.lead_dedup import lead_id_key
+from app.services.scoring_engine import BaseScoringEngine, get_scoring_service
+
+
+DEFAULT_DISTRIBUTIONS: Dict[str, dict] = {
+    # Categorical weights (normalized at generation time)
+    "industry": {
+        "Technology": 0.20, "Finance": 0.10, "Healthcare": 0.09, "E-commerce": 0.08,
+        "Manufacturing": 0.08, "Retail": 0.07, "Education": 0.06, "Consulting": 0.05,
+        "Real Estate": 0.04, "Logistics": 0.04, "Media": 0.04, "Insurance": 0.04,
+        "Construction": 0.03, "Hospitality": 0.03, "Legal": 0.02, "Non-profit": 0.02,
+        "Agriculture": 0.01,
+    },
+    "channel": {
+        "Website": 0.34, "LinkedIn": 0.18, "Referral": 0.12, "Email Campaign": 0.12,
+        "Social Media": 0.09, "Cold Call": 0.08, "Trade Show": 0.07,
+    },
+    "stage": {
+        "new": 0.55, "meeting": 0.17, "negotiation": 0.10, "closed": 0.08, "rejected": 0.10,
+    },
+    # Employees: log-normal, clipped
+    "company_size": {"log_mean": 4.0, "log_sigma": 1.4, "min": 1, "max": 100000},
+    # Interactions: negative binomial (over-dispersed counts)
+    "interaction_count": {"mean": 3.5, "dispersion": 1.5, "max": 200},
+    # Days since last interaction: exponential, clipped
+    "recency_days": {"scale": 21.0, "max": 365},
+    # Intent signal base rates, scaled up for engaged leads
+    "intent": {"pricing_rate": 0.18, "demo_rate": 0.15, "engagement_lift": 0.08},
+    # Zipf-like exponent for how leads are spread across owners
+    "owner_skew": {"exponent": 1.1},
+}
+
+FIELDNAMES = [
+    "owner_id", "lead_id", "industry", "company_size", "channel", "interaction_count",
+    "last_interaction_days_ago", "has_requested_pricing", "has_demo_request",
+    "score", "priority", "explanations", "stage", "fingerprint",
+]
+
+
+def load_distributions(config_path: Optional[str]) -> Dict[str, dict]:
+    """Merge distribution overrides from a YAML file into the defaults."""
+    distributions = {key: dict(value) for key, value in DEFAULT_DISTRIBUTIONS.items()}
+    if config_path:
+        with open(config_path) as f:
+            overrides = yaml.safe_load(f) or {}
+        for key, value in overrides.items():
+            if key not in distributions:
+                raise ValueError(f"Unknown distribution '{key}' in {config_path}")
+            if key in ("industry", "channel", "stage"):
+                distributions[key] = dict(value)
+            else:
+                distributions[key].update(value)
+    return distributions
+
+
+def _choice(rng: np.random.Generator, weights: Dict[str, float], size: int) -> np.ndarray:
+    """Draw categorical values according to (unnormalized) weights."""
+    labels = np.array(list(weights.keys()), dtype=object)
+    probabilities = np.array(list(weights.values()), dtype=float)
+    return labels[rng.choice(len(labels), size=size, p=probabilities / probabilities.sum())]
+
+
+def generate_chunk(
+    rng: np.random.Generator,
+    start: int,
+    size: int,
+    owner_ids: np.ndarray,
+    owner_weights: np.ndarray,
+    distributions: Dict[str, dict],
+    id_prefix: str,
+) -> tuple[np.ndarray, LeadColumns]:
+    """
+    Generate one chunk of leads.
+
+    Returns:
+        Tuple of (owner ID per lead, lead columns)
+    """
+    size_dist = distributions["company_size"]
+    company_size = np.clip(
+        rng.lognormal(size_dist["log_mean"], size_dist["log_sigma"], size).round(),
+        size_dist["min"], size_dist["max"]
+    ).astype(np.int64)
+
+    count_dist = distributions["interaction_count"]
+    n = count_dist["dispersion"]
+    p = n / (n + count_dist["mean"])
+    interaction_count = np.minimum(rng.negative_binomial(n, p, size), count_dist["max"]).astype(np.int64)
+
+    recency_dist = distributions["recency_days"]
+    days_ago = np.minimum(
+        rng.exponential(recency_dist["scale"], size).astype(np.int64), recency_dist["max"]
+    )
+
+    # Engaged leads are more likely to show intent
+    intent = distributions["intent"]
+    lift = 1 + intent["engagement_lift"] * np.minimum(interaction_count, 10)
+    has_requested_pricing = rng.random(size) < np.minimum(intent["pricing_rate"] * lift, 0.95)
+    has_demo_request = rng.random(size) < np.minimum(intent["demo_rate"] * lift, 0.95)
+
+    columns = LeadColumns(
+        lead_id=np.array([f"{id_prefix}-{i:09d}" for i in range(start, start + size)], dtype=object),
+        industry=_choice(rng, distributions["industry"], size),
+        channel=_choice(rng, distributions["channel"], size),
+        company_size=company_size,
+        interaction_count=interaction_count,
+        last_interaction_days_ago=days_ago,
+        has_requested_pricing=has_requested_pricing,
+        has_demo_request=has_demo_request,
+        stage=_choice(rng, distributions["stage"], size),
+    )
+    owners = owner_ids[rng.choice(len(owner_ids), size=size, p=owner_weights)]
+    return owners, columns
+
+
+def to_rows(owners: np.ndarray, columns: LeadColumns, engine: BaseScoringEngine) -> List[dict]:
+    """Score a chunk in one vectorized call and convert it to database rows."""
+    batch = engine.score_columns(columns)
+    return [
+        {
+            "owner_id": owner,
+            "lead_id": lead_id,
+            "industry": industry,
+            "company_size": company_size,
+            "channel": channel,
+            "interaction_count": interaction_count,
+            "last_interaction_days_ago": days_ago,
+            "has_requested_pricing": pricing,
+            "has_demo_request": demo,
+            "score": score,
+            "priority": priority.value,
+            "explanations": explanations,
+            "stage": stage,
+            "fingerprint": lead_id_key(lead_id),
+        }
+        for (
+            owner, lead_id, industry, company_size, channel, interaction_count,
+            days_ago, pricing, demo, score, priority, explanations, stage
+        ) in zip(
+            owners.tolist(), columns.lead_id.tolist(), columns.industry.tolist(),
+            columns.company_size.tolist(), columns.channel.tolist(),
+            columns.interaction_count.tolist(), columns.last_interaction_days_ago.tolist(),
+            columns.has_requested_pricing.tolist(), columns.has_demo_request.tolist(),
+            batch.scores.tolist(), batch.priorities.tolist(), batch.explanations,
+            columns.stage.tolist(),
+        )
+    ]
+
+
+def iter_chunks(
+    count: int,
+    chunk_size: int,
+    seed: int,
+    owner_ids: List[str],
+    distributions: Dict[str, dict],
+    id_prefix: str,
+) -> Iterator[tuple[int, np.ndarray, LeadColumns]]:
+    """
+    Yield (start offset, owners, columns) chunks.
+
+    Every chunk has its own child seed, so output is identical no matter
+    how chunks are later distributed across workers.
+    """
+    ranks = np.arange(1, len(owner_ids) + 1, dtype=float)
+    owner_weights = ranks ** -distributions["owner_skew"]["exponent"]
+    owner_weights /= owner_weights.sum()
+    owners = np.array(owner_ids, dtype=object)
+
+    n_chunks = (count + chunk_size - 1) // chunk_size
+    child_seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for index, child_seed in enumerate(child_seeds):
+        start = index * chunk_size
+        size = min(chunk_size, count - start)
+        chunk_owners, columns = generate_chunk(
+            np.random.default_rng(child_seed), start, size, owners, owner_weights, distributions, id_prefix
+        )
+        yield start, chunk_owners, columns
+
+
+def synthetic_owner_ids(count: int, seed: int) -> List[str]:
+    """Deterministic owner UUIDs for file output."""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 0x0ead]))
+    return [str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(count)]
+
+
+def write_file(path: str, file_format: str, chunks: Iterator, engine: BaseScoringEngine) -> int:
+    """Write generated leads to a CSV or NDJSON file (gzipped if the path ends in .gz)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    written = 0
+    started = time.perf_counter()
+
+    with opener(path, "wt", newline="") as f:
+        writer = None
+        if file_format == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+
+        for _, owners, columns in chunks:
+            rows = to_rows(owners, columns, engine)
+            if writer is not None:
+                for row in rows:
+                    # Postgres array literal so the file can be loaded with COPY
+                    row["explanations"] = "{" + ",".join(
+                        '"' + text.replace('"', '\\"') + '"' for text in row["explanations"]
+                    ) + "}"
+                writer.writerows(rows)
+            else:
+                f.writelines(json.dumps(row) + "\n" for row in rows)
+            written += len(rows)
+            _print_progress(written, started)
+
+    return written
+
+
+def load_database(chunks: Iterator, engine: BaseScoringEngine, workers: int, batch_size: int) -> tuple[int, int]:
+    """
+    Upsert generated leads into the leads table using parallel workers.
+
+    Returns:
+        Tuple of (rows written, rows failed)
+    """
+    from app.core.database import get_supabase_client
+
+    client = get_supabase_client()
+
+    def upsert_chunk(owners: np.ndarray, columns: LeadColumns) -> tuple[int, int]:
+        rows = to_rows(owners, columns, engine)
+        ok = failed = 0
+        for offset in range(0, len(rows), batch_size):
+            batch = rows[offset:offset + batch_size]
+            try:
+                client.table("leads").upsert(batch, on_conflict="lead_id,owner_id").execute()
+                ok += len(batch)
+            except Exception as e:
+                failed += len(batch)
+                print(f"  ✗ batch at {batch[0]['lead_id']}: Error - {e}")
+        return ok, failed
+
+    written = failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for _, owners, columns in chunks:
+            pending.append(executor.submit(upsert_chunk, owners, columns))
+            # Keep a bounded number of chunks in flight
+            if len(pending) >= workers * 2:
+                ok, bad = pending.pop(0).result()
+                written, failed = written + ok, failed + bad
+                _print_progress(written, started)
+        for future in pending:
+            ok, bad = future.result()
+            written, failed = written + ok, failed + bad
+            _print_progress(written, started)
+
+    return written, failed
+
+
+def _print_progress(done: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"  {done:,} leads ({rate:,.0f} leads/s)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic leads for scale testing.")
+    parser.add_argument("--count", type=int, default=100_000, help="Number of leads to generate")
+    parser.add_argument("--owners", type=int, default=10, help="Number of synthetic owners (file output only)")
+    parser.add_argument("--owner-id", action="append", default=[], help="Existing owner UUID (repeatable)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible runs")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Leads generated and scored per batch")
+    parser.add_argument("--batch-size", type=int, default=1_000, help="Rows per upsert request")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel upsert workers")
+    parser.add_argument("--config", help="YAML file overriding the default distributions")
+    parser.add_argument("--output", help="Write to this file instead of the database")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Output file format (default: from extension)")
+    parser.add_argument("--id-prefix", default="GEN", help="Prefix for generated lead IDs")
+    args = parser.parse_args(argv)
+
+    distributions = load_distributions(args.config)
+    engine = get_scoring_service()
+
+    if args.owner_id:
+        owner_ids = args.owner_id
+    elif args.output:
+        owner_ids = synthetic_owner_ids(args.owners, args.seed)
+    else:
+        parser.error("--owner-id is required when loading into the database")
+
+    chunks = iter_chunks(args.count, args.chunk_size, args.seed, owner_ids, distributions, args.id_prefix)
+    print(f"Generating {args.count:,} leads for {len(owner_ids)} owners (seed={args.seed})...")
+
+    if args.output:
+        file_format = args.format or ("ndjson" if ".ndjson" in args.output or ".jsonl" in args.output else "csv")
+        written = write_file(args.output, file_format, chunks, engine)
+        print(f"\nWrote {written:,} leads to {args.output}")
+    else:
+        written, failed = load_database(chunks, engine, args.workers, args.batch_size)
+        print(f"\nLoaded {written:,} leads ({failed:,} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Reconcile per-owner pipeline aggregates against the leads table.
+
+Streams each owner's leads with keyset pagination, recomputes the
+aggregate buckets from scratch and reports any bucket whose stored count
+or score sum has drifted. With --fix, drifted owners are rebuilt in the
+database in a single transaction.
+
+Run after bulk loads that bypass the API (e.g. scripts.generate_leads):
+    python -m scripts.reconcile_analytics
+    python -m scripts.reconcile_analytics --owner-id <uuid> --fix
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import get_supabase_client
+from app.repositories.analytics_repo import AnalyticsRepository
+from app.repositories.lead_repo import LeadRepository
+from app.services.analytics import aggregate_rows, diff_aggregates
+
+
+AGGREGATE_COLUMNS = "id,stage,priority,industry,channel,score"
+
+
+def reconcile_owner(
+    lead_repository: LeadRepository,
+    analytics_repository: AnalyticsRepository,
+    owner_id: str,
+    fix: bool = False,
+) -> List[dict]:
+    """
+    Verify one owner's aggregates against a full scan of their leads.
+
+    Returns:
+        Differences found before any fix was applied
+    """
+    expected = {}
+    for page in lead_repository.iter_lead_pages(owner_id, columns=AGGREGATE_COLUMNS, page_size=5000):
+        aggregate_rows(page, into=expected)
+
+    differences = diff_aggregates(expected, analytics_repository.get_aggregates(owner_id))
+    if differences and fix:
+        analytics_repository.rebuild(owner_id)
+    return differences
+
+
+def list_owner_ids(client, page_size: int = 1000) -> List[str]:
+    """All user IDs, plus owners that only have aggregate rows left."""
+    owner_ids = set()
+    last_id = None
+    while True:
+        query = client.table("users").select("id")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        users = query.order("id").limit(page_size).execute()
+        owner_ids.update(str(row["id"]) for row in users.data)
+        if len(users.data) < page_size:
+            break
+        last_id = users.data[-1]["id"]
+    owner_ids.update(AnalyticsRepository(client).list_owner_ids())
+    return sorted(owner_ids)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify pipeline aggregates against a full scan.")
+    parser.add_argument("--owner-id", action="append", default=[], help="Owner to check (repeatable; default: all)")
+    parser.add_argument("--fix", action="store_true", help="Rebuild aggregates for owners with drift")
+    args = parser.parse_args(argv)
+
+    client = get_supabase_client()
+    lead_repository = LeadRepository(client)
+    analytics_repository = AnalyticsRepository(client)
+    owner_ids = args.owner_id or list_owner_ids(client)
+
+    print(f"Reconciling aggregates for {len(owner_ids)} owners...")
+    drifted = 0
+    for owner_id in owner_ids:
+        differences = reconcile_owner(lead_repository, analytics_repository, owner_id, fix=args.fix)
+        if not differences:
+            print(f"  ✓ {owner_id}")
+            continue
+
+        drifted += 1
+        action = "rebuilt" if args.fix else "drift"
+        print(f"  ✗ {owner_id}: {len(differences)} buckets ({action})")
+        for diff in differences[:10]:
+            print(
+                f"      {diff['dimension']}={diff['bucket']}: "
+                f"count {diff['actual_count']} != {diff['expected_count']}, "
+                f"score_sum {diff['actual_score_sum']} != {diff['expected_score_sum']}"
+            )
+
+    print(f"\nReconcile complete: {drifted} of {len(owner_ids)} owners had drift.")
+    return 1 if drifted and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Rescore every lead of an owner after a scoring configuration or model change.
+
+Leads are split into key ranges and rescored by a pool of worker processes
+(one per CPU core by default); only leads whose score or priority changed
+are written back. Requires the `apply_lead_rescores` function from
+scripts/add_rescore_function_migration.sql.
+
+Examples:
+    # Rescore one owner with the scoring profile they saved
+    python -m scripts.rescore_leads --owner-id <uuid>
+
+    # See how many scores would change, using 8 processes
+    python -m scripts.rescore_leads --owner-id <uuid> --workers 8 --dry-run
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.repositories.lead_repo import LeadRepository
+from app.repositories.scoring_profile_repo import ScoringProfileRepository
+from app.services.rescoring import RescoreJob, run_rescore
+
+
+def print_progress(job: RescoreJob) -> None:
+    """Print one progress line per finished key range."""
+    ranges = f"{job.chunks_done}/{job.chunks_total}" if job.chunks_total else f"{job.chunks_done}"
+    print(
+        f"  ranges {ranges:>9}  "
+        f"{job.scanned:>12,}/{job.total_leads:,} leads  "
+        f"{job.changed:>10,} changed  "
+        f"{job.leads_per_second:>10,.0f} leads/s"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rescore an owner's leads in parallel.")
+    parser.add_argument("--owner-id", required=True, help="Owner whose leads are rescored")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=settings.RESCORE_CHUNK_SIZE, help="Leads per key range")
+    parser.add_argument("--page-size", type=int, default=settings.RESCORE_PAGE_SIZE, help="Rows read per query")
+    parser.add_argument("--dry-run", action="store_true", help="Count changed leads without writing them")
+    args = parser.parse_args(argv)
+
+    client = get_supabase_client()
+    profile = ScoringProfileRepository(client).get_profile(args.owner_id)
+    job = RescoreJob(args.owner_id, workers=args.workers, dry_run=args.dry_run)
+
+    engine = f"{profile.engine_type} profile v{profile.version}" if profile else "default engine"
+    print(f"Rescoring leads of {args.owner_id} with the {engine} on {job.workers} workers...")
+    run_rescore(
+        job,
+        LeadRepository(client),
+        profile,
+        chunk_size=args.chunk_size,
+        page_size=args.page_size,
+        on_progress=print_progress,
+    )
+
+    if job.status == "failed":
+        print(f"\nRescore failed: {job.error}")
+        sys.exit(1)
+    action = "would change" if job.dry_run else "changed"
+    print(
+        f"\nRescore complete: {job.scanned:,} leads in {job.elapsed_seconds:.1f}s "
+        f"({job.leads_per_second:,.0f} leads/s), {job.changed:,} {action}."
+    )
+
+
+if __name__ == "__main__":
+    main()
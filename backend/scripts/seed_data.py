@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import get_supabase_client
 from app.services.scoring_engine import LeadScoringService
 from app.models.schemas import LeadInput
+from app.services.lead_dedup import lead_id_key
 
 
 def seed_leads():
@@ -227,10 +228,11 @@ def seed_leads():
             "score": score_result.score,
             "priority": score_result.priority.value,
             "explanations": score_result.explanations,
+            "fingerprint": lead_id_key(lead_input.lead_id),
         }
         
         try:
-            client.table("leads").upsert(data, on_conflict="lead_id").execute()
+            client.table("leads").upsert(data, on_conflict="lead_id,owner_id").execute()
             print(f"  ✓ {lead_input.lead_id}: Score={score_result.score}, Priority={score_result.priority.value}")
         except Exception as e:
             print(f"  ✗ {lead_input.lead_id}: Error - {e}")
@@ -0,0 +1,64 @@
+"""
+Write the daily pipeline snapshot for every owner.
+
+Reads only the per-owner priority and stage aggregates (lead_aggregates),
+never the leads table, and upserts one pipeline_snapshots row per owner.
+Re-running for the same date overwrites that day's snapshot.
+
+Schedule once a day, e.g. with cron:
+    5 0 * * *  cd /app/backend && python -m scripts.snapshot_pipeline
+
+Backfill a specific day from current aggregates:
+    python -m scripts.snapshot_pipeline --date 2025-01-31
+"""
+import argparse
+import os
+import sys
+from datetime import date
+from typing import List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import get_supabase_client
+from app.repositories.analytics_repo import AnalyticsRepository
+from app.services.analytics import build_snapshot
+
+
+def snapshot_pipelines(analytics_repository: AnalyticsRepository, snapshot_date: date) -> int:
+    """
+    Write one snapshot per owner for the given date.
+
+    Returns:
+        Number of owners snapshotted
+    """
+    pending = {}
+    written = 0
+    for page in analytics_repository.iter_all_aggregates(dimensions=("priority", "stage")):
+        for owner_id, aggregates in page.items():
+            # An owner's buckets may continue on the next page
+            pending.setdefault(owner_id, {}).update(aggregates)
+
+        # Every owner except the last one on the page is complete
+        complete = list(pending)[:-1]
+        snapshots = {owner_id: build_snapshot(pending.pop(owner_id), snapshot_date) for owner_id in complete}
+        analytics_repository.save_snapshots(snapshots)
+        written += len(snapshots)
+
+    snapshots = {owner_id: build_snapshot(aggregates, snapshot_date) for owner_id, aggregates in pending.items()}
+    analytics_repository.save_snapshots(snapshots)
+    return written + len(snapshots)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write daily pipeline snapshots from aggregates.")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="Snapshot date (default: today)")
+    args = parser.parse_args(argv)
+
+    print(f"Writing pipeline snapshots for {args.date.isoformat()}...")
+    count = snapshot_pipelines(AnalyticsRepository(get_supabase_client()), args.date)
+    print(f"\nSnapshot complete: {count} owners.")
+
+
+if __name__ == "__main__":
+    main()
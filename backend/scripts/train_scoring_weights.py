@@ -0,0 +1,135 @@
+"""
+Train scoring weights from closed/rejected pipeline outcomes.
+
+Streams every lead in the `closed` (label 1) or `rejected` (label 0) stage
+in keyset-paginated chunks, builds the feature matrix with the
+AIScoringEngine feature definition, and fits an L2-regularized logistic
+model out of core (see app/services/calibration.py). Memory stays bounded
+by the chunk and block sizes, so millions of labeled rows are fine.
+
+Writes a versioned artifact (models/scoring_weights-<version>.json) and,
+with --promote, atomically installs it at SCORING_MODEL_PATH, where the
+AI scoring engine loads it.
+
+Examples:
+    python -m scripts.train_scoring_weights
+    python -m scripts.train_scoring_weights --epochs 8 --l2 0.01 --promote
+    python -m scripts.train_scoring_weights --input leads.ndjson   # offline export
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.columns import LeadColumns
+from app.models.schemas import Stage
+from app.services.calibration import FeatureSpool, LogisticCalibrator
+from app.services.scoring_engine import AIScoringEngine
+
+
+FEATURE_COLUMNS = "id,lead_id,industry,channel,stage," + ",".join(AIScoringEngine.FEATURE_NAMES)
+LABELED_STAGES = (Stage.CLOSED, Stage.REJECTED)
+
+
+def iter_database_pages(owner_id: Optional[str], page_size: int) -> Iterator[List[dict]]:
+    """Labeled leads from Supabase, one keyset page at a time."""
+    from app.core.database import get_supabase_client
+    from app.repositories.lead_repo import LeadRepository
+
+    repository = LeadRepository(get_supabase_client())
+    yield from repository.iter_lead_pages(
+        owner_id, columns=FEATURE_COLUMNS, page_size=page_size, stages=LABELED_STAGES
+    )
+
+
+def iter_file_pages(path: str, page_size: int) -> Iterator[List[dict]]:
+    """Labeled leads from an NDJSON export (optionally gzipped)."""
+    labeled = {stage.value for stage in LABELED_STAGES}
+    opener = gzip.open if path.endswith(".gz") else open
+    page: List[dict] = []
+    with opener(path, "rt") as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("stage") in labeled:
+                page.append(row)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+    if page:
+        yield page
+
+
+def build_spool(pages: Iterator[List[dict]], engine: AIScoringEngine) -> FeatureSpool:
+    """Stream labeled pages into an on-disk feature spool."""
+    spool = FeatureSpool(n_features=len(engine.FEATURE_NAMES))
+    started = time.perf_counter()
+    for page in pages:
+        columns = LeadColumns.from_rows(page)
+        labels = (columns.stage == Stage.CLOSED.value).astype(np.uint8)
+        spool.append(engine._prepare_feature_matrix(columns), labels)
+        elapsed = time.perf_counter() - started
+        print(f"  {spool.rows:,} labeled leads ({spool.rows / elapsed:,.0f} rows/s)")
+    return spool
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fit scoring weights from closed/rejected outcomes.")
+    parser.add_argument("--owner-id", help="Only train on this owner's leads (default: all owners)")
+    parser.add_argument("--input", help="Read an NDJSON export instead of the database")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows fetched per page")
+    parser.add_argument("--epochs", type=int, default=5, help="Training passes")
+    parser.add_argument("--l2", type=float, default=1e-3, help="L2 regularization strength")
+    parser.add_argument("--learning-rate", type=float, default=0.05, help="Adam step size")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Rows per gradient step")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for shuffling and the holdout split")
+    parser.add_argument("--output-dir", default="models", help="Directory for versioned artifacts")
+    parser.add_argument("--promote", action="store_true", help="Install the artifact at SCORING_MODEL_PATH")
+    args = parser.parse_args(argv)
+
+    engine = AIScoringEngine()
+    if args.input:
+        pages = iter_file_pages(args.input, args.chunk_size)
+    else:
+        pages = iter_database_pages(args.owner_id, args.chunk_size)
+
+    print("Streaming labeled leads...")
+    spool = build_spool(pages, engine)
+    try:
+        print(f"\nTraining on {spool.rows:,} leads ({spool.positives:,} closed)...")
+        calibrator = LogisticCalibrator(
+            l2=args.l2,
+            learning_rate=args.learning_rate,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            seed=args.seed,
+        )
+        weights = calibrator.fit(spool, engine.FEATURE_NAMES)
+    finally:
+        spool.close()
+
+    path = os.path.join(args.output_dir, f"scoring_weights-{weights.version}.json")
+    weights.save(path)
+    print(f"\nWrote {path}")
+    for name, coefficient in zip(weights.feature_names, weights.coefficients):
+        print(f"  {name:28s} {coefficient:+.4f}")
+    print(f"  {'intercept':28s} {weights.intercept:+.4f}")
+    print("  metrics: " + ", ".join(f"{key}={value}" for key, value in weights.metrics.items()))
+    if not weights.metrics.get("holdout"):
+        print("  (too few leads for a holdout; metrics are measured on the training rows)")
+
+    if args.promote:
+        weights.save(settings.SCORING_MODEL_PATH)
+        print(f"\nPromoted to {settings.SCORING_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()